@@ -22,7 +22,7 @@ migrate = Migrate(app, db)
 swagger = Swagger(app)
 
 
-from app import routes, models
+from app import routes, models, commands, metrics
 from app.controllers import errors
 
 _log = logging.getLogger("RequestLogger")
@@ -50,6 +50,16 @@ def add_request_id_to_response(response: flask.Response) -> flask.Response:
     return response
 
 
+@app.teardown_request
+def count_unhandled_error(error: Optional[BaseException]) -> None:
+    """Counts requests that failed with an unhandled exception.
+
+    :param error: Unhandled exception, None if the request did not fail.
+    """
+    if error is not None:
+        metrics.ERRORS.labels("500").inc()
+
+
 @app.errorhandler(errors.RequestError)
 def handle_request_error(error: errors.RequestError) -> flask.Response:
     """Handles errors encountered when handling requests.
@@ -57,6 +67,7 @@ def handle_request_error(error: errors.RequestError) -> flask.Response:
     :param error: Encountered RequestError.
     :return: flask.Response indicating the encountered error.
     """
+    metrics.ERRORS.labels(str(error.status())).inc()
     if error.status() >= 500:
         error_log.error(str(error))
     else:
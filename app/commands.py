@@ -0,0 +1,80 @@
+# Standard library
+from typing import List
+
+# 3rd party modules
+import click
+
+# Internal modules
+from app import app
+from app.config import COMPACTION_MIN_DF, COMPACTION_MAX_FEATURES, COMPACTION_WEIGHTS
+
+
+@app.cli.command('train-models')
+def train_models_command() -> None:
+    """Trains models on the current training data and publishes them,
+    running workers pick them up without being restarted.
+    """
+    from app.service import train_models
+    train_models(use_published=False)
+
+
+@app.cli.command('tune-models')
+@click.option('--folds', default=5, help='Number of cross validation folds.')
+@click.option('--iterations', default=0,
+              help='Random candidates per model type, a full grid search if 0.')
+@click.option('--jobs', default=-1, help='Number of parallel processes, all cpus if -1.')
+def tune_models_command(folds: int, iterations: int, jobs: int) -> None:
+    """Searches for the best featurizer and model hyperparameters with cross
+    validation and stores them, models trained from then on use them.
+    """
+    from app.service import tune_models
+    params = tune_models(folds, iterations, jobs)
+    click.echo(f'Featurizer: {params.featurizer}')
+    for type, model_params in params.models.items():
+        click.echo(f'{type}: {model_params} f1={params.scores[type]:.4f}')
+
+
+@app.cli.command('evaluate-cascade')
+@click.option('--threshold', 'thresholds', type=float, multiple=True,
+              default=[0.6, 0.7, 0.8, 0.9, 0.95, 0.99],
+              help='Min naive bayes class probability to accept, may be repeated.')
+def evaluate_cascade_command(thresholds: List[float]) -> None:
+    """Reports the escalation rate, accuracy and prediction time of the
+    CASCADE model type on the test split for a range of thresholds.
+    """
+    from app.service import evaluate_cascade
+    for report in evaluate_cascade(list(thresholds)):
+        click.echo(
+            f'threshold={report.threshold} escalated={report.escalation_rate:.2%} '
+            f'accuracy={report.accuracy:.4f} '
+            f'(naive bayes={report.first_accuracy:.4f} svm={report.second_accuracy:.4f}) '
+            f'predict={report.predict_us:.1f}us '
+            f'(naive bayes={report.first_predict_us:.1f}us svm={report.second_predict_us:.1f}us)')
+
+
+@app.cli.command('verify-compaction')
+@click.option('--min-df', type=int, default=COMPACTION_MIN_DF,
+              help='Min number of training texts a term must be found in.')
+@click.option('--max-features', type=int, default=COMPACTION_MAX_FEATURES,
+              help='Max number of terms to keep, all if 0.')
+@click.option('--weights', type=click.Choice(['FLOAT32', 'INT8']),
+              default=COMPACTION_WEIGHTS, help='Type to store the weights as.')
+def verify_compaction_command(min_df: int, max_features: int, weights: str) -> None:
+    """Reports the label agreement, accuracy and memory of compacted models
+    compared with the uncompacted ones on the test split.
+    """
+    from app.models import WeightType
+    from app.service import verify_compaction
+    report = verify_compaction(min_df, max_features, WeightType[weights])
+    if report is None:
+        click.echo('Models cannot be compacted')
+        return
+    click.echo(
+        f'features={report.compact_features} (from {report.features}) '
+        f'memory={report.compact_bytes / 2 ** 20:.2f}MB '
+        f'(from {report.bytes / 2 ** 20:.2f}MB) test_samples={report.test_samples}')
+    for type_value, agreement in report.agreement.items():
+        click.echo(
+            f'{type_value}: agreement={agreement:.2%} '
+            f'accuracy={report.compact_accuracy[type_value]:.4f} '
+            f'(from {report.accuracy[type_value]:.4f})')
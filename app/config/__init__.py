@@ -13,6 +13,39 @@ from app.config import util
 
 CASHTAG_THRESHOLD: float = float(os.getenv("CASHTAG_THRESHOLD", "0.8"))
 RESULT_SAMPLE_RATE: float = float(os.getenv("RESULT_SAMPLE_RATE", "0.05"))
+SAMPLE_QUEUE_SIZE: int = int(os.getenv("SAMPLE_QUEUE_SIZE", "10000"))
+SAMPLE_FLUSH_SIZE: int = int(os.getenv("SAMPLE_FLUSH_SIZE", "500"))
+SAMPLE_FLUSH_INTERVAL: float = float(os.getenv("SAMPLE_FLUSH_INTERVAL", "5.0"))
+CLASSIFY_BATCH_MAX_SIZE: int = int(os.getenv("CLASSIFY_BATCH_MAX_SIZE", "1000"))
+MICRO_BATCH_WINDOW: float = float(os.getenv("MICRO_BATCH_WINDOW", "0"))
+MICRO_BATCH_MAX_SIZE: int = int(os.getenv("MICRO_BATCH_MAX_SIZE", "32"))
+FEATURIZER: str = os.getenv("FEATURIZER", "COUNT")
+HASHING_FEATURES: int = int(os.getenv("HASHING_FEATURES", str(2 ** 18)))
+MODEL_ARTIFACT_DIR: str = os.getenv("MODEL_ARTIFACT_DIR", "/tmp/spam-filter/models")
+MODEL_MMAP: bool = os.getenv("MODEL_MMAP", "FALSE") == "TRUE"
+COMPILED_INFERENCE: bool = os.getenv("COMPILED_INFERENCE", "FALSE") == "TRUE"
+MODEL_COMPACTION: bool = os.getenv("MODEL_COMPACTION", "FALSE") == "TRUE"
+COMPACTION_MIN_DF: int = int(os.getenv("COMPACTION_MIN_DF", "2"))
+COMPACTION_MAX_FEATURES: int = int(os.getenv("COMPACTION_MAX_FEATURES", "0"))
+COMPACTION_WEIGHTS: str = os.getenv("COMPACTION_WEIGHTS", "FLOAT32")
+CASCADE_THRESHOLD: float = float(os.getenv("CASCADE_THRESHOLD", "0.9"))
+RESULT_CACHE_SIZE: int = int(os.getenv("RESULT_CACHE_SIZE", "10000"))
+TRAINING_DATA_BATCH_SIZE: int = int(os.getenv("TRAINING_DATA_BATCH_SIZE", "5000"))
+TRAINING_WORKERS: int = int(os.getenv("TRAINING_WORKERS", "0"))
+TRAINING_SAMPLE_CAP: int = int(os.getenv("TRAINING_SAMPLE_CAP", "0"))
+KNOWN_TEXT_LOOKUP: bool = os.getenv("KNOWN_TEXT_LOOKUP", "FALSE") == "TRUE"
+KNOWN_TEXT_UPDATE_INTERVAL: float = float(os.getenv("KNOWN_TEXT_UPDATE_INTERVAL", "60"))
+NEAR_DUPLICATE_INDEX: bool = os.getenv("NEAR_DUPLICATE_INDEX", "FALSE") == "TRUE"
+NEAR_DUPLICATE_THRESHOLD: float = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+NEAR_DUPLICATE_UPDATE_INTERVAL: float = float(os.getenv("NEAR_DUPLICATE_UPDATE_INTERVAL", "60"))
+NEAR_DUPLICATE_RESCAN_INTERVAL: float = float(os.getenv("NEAR_DUPLICATE_RESCAN_INTERVAL", "3600"))
+INCREMENTAL_MODEL: bool = os.getenv("INCREMENTAL_MODEL", "FALSE") == "TRUE"
+INCREMENTAL_UPDATE_INTERVAL: float = float(os.getenv("INCREMENTAL_UPDATE_INTERVAL", "300"))
+INCREMENTAL_BATCH_SIZE: int = int(os.getenv("INCREMENTAL_BATCH_SIZE", "1000"))
+INCREMENTAL_TEST_SIZE: int = int(os.getenv("INCREMENTAL_TEST_SIZE", "10000"))
+MODEL_RELOAD_INTERVAL: float = float(os.getenv("MODEL_RELOAD_INTERVAL", "60"))
+MODEL_LOAD_RETRIES: int = int(os.getenv("MODEL_LOAD_RETRIES", "5"))
+MODEL_LOAD_RETRY_DELAY: float = float(os.getenv("MODEL_LOAD_RETRY_DELAY", "10"))
 TRAIN_MODEL: bool = os.getenv("TRAIN_MODEL", "TRUE") == "TRUE"
 REQUEST_ID_HEADER = "X-Request-ID"
 SERVICE_NAME: str = os.getenv("SERVICE_NAME", "spam-filter")
@@ -22,9 +22,14 @@ def getenv(key):
 
 def get_database_uri() -> str:
     """Gets database connection uri based on the current APP_PROFILE.
+    A complete uri in DATABASE_URI takes precedence, such as an sqlite
+    database for tests.
 
     :return: DB connection string.
     """
+    database_uri = os.getenv('DATABASE_URI')
+    if database_uri:
+        return database_uri
     DB_USERNAME = getenv('DB_USERNAME')
     DB_PASSWORD = getenv('DB_PASSWORD')
     DB_HOST = getenv('DB_HOST')
@@ -1,12 +1,14 @@
 # Standard library
 import logging
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 # 3rd party library
 from flask import request
 
 # Internal modules
-from app.controllers import util, errors
+from app import metrics
+from app.config import CLASSIFY_BATCH_MAX_SIZE
+from app.controllers import util, errors, status
 from app.models import SpamCandidate, SpamResult, ModelType
 from app.service import classification_svc
 from app.repository import SampleRepo
@@ -21,21 +23,77 @@ def is_spam() -> Dict[str, str]:
 
     :return: Labled SpamCandidate as dict.
     """
+    _check_ready()
     candidate = _get_spam_body()
     model_type = _get_model_type()
     res = classification_svc.classify(candidate.text, model_type)
     _sample_repo.save(res, candidate.text)
+    metrics.CLASSIFICATIONS.labels(model_type.value, res.label).inc()
     _log_request(res)
     return res.todict()
 
 
+def is_spam_batch() -> Tuple[Dict[str, Any], int]:
+    """Classifies a batch of incomming texts as spam or non-spam.
+    Invalid items are reported individually without failing the whole batch.
+
+    :return: Batch results as dict, in the same order as the incomming texts.
+    :return: HTTP status code.
+    """
+    _check_ready()
+    items = _get_batch_body()
+    model_type = _get_model_type()
+    item_results: List[Dict[str, Any]] = [
+        {} if util.is_string(item) else {"error": '"text" not of string type'}
+        for item in items
+    ]
+    indexes = [i for i, item in enumerate(items) if util.is_string(item)]
+    with metrics.time_stage(metrics.NORMALIZE):
+        candidates = [SpamCandidate(text=items[i]) for i in indexes]
+    results = classification_svc.classify_batch([c.text for c in candidates], model_type)
+    for i, candidate, res in zip(indexes, candidates, results):
+        if isinstance(res, Exception):
+            _log.error(f"requestId=[{request.id}] failed to classify item=[{i}]: {res}")
+            item_results[i] = {"error": "Failed to classify text"}
+            continue
+        _sample_repo.save(res, candidate.text)
+        metrics.CLASSIFICATIONS.labels(model_type.value, res.label).inc()
+        item_results[i] = res.todict()
+    failed = sum(1 for item_result in item_results if "error" in item_result)
+    _log_batch_request(len(items) - failed, failed)
+    code = status.HTTP_207_MULTI_STATUS if failed else status.HTTP_200_OK
+    return {"results": item_results}, code
+
+
+def _check_ready() -> None:
+    """Checks that models have been loaded and texts can be classified."""
+    if not classification_svc.is_ready():
+        raise errors.ServiceUnavailableError("Model not ready, try again later")
+
+
 def _get_spam_body() -> SpamCandidate:
     """Gets spam candidate from request body.
 
     :return: SpamCandidate.
     """
     body = util.get_json_body("text")
-    return SpamCandidate.fromdict(body)
+    with metrics.time_stage(metrics.NORMALIZE):
+        return SpamCandidate.fromdict(body)
+
+
+def _get_batch_body() -> List[Any]:
+    """Gets the list of texts to classify from a batch request body.
+
+    :return: List of raw batch items.
+    """
+    body = util.get_json_body()
+    texts = body.get("texts") if isinstance(body, dict) else None
+    if not isinstance(texts, list):
+        raise errors.BadRequestError('Missing field: "texts"')
+    if len(texts) > CLASSIFY_BATCH_MAX_SIZE:
+        raise errors.BadRequestError(
+            f"Batch size {len(texts)} exceeds max size of {CLASSIFY_BATCH_MAX_SIZE}")
+    return texts
 
 
 def _get_model_type() -> ModelType:
@@ -45,9 +103,12 @@ def _get_model_type() -> ModelType:
     """
     type_str = util.get_optional_param("model-type", ModelType.SVM.value)
     try:
-        return ModelType[type_str]
+        model_type = ModelType[type_str]
     except KeyError:
         raise errors.BadRequestError(f"Unkown model type: {type_str}")
+    if not classification_svc.has_model_type(model_type):
+        raise errors.BadRequestError(f"Model type not available: {type_str}")
+    return model_type
 
 
 def _log_request(res: SpamResult) -> None:
@@ -56,3 +117,12 @@ def _log_request(res: SpamResult) -> None:
     :param res: SpamResult
     """
     _log.info(f"requestId=[{request.id}] result=[{res.label}] reason=[{res.reason}]")
+
+
+def _log_batch_request(classified: int, failed: int) -> None:
+    """Logs an incomming batch classification request.
+
+    :param classified: Number of classified texts.
+    :param failed: Number of texts that could not be classified.
+    """
+    _log.info(f"requestId=[{request.id}] classified=[{classified}] failed=[{failed}]")
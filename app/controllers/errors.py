@@ -88,3 +88,14 @@ class NotImplementedError(RequestError):
 
     def status(self) -> int:
         return status.HTTP_501_NOT_IMPLEMENTED
+
+
+class ServiceUnavailableError(RequestError):
+    """Exception that can be thrown when the service is not yet
+    ready to handle a request.
+
+    message: Error message as a string.
+    """
+
+    def status(self) -> int:
+        return status.HTTP_503_SERVICE_UNAVAILIBLE
@@ -5,7 +5,7 @@ from typing import Dict, List, Tuple
 # Internal modules
 from app import db
 from app.controllers import status
-from app.service import classification_svc
+from app.service import classification_svc, model_loader
 
 
 _log = logging.getLogger(__name__)
@@ -32,6 +32,34 @@ def check_health() -> Tuple[Dict[str, str], int]:
     return health_info, status_code
 
 
+def check_liveness() -> Tuple[Dict[str, str], int]:
+    """Handles liveness checks, the service is live as soon as it can handle
+    requests, while models may still be loading. It is not live once loading
+    models has failed on every attempt, as it would never become ready.
+
+    :return: Status info as a dict.
+    :return: HTTP status code.
+    """
+    model_status, _ = _check_model_status()
+    loader_failed = model_loader is not None and model_loader.has_failed()
+    overall_status, status_code = _determine_overall_status(not loader_failed)
+    health_info = {
+        'status': overall_status,
+        'model': model_status
+    }
+    return health_info, status_code
+
+
+def check_readiness() -> Tuple[Dict[str, str], int]:
+    """Handles readiness checks, the service is ready to receive traffic
+    once models are loaded and the database is reachable.
+
+    :return: Status info as a dict.
+    :return: HTTP status code.
+    """
+    return check_health()
+
+
 def _check_model_status() -> Tuple[str, bool]:
     """Checks that the spam filter model is trained
     and ready to classify requests
@@ -1,6 +1,7 @@
 # Standard library
 import logging
-from typing import Any, Dict
+from datetime import datetime
+from typing import Any, Dict, List
 
 # Internal modules
 from app.controllers import util, errors
@@ -12,6 +13,8 @@ __training_data_repo = TrainingDataRepo()
 
 
 _log = logging.getLogger(__name__)
+_MAX_TEXT_LENGTH: int = TrainingData.__table__.c.text.type.length
+_MAX_REPORTED_ERRORS = 100
 
 
 def add_training_data() -> None:
@@ -21,6 +24,51 @@ def add_training_data() -> None:
     __training_data_repo.save(training_data)
 
 
+def add_training_data_bulk() -> Dict[str, Any]:
+    """Adds a list of training data, rejecting incorrectly formated items
+    without failing the rest.
+
+    :return: Counts of accepted and rejected items and rejection reasons.
+    """
+    items = util.get_json_list_body()
+    created_at = datetime.utcnow()
+    rows: List[Dict[str, Any]] = []
+    rejected: List[Dict[str, Any]] = []
+    for i, item in enumerate(items):
+        try:
+            rows.append(_parse_training_data_row(item, created_at))
+        except errors.BadRequestError as e:
+            rejected.append({'index': i, 'message': e.message})
+    accepted = __training_data_repo.save_all(rows)
+    _log.info(f'Bulk training data: accepted=[{accepted}] rejected=[{len(rejected)}]')
+    return {
+        'accepted': accepted,
+        'rejected': len(rejected),
+        'errors': rejected[:_MAX_REPORTED_ERRORS]
+    }
+
+
+def _parse_training_data_row(item: Any, created_at: datetime) -> Dict[str, Any]:
+    """Parses and validates a bulk item into a training data row.
+
+    :param item: Raw bulk item.
+    :param created_at: Creation time of the row.
+    :return: Training data column values as dict.
+    """
+    if not isinstance(item, dict):
+        raise errors.BadRequestError('Item is not a JSON object')
+    for field in ('text', 'label'):
+        if not util.is_string(item.get(field)):
+            raise errors.BadRequestError(f'Missing or invalid field: "{field}"')
+    if len(item['text']) > _MAX_TEXT_LENGTH:
+        raise errors.BadRequestError(f'"text" longer than {_MAX_TEXT_LENGTH} characters')
+    return {
+        'text': item['text'],
+        'label': _parse_spam_label(item['label']).value,
+        'created_at': created_at
+    }
+
+
 def _parse_training_data(body: Dict[str, Any]) -> TrainingData:
     """Parses request body into training data if the data is correct.
 
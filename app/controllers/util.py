@@ -1,13 +1,18 @@
 # Standard library
+import json
 from typing import Any, Dict, List, Optional
 
 # 3rd party modules
 from flask import request
 
 # Internal modules
+from app import metrics
 from app.controllers import errors
 
 
+_NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson')
+
+
 def get_param(param_name: str) -> str:
     """Gets a required query parameter from a request.
 
@@ -39,7 +44,8 @@ def get_json_body(*required_fields: str, fields_as_strings: bool = True) -> Dict
     :param fields_as_strings:
     :return: Request body as a dict.
     """
-    body = request.get_json(silent=True)
+    with metrics.time_stage(metrics.PARSE_BODY):
+        body = request.get_json(silent=True)
     if body == None:
         raise errors.BadRequestError('Could not parse request body')
     for field in required_fields:
@@ -50,6 +56,34 @@ def get_json_body(*required_fields: str, fields_as_strings: bool = True) -> Dict
     return body
 
 
+def get_json_list_body() -> List[Any]:
+    """Gets and parses a request body containing a list of items, either as
+    a JSON array or as newline delimited JSON if sent as application/x-ndjson.
+    Lines that cannot be parsed are returned as None.
+
+    :return: Request body as a list.
+    """
+    if request.mimetype in _NDJSON_MIMETYPES:
+        lines = request.get_data(as_text=True).splitlines()
+        return [_parse_json_line(line) for line in lines if line.strip()]
+    body = request.get_json(silent=True)
+    if not isinstance(body, list):
+        raise errors.BadRequestError('Could not parse request body as a list')
+    return body
+
+
+def _parse_json_line(line: str) -> Any:
+    """Parses a single line of newline delimited JSON.
+
+    :param line: Line to parse.
+    :return: Parsed value or None if the line is not valid JSON.
+    """
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
 def is_string(obj: Any) -> bool:
     """Checks if an object is of type string.
 
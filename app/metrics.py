@@ -0,0 +1,95 @@
+# Standard library
+import os
+from typing import Any, Tuple
+
+# 3rd party modules
+from prometheus_client import CollectorRegistry, Counter, Histogram
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from prometheus_client import multiprocess
+
+
+# Set by start.sh when running under uwsgi, each worker process then writes
+# its metrics to files in this directory which are aggregated on export.
+_MULTIPROCESS_DIR_ENV = 'prometheus_multiproc_dir'
+
+# Classify stages take from tens of microseconds to tens of milliseconds.
+_LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, float('inf'))
+
+
+# Stages of a classify request.
+PARSE_BODY = 'parse_body'
+NORMALIZE = 'normalize'
+KNOWN_TEXT = 'known_text'
+TOKENIZE = 'tokenize'
+CASHTAG_RULE = 'cashtag_rule'
+NEAR_DUPLICATE = 'near_duplicate'
+VECTORIZE = 'vectorize'
+PREDICT = 'predict'
+SAMPLE_WRITE = 'sample_write'
+SAMPLE_FLUSH = 'sample_flush'
+MICRO_BATCH_WAIT = 'micro_batch_wait'
+
+
+STAGE_LATENCY = Histogram(
+    'spamfilter_stage_latency_seconds', 'Latency of each stage of a classify request.',
+    ['stage'], buckets=_LATENCY_BUCKETS)
+
+CLASSIFICATIONS = Counter(
+    'spamfilter_classifications_total', 'Classified texts by model type and label.',
+    ['model_type', 'label'])
+
+RULE_HITS = Counter(
+    'spamfilter_rule_hits_total', 'Texts classified by a rule rather than a model.',
+    ['rule'])
+
+CASCADE_PREDICTIONS = Counter(
+    'spamfilter_cascade_predictions_total',
+    'Texts predicted by the CASCADE model type, by the model that decided them.',
+    ['model_type'])
+
+RESULT_CACHE_LOOKUPS = Counter(
+    'spamfilter_result_cache_lookups_total',
+    'Result cache lookups by whether they hit or missed.',
+    ['result'])
+
+RESULT_CACHE_EVICTIONS = Counter(
+    'spamfilter_result_cache_evictions_total',
+    'Results evicted from a full result cache.')
+
+RESULT_SAMPLES = Counter(
+    'spamfilter_result_samples_total',
+    'Sampled classification results by whether they were written or dropped.',
+    ['outcome'])
+
+MICRO_BATCH_SIZE = Histogram(
+    'spamfilter_micro_batch_size', 'Texts predicted together by the micro batcher.',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, float('inf')))
+
+ERRORS = Counter(
+    'spamfilter_errors_total', 'Failed requests by HTTP status code.',
+    ['status'])
+
+
+def time_stage(stage: str) -> Any:
+    """Creates a context manager that observes the latency of a stage.
+
+    :param stage: Name of the stage.
+    :return: Timer context manager.
+    """
+    return STAGE_LATENCY.labels(stage).time()
+
+
+def export() -> Tuple[bytes, str]:
+    """Exports all metrics in the Prometheus text format, aggregated across
+    worker processes when running in multiprocess mode.
+
+    :return: Metrics.
+    :return: Content type of the metrics.
+    """
+    registry = REGISTRY
+    if os.environ.get(_MULTIPROCESS_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
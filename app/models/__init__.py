@@ -1,8 +1,23 @@
 from .classifier import Classifier
 from .classifier import ModelType
+from .classifier import FeaturizerType
+from .classifier import WeightType
 from .spam import Label
 from .spam import SpamCandidate
 from .spam import SpamResult
 from .spam import SpamLabel
 from .spam import TrainingData
 from .spam import ResultSample
+from .text import TokenizedText
+from .text import format_text
+from .text import tokenize
+from .text import normalize
+from .text import tokenize_all
+from .text import normalize_all
+from .text import analyze_terms
+from .compiled import CompiledModel
+from .compiled import compile_model
+from .compiled import verify_compiled
+from .compact import Compaction
+from .compact import compact_models
+from .compact import map_vocabulary
@@ -8,6 +8,18 @@ from app import db
 class ModelType(Enum):
     SVM = 'SVM'
     NAIVE_BAYES = 'NAIVE-BAYES'
+    INCREMENTAL = 'INCREMENTAL'
+    CASCADE = 'CASCADE'
+
+
+class FeaturizerType(Enum):
+    COUNT = 'COUNT'
+    HASHING = 'HASHING'
+
+
+class WeightType(Enum):
+    FLOAT32 = 'FLOAT32'
+    INT8 = 'INT8'
 
 
 class Classifier(db.Model):  # type: ignore
@@ -17,12 +29,14 @@ class Classifier(db.Model):  # type: ignore
     test_samples: int = db.Column(db.Integer, nullable=False)
     accuracy: float = db.Column(db.Float, nullable=False)
     model_hash: str = db.Column(db.String(64))
+    parent_hash: str = db.Column(db.String(64), nullable=True)
+    last_sample_id: int = db.Column(db.Integer, nullable=True)
     created_at: datetime = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
     def __repr__(self) -> str:
         return ('Classifier(id={} type={} training_samples={} '
                 'test_samples={} accuracy={} model_hash={} '
-                'created_at={})').format(
+                'parent_hash={} last_sample_id={} created_at={})').format(
                     self.id, self.type, self.training_samples,
                     self.test_samples, self.accuracy, self.model_hash,
-                    self.created_at)
+                    self.parent_hash, self.last_sample_id, self.created_at)
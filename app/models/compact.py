@@ -0,0 +1,370 @@
+# Standard library
+from collections import namedtuple
+from copy import copy
+from itertools import groupby
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, TypeVar
+
+# 3rd party modules
+import numpy as np
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
+from sklearn.feature_extraction.text import TfidfTransformer
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import normalize
+from sklearn.utils import murmurhash3_32
+
+# Internal modules
+from .classifier import WeightType
+from .linear import is_linear, linear_weights
+from .text import analyze_terms
+
+
+Compaction = namedtuple('Compaction', ['min_df', 'max_features', 'weight_type'])
+
+K = TypeVar('K')
+
+_INT8_MAX = 127
+
+_INFERENCE_ONLY = ('Compacted models are inference only, '
+                   'fit the uncompacted model and compact it again instead')
+
+
+class SortedStringTable(Mapping[str, int]):
+    """Read only mapping of terms to feature columns that stores the UTF-8
+    encoded terms of each length in a sorted numpy array of fixed width byte
+    strings, i.e. the bytes of the terms and nothing else, instead of a dict
+    with a str object, an int object and a hash table slot per term.
+
+    Terms are looked up by binary search in the array of their length. The
+    column of a term is its position in the table, ordered by length and then
+    by bytes, unless columns are given, which are then stored in an int32
+    array per length. Stored with joblib, the arrays can be memory mapped.
+    """
+
+    def __init__(self, terms: Iterable[str],
+                 columns: Optional[Mapping[str, int]] = None) -> None:
+        encoded = sorted({term.encode('utf-8') for term in terms}, key=lambda t: (len(t), t))
+        self.__arrays: Dict[int, Tuple[int, np.ndarray]] = {}
+        self.__columns: Dict[int, np.ndarray] = {}
+        offset = 0
+        for length, group in groupby(encoded, key=len):
+            terms_of_length = list(group)
+            array = np.array(terms_of_length, dtype=f'S{max(length, 1)}')
+            self.__arrays[length] = (offset, array)
+            if columns is not None:
+                self.__columns[length] = np.array(
+                    [columns[term.decode('utf-8')] for term in terms_of_length], dtype=np.int32)
+            offset += len(array)
+        self.__size = offset
+
+    def get(self, term: str, default: Optional[int] = None) -> Optional[int]:  # type: ignore
+        encoded = term.encode('utf-8')
+        entry = self.__arrays.get(len(encoded))
+        if entry is None:
+            return default
+        offset, array = entry
+        i = int(array.searchsorted(encoded))
+        if i == len(array) or array[i] != encoded:
+            return default
+        columns = self.__columns.get(len(encoded))
+        return int(columns[i]) if columns is not None else offset + i
+
+    def __getitem__(self, term: str) -> int:
+        column = self.get(term)
+        if column is None:
+            raise KeyError(term)
+        return column
+
+    def __iter__(self) -> Iterator[str]:
+        for _, array in self.__arrays.values():
+            for encoded in array:
+                yield encoded.decode('utf-8')
+
+    def __len__(self) -> int:
+        return self.__size
+
+
+class CompactFeaturizer:
+    """Fitted tfidf featurizer of a compacted model, mapping terms to features
+    through a SortedStringTable of the kept terms or the hash of a HASHING
+    featurizer, with idf weights stored as float32.
+    """
+
+    def __init__(self, vocabulary: Optional[SortedStringTable], n_features: int,
+                 sublinear_tf: bool, idf: Optional[np.ndarray], norm: Optional[str]) -> None:
+        self.vocabulary = vocabulary
+        self.n_features = n_features
+        self.sublinear_tf = sublinear_tf
+        self.idf = idf
+        self.norm = norm
+
+    def fit(self, documents: List[Any], labels: Any = None) -> 'CompactFeaturizer':
+        """Not supported, only defined since Pipeline requires its steps to
+        implement fit.
+
+        :raises TypeError: Always.
+        """
+        raise TypeError(_INFERENCE_ONLY)
+
+    def transform(self, documents: List[Any]) -> sp.csr_matrix:
+        """Transforms formated texts or their terms into normalized tfidf vectors.
+
+        :param documents: Formated texts or lists of terms.
+        :return: Sparse matrix of texts x features.
+        """
+        indptr = [0]
+        indices: List[int] = []
+        values: List[int] = []
+        for document in documents:
+            counts = count_features(analyze_terms(document), self.vocabulary, self.n_features)
+            indices.extend(counts.keys())
+            values.extend(counts.values())
+            indptr.append(len(indices))
+        matrix = sp.csr_matrix(
+            (np.asarray(values, dtype=np.float64), np.asarray(indices, dtype=np.int32), indptr),
+            shape=(len(documents), self.n_features))
+        if self.sublinear_tf:
+            matrix.data = np.log(matrix.data) + 1
+        if self.idf is not None:
+            matrix.data *= self.idf[matrix.indices]
+        if self.norm:
+            matrix = normalize(matrix, norm=self.norm, copy=False)
+        return matrix
+
+
+class CompactEstimator:
+    """Fitted linear estimator of a compacted model, with the weights of
+    each feature stored as float32, or as int8 with a scale per class.
+    """
+
+    def __init__(self, weights: np.ndarray, scale: Optional[np.ndarray], bias: np.ndarray,
+                 classes: np.ndarray, probabilistic: bool) -> None:
+        self.weights = weights
+        self.scale = scale
+        self.bias = bias
+        self.classes_ = classes
+        self.probabilistic = probabilistic
+
+    def fit(self, features: Any, labels: Any) -> 'CompactEstimator':
+        """Not supported, only defined since Pipeline requires its steps to
+        implement fit.
+
+        :raises TypeError: Always.
+        """
+        raise TypeError(_INFERENCE_ONLY)
+
+    def decision_function(self, features: sp.csr_matrix) -> np.ndarray:
+        """Scores featurized texts.
+
+        :param features: Sparse matrix of texts x features.
+        :return: Scores as texts x classes, or a score per text for binary models.
+        """
+        scores = features @ self.weights
+        if self.scale is not None:
+            scores *= self.scale
+        scores += self.bias
+        return scores.ravel() if scores.shape[1] == 1 else scores
+
+    def predict(self, features: sp.csr_matrix) -> np.ndarray:
+        """Predicts the labels of featurized texts.
+
+        :param features: Sparse matrix of texts x features.
+        :return: Labels.
+        """
+        scores = self.decision_function(features)
+        if scores.ndim == 1:
+            return self.classes_[(scores > 0).astype(int)]
+        return self.classes_[scores.argmax(axis=1)]
+
+    def predict_proba(self, features: sp.csr_matrix) -> np.ndarray:
+        """Predicts the class probabilities of featurized texts, only
+        supported for naive bayes.
+
+        :param features: Sparse matrix of texts x features.
+        :return: Probabilities as texts x classes.
+        :raises AttributeError: If the model is not naive bayes, the same
+                                as for an uncompacted linear model.
+        """
+        if not self.probabilistic:
+            raise AttributeError('Only compacted naive bayes models predict probabilities')
+        scores = self.decision_function(features)
+        likelihoods = np.exp(scores - scores.max(axis=1, keepdims=True))
+        return likelihoods / likelihoods.sum(axis=1, keepdims=True)
+
+
+def compact_models(featurizer: Pipeline, estimators: Dict[K, BaseEstimator], samples: int,
+                   compaction: Compaction
+                   ) -> Optional[Tuple[CompactFeaturizer, Dict[K, CompactEstimator]]]:
+    """Compacts a fitted tfidf featurizer and the linear or multinomial naive
+    bayes estimators sharing it. Terms found in fewer than min_df training
+    texts are pruned, and only the max_features most frequent terms are kept
+    if set. The document frequency of each term is derived from its idf.
+
+    :param featurizer: Fitted featurizer.
+    :param estimators: Fitted estimators using the featurizer, by key.
+    :param samples: Number of texts the featurizer was fitted on.
+    :param compaction: Compaction to apply.
+    :return: CompactFeaturizer and CompactEstimators by key, or None if not compactable.
+    """
+    if not isinstance(featurizer, Pipeline) or len(featurizer.steps) != 2:
+        return None
+    vectorizer, tfidf = (step for _, step in featurizer.steps)
+    if not isinstance(tfidf, TfidfTransformer) \
+            or not all(is_linear(estimator) for estimator in estimators.values()):
+        return None
+    idf = tfidf.idf_ if tfidf.use_idf else None
+    vocabulary: Optional[SortedStringTable] = None
+    if isinstance(vectorizer, CountVectorizer) and not vectorizer.binary:
+        columns = _select_columns(idf, len(vectorizer.vocabulary_), samples,
+                                  tfidf.smooth_idf, compaction)
+        vocabulary, columns = _compact_vocabulary(vectorizer.vocabulary_, columns)
+    elif (isinstance(vectorizer, HashingVectorizer) and not vectorizer.binary
+          and not vectorizer.alternate_sign and vectorizer.norm is None):
+        columns = np.arange(vectorizer.n_features)
+    else:
+        return None
+    compact_featurizer = CompactFeaturizer(
+        vocabulary=vocabulary,
+        n_features=len(columns),
+        sublinear_tf=tfidf.sublinear_tf,
+        idf=idf[columns].astype(np.float32) if idf is not None else None,
+        norm=tfidf.norm)
+    return compact_featurizer, {
+        key: _compact_estimator(estimator, columns, compaction.weight_type)
+        for key, estimator in estimators.items()}
+
+
+def map_vocabulary(featurizer: Any) -> Any:
+    """Replaces the vocabulary dict of a fitted COUNT featurizer with a
+    SortedStringTable of the same columns, which can be memory mapped from an
+    artifact file instead of being a private copy in every process. Pruned
+    stop words, which are only kept for inspection, are dropped. The fitted
+    featurizer itself is not modified.
+
+    :param featurizer: Fitted featurizer.
+    :return: Featurizer with a SortedStringTable vocabulary, or the featurizer
+             itself if it has no vocabulary dict.
+    """
+    if not isinstance(featurizer, Pipeline):
+        return featurizer
+    name, vectorizer = featurizer.steps[0]
+    if not isinstance(vectorizer, CountVectorizer) \
+            or not isinstance(getattr(vectorizer, 'vocabulary_', None), dict):
+        return featurizer
+    mapped = copy(vectorizer)
+    mapped.vocabulary_ = SortedStringTable(vectorizer.vocabulary_, vectorizer.vocabulary_)
+    mapped.stop_words_ = None
+    return Pipeline([(name, mapped)] + featurizer.steps[1:])
+
+
+def count_features(terms: List[str], vocabulary: Optional[Mapping[str, int]],
+                   n_features: int) -> Dict[int, int]:
+    """Counts the occurrences of each feature of a text, either through a
+    vocabulary, ignoring terms outside of it, or by the same hash as the
+    HASHING featurizer if there is no vocabulary.
+
+    :param terms: Terms of the text.
+    :param vocabulary: Columns by term, or None.
+    :param n_features: Number of features.
+    :return: Counts by feature column.
+    """
+    counts: Dict[int, int] = {}
+    if vocabulary is not None:
+        for term in terms:
+            column = vocabulary.get(term)
+            if column is not None:
+                counts[column] = counts.get(column, 0) + 1
+        return counts
+    for term in terms:
+        hashed_column = abs(murmurhash3_32(term, seed=0)) % n_features
+        counts[hashed_column] = counts.get(hashed_column, 0) + 1
+    return counts
+
+
+def _select_columns(idf: Optional[np.ndarray], n_features: int, samples: int,
+                    smooth_idf: bool, compaction: Compaction) -> np.ndarray:
+    """Selects the feature columns to keep. Without idf weights, the document
+    frequencies are unknown and all columns are kept.
+
+    :param idf: Idf weight of each feature, or None.
+    :param n_features: Number of features.
+    :param samples: Number of texts the featurizer was fitted on, unknown if 0.
+    :param smooth_idf: Whether the idf weights were smoothed.
+    :param compaction: Compaction to apply.
+    :return: Sorted columns to keep.
+    """
+    columns = np.arange(n_features)
+    if idf is None:
+        return columns
+    if samples > 0 and compaction.min_df > 1:
+        frequencies = _document_frequencies(idf, samples, smooth_idf)
+        columns = np.flatnonzero(frequencies >= compaction.min_df)
+    if 0 < compaction.max_features < len(columns):
+        most_frequent = np.argsort(idf[columns], kind='stable')[:compaction.max_features]
+        columns = np.sort(columns[most_frequent])
+    return columns
+
+
+def _document_frequencies(idf: np.ndarray, samples: int, smooth_idf: bool) -> np.ndarray:
+    """Derives the number of texts each term occurred in from its idf weight,
+    the inverse of idf = ln(n / df) + 1, with 1 added to n and df if smoothed.
+
+    :param idf: Idf weight of each feature.
+    :param samples: Number of texts the featurizer was fitted on.
+    :param smooth_idf: Whether the idf weights were smoothed.
+    :return: Document frequency of each feature.
+    """
+    if smooth_idf:
+        return np.rint((samples + 1) / np.exp(idf - 1) - 1)
+    return np.rint(samples / np.exp(idf - 1))
+
+
+def _compact_vocabulary(vocabulary: Dict[str, int], columns: np.ndarray
+                        ) -> Tuple[SortedStringTable, np.ndarray]:
+    """Stores the terms of the kept columns in a SortedStringTable.
+
+    :param vocabulary: Columns by term.
+    :param columns: Columns to keep.
+    :return: SortedStringTable.
+    :return: Previous column of each column of the table.
+    """
+    kept = np.zeros(len(vocabulary), dtype=bool)
+    kept[columns] = True
+    table = SortedStringTable(term for term, column in vocabulary.items() if kept[column])
+    previous = np.fromiter((vocabulary[term] for term in table), dtype=np.intp, count=len(table))
+    return table, previous
+
+
+def _compact_estimator(estimator: BaseEstimator, columns: np.ndarray,
+                       weight_type: WeightType) -> CompactEstimator:
+    """Keeps the weights of the kept columns of an estimator as float32, or
+    as int8 with a scale per class. With more than one class, the mean weight
+    of each feature is subtracted from its class weights first, which shifts
+    the scores of all classes of a text equally and so changes neither the
+    predicted class nor the class probabilities, but narrows the range of
+    the quantized weights.
+
+    :param estimator: Fitted linear or multinomial naive bayes estimator.
+    :param columns: Columns to keep.
+    :param weight_type: WeightType to store the weights as.
+    :return: CompactEstimator.
+    """
+    weights, bias = linear_weights(estimator)
+    weights = weights[columns]
+    if weights.shape[1] > 1:
+        weights = weights - weights.mean(axis=1, keepdims=True)
+    scale = None
+    if weight_type == WeightType.INT8:
+        scale = np.abs(weights).max(axis=0) / _INT8_MAX
+        scale[scale == 0] = 1.0
+        weights = np.rint(weights / scale).astype(np.int8)
+    else:
+        weights = weights.astype(np.float32)
+    return CompactEstimator(
+        weights=np.ascontiguousarray(weights),
+        scale=scale,
+        bias=np.asarray(bias, dtype=np.float64),
+        classes=estimator.classes_,
+        probabilistic=isinstance(estimator, MultinomialNB))
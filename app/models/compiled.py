@@ -0,0 +1,159 @@
+# Standard library
+from typing import List, Mapping, Optional
+
+# 3rd party modules
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
+from sklearn.feature_extraction.text import TfidfTransformer
+from sklearn.pipeline import Pipeline
+
+# Internal modules
+from .compact import CompactEstimator, CompactFeaturizer, count_features
+from .linear import is_linear, linear_weights
+
+
+class CompiledModel:
+    """Linear model compiled from a fitted featurizer and estimator pipeline,
+    predicting labels from the terms of a text without going through the
+    input validation, sparse matrix construction and estimator dispatch of
+    Pipeline.predict on every call.
+
+    Terms are mapped to features either through the vocabulary of a COUNT
+    featurizer or by the same hash as a HASHING featurizer. Each feature has
+    an idf weight and a weight per class, or a single weight for a binary
+    decision function, which are applied to the normalized tfidf vector of
+    the text. Quantized weights are multiplied by their scale per class. The
+    arrays are shared with the compiled pipeline, not copied.
+    """
+
+    def __init__(self, vocabulary: Optional[Mapping[str, int]], n_features: int,
+                 sublinear_tf: bool, idf: Optional[np.ndarray], norm: Optional[str],
+                 weights: np.ndarray, bias: np.ndarray, classes: np.ndarray,
+                 scale: Optional[np.ndarray] = None) -> None:
+        self.__vocabulary = vocabulary
+        self.__n_features = n_features
+        self.__sublinear_tf = sublinear_tf
+        self.__idf = idf
+        self.__norm = norm
+        self.__weights = weights
+        self.__bias = bias
+        self.__classes = classes
+        self.__scale = scale
+
+    def get_classes(self) -> np.ndarray:
+        """Gets the labels in the order of the columns of decision_scores.
+
+        :return: Labels.
+        """
+        return self.__classes
+
+    def predict(self, terms: List[List[str]]) -> List[str]:
+        """Predicts the labels of texts.
+
+        :param terms: Terms of each text to classify.
+        :return: Predicted labels.
+        """
+        return [self.__label(self.__score_one(text_terms)) for text_terms in terms]
+
+    def decision_scores(self, terms: List[List[str]]) -> np.ndarray:
+        """Computes the scores of texts, i.e. the decision function of a
+        linear model or the joint log likelihood of each class for naive bayes.
+
+        :param terms: Terms of each text to score.
+        :return: Scores as texts x classes, or texts x 1 for binary linear models.
+        """
+        return np.array([self.__score_one(text_terms) for text_terms in terms])
+
+    def __score_one(self, terms: List[str]) -> np.ndarray:
+        scores = self.__bias
+        counts = count_features(terms, self.__vocabulary, self.__n_features)
+        if counts:
+            columns = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+            values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+            if self.__sublinear_tf:
+                values = np.log(values) + 1
+            if self.__idf is not None:
+                values *= self.__idf[columns]
+            norm = self.__calc_norm(values)
+            if norm:
+                values /= norm
+            scores = values @ self.__weights[columns]
+            if self.__scale is not None:
+                scores = scores * self.__scale
+            scores = scores + self.__bias
+        return scores
+
+    def __label(self, scores: np.ndarray) -> str:
+        if len(scores) == 1:
+            return self.__classes[int(scores[0] > 0)]
+        return self.__classes[int(np.argmax(scores))]
+
+    def __calc_norm(self, values: np.ndarray) -> float:
+        if self.__norm == 'l2':
+            return float(np.sqrt(np.dot(values, values)))
+        if self.__norm == 'l1':
+            return float(np.abs(values).sum())
+        return 0.0
+
+
+def compile_model(model: Pipeline) -> Optional[CompiledModel]:
+    """Compiles a model pipeline with a tfidf featurizer and a linear or
+    multinomial naive bayes estimator, or a compacted one, into a CompiledModel.
+
+    :param model: Fitted model pipeline.
+    :return: CompiledModel or None if the pipeline cannot be compiled.
+    """
+    featurizer = model.named_steps.get('featurizer')
+    estimator = model.named_steps.get('classifier')
+    if isinstance(featurizer, CompactFeaturizer) and isinstance(estimator, CompactEstimator):
+        return _compile_compact(featurizer, estimator)
+    if not isinstance(featurizer, Pipeline) or len(featurizer.steps) != 2:
+        return None
+    vectorizer, tfidf = (step for _, step in featurizer.steps)
+    if not isinstance(tfidf, TfidfTransformer) or not is_linear(estimator):
+        return None
+    if isinstance(vectorizer, CountVectorizer) and not vectorizer.binary:
+        vocabulary: Optional[Mapping[str, int]] = vectorizer.vocabulary_
+        n_features = len(vectorizer.vocabulary_)
+    elif (isinstance(vectorizer, HashingVectorizer) and not vectorizer.binary
+          and not vectorizer.alternate_sign and vectorizer.norm is None):
+        vocabulary, n_features = None, vectorizer.n_features
+    else:
+        return None
+    weights, bias = linear_weights(estimator)
+    return CompiledModel(
+        vocabulary=vocabulary,
+        n_features=n_features,
+        sublinear_tf=tfidf.sublinear_tf,
+        idf=tfidf.idf_ if tfidf.use_idf else None,
+        norm=tfidf.norm,
+        weights=weights,
+        bias=bias,
+        classes=estimator.classes_)
+
+
+def verify_compiled(compiled: CompiledModel, terms: List[List[str]],
+                    expected: List[str]) -> int:
+    """Compares the labels predicted by a compiled model with the ones
+    predicted by the pipeline it was compiled from.
+
+    :param compiled: CompiledModel.
+    :param terms: Terms of each text to predict.
+    :param expected: Labels predicted by the pipeline.
+    :return: Number of texts with a different label.
+    """
+    return sum(1 for label, expected_label in zip(compiled.predict(terms), expected)
+               if label != expected_label)
+
+
+def _compile_compact(featurizer: CompactFeaturizer, estimator: CompactEstimator) -> CompiledModel:
+    return CompiledModel(
+        vocabulary=featurizer.vocabulary,
+        n_features=featurizer.n_features,
+        sublinear_tf=featurizer.sublinear_tf,
+        idf=featurizer.idf,
+        norm=featurizer.norm,
+        weights=estimator.weights,
+        bias=estimator.bias,
+        classes=estimator.classes_,
+        scale=estimator.scale)
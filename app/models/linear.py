@@ -0,0 +1,36 @@
+# Standard library
+from typing import Tuple
+
+# 3rd party modules
+import numpy as np
+from sklearn.base import BaseEstimator
+from sklearn.naive_bayes import MultinomialNB
+
+
+def is_linear(estimator: BaseEstimator) -> bool:
+    """Checks if an estimator scores texts by a linear function of their
+    features, i.e. a linear model or multinomial naive bayes.
+
+    :param estimator: Fitted estimator.
+    :return: Boolean.
+    """
+    if isinstance(estimator, MultinomialNB):
+        return True
+    return hasattr(estimator, 'coef_') and hasattr(estimator, 'intercept_') \
+        and hasattr(estimator, 'decision_function')
+
+
+def linear_weights(estimator: BaseEstimator) -> Tuple[np.ndarray, np.ndarray]:
+    """Gets the weights of each feature and the bias of a linear estimator,
+    as used to compute its decision function. Naive bayes scores each class
+    by the log probability of the features given the class plus its prior.
+    The weights are a transposed view of the fitted arrays, not a copy, so
+    memory mapped arrays stay mapped.
+
+    :param estimator: Fitted estimator.
+    :return: Weights as features x classes, or features x 1 for binary models.
+    :return: Bias per class, or a single bias for binary models.
+    """
+    if isinstance(estimator, MultinomialNB):
+        return estimator.feature_log_prob_.T, estimator.class_log_prior_
+    return estimator.coef_.T, np.asarray(estimator.intercept_)
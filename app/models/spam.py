@@ -1,5 +1,4 @@
 # Standard library
-import re
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
@@ -7,6 +6,7 @@ from typing import Dict, Optional
 
 # Internal modules
 from app import db
+from .text import format_text
 
 
 class Label(Enum):
@@ -87,16 +87,3 @@ class ResultSample(db.Model):  # type: ignore
             self.is_confirmed,
             self.created_at,
         )
-
-
-# Regex for identifiying URLs.
-_URL_PATTERN = re.compile(r"(https?|ftp):\/\/[\.[a-zA-Z0-9\/\-]+")
-
-
-def format_text(original: str) -> str:
-    """Strips an original string of URLs, double, leading and trailing spaces.
-
-    :param original: String to format.
-    :return: Formated string.
-    """
-    return _URL_PATTERN.sub("", original).replace("  ", " ").strip().lower()
@@ -0,0 +1,78 @@
+# Standard library
+import re
+from collections import namedtuple
+from typing import Iterable, List, Union
+
+# 3rd party modules
+from stop_words import get_stop_words
+
+
+# Regex for identifiying URLs.
+_URL_PATTERN = re.compile(r"(https?|ftp):\/\/[\.[a-zA-Z0-9\/\-]+")
+
+# Regex for identifiying terms, same as the default token pattern of sklearn.
+_TERM_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+_STOP_WORDS = frozenset(get_stop_words("english"))
+
+
+TokenizedText = namedtuple('TokenizedText', ['text', 'words', 'terms'])
+
+
+def format_text(original: str) -> str:
+    """Strips an original string of URLs, double, leading and trailing spaces.
+
+    :param original: String to format.
+    :return: Formated string.
+    """
+    return _URL_PATTERN.sub("", original).replace("  ", " ").strip().lower()
+
+
+def tokenize(text: str) -> TokenizedText:
+    """Tokenizes a formated text into whitespace separated words, used by the
+    cashtag rule, and terms without stop words, used by the featurizers.
+
+    :param text: Formated text.
+    :return: TokenizedText.
+    """
+    terms = [term for term in _TERM_PATTERN.findall(text) if term not in _STOP_WORDS]
+    return TokenizedText(text=text, words=text.split(), terms=terms)
+
+
+def normalize(original: str) -> TokenizedText:
+    """Formats and tokenizes an original string.
+
+    :param original: String to normalize.
+    :return: TokenizedText.
+    """
+    return tokenize(format_text(original))
+
+
+def tokenize_all(texts: Iterable[str]) -> List[TokenizedText]:
+    """Tokenizes a batch of formated texts.
+
+    :param texts: Formated texts.
+    :return: List of TokenizedText in the same order as the texts.
+    """
+    return [tokenize(text) for text in texts]
+
+
+def normalize_all(originals: Iterable[str]) -> List[TokenizedText]:
+    """Formats and tokenizes a batch of original strings.
+
+    :param originals: Strings to normalize.
+    :return: List of TokenizedText in the same order as the strings.
+    """
+    return [tokenize(format_text(original)) for original in originals]
+
+
+def analyze_terms(doc: Union[str, List[str]]) -> List[str]:
+    """Featurizer analyzer, accepts either terms that have already been
+    tokenized or a formated text to tokenize.
+
+    :param doc: Terms or formated text.
+    :return: Terms.
+    """
+    if isinstance(doc, str):
+        return tokenize(doc).terms
+    return doc
@@ -1,3 +1,9 @@
 from .model_repo import ModelRepo
+from .model_repo import ModelSet
 from .training_data_repo import TrainingDataRepo
+from .training_data_repo import CorpusMarker
+from .training_data_repo import TEST_SPLIT, hash_id, is_test_sample
 from .sample_repo import SampleRepo
+from .artifact_repo import ArtifactRepo
+from .artifact_repo import PublishedModels
+from .artifact_repo import TunedParams
@@ -0,0 +1,229 @@
+# Standard library
+import fcntl
+import json
+import logging
+import os
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+# 3rd party modules
+from sklearn.base import BaseEstimator
+from sklearn.pipeline import Pipeline
+try:
+    import joblib
+except ImportError:
+    from sklearn.externals import joblib
+
+# Internal modules
+from app.config import MODEL_ARTIFACT_DIR, MODEL_MMAP, SERVICE_VERSION
+from app.models import Classifier, map_vocabulary
+
+
+_ARTIFACT_SUFFIX = '.joblib'
+_FEATURIZER_PREFIX = 'featurizer-'
+_LOCK_FILE = 'artifacts.lock'
+_PUBLISHED_FILE = 'published.json'
+_TUNED_PARAMS_FILE = 'tuned-params.json'
+
+
+PublishedModels = namedtuple('PublishedModels', [
+    'featurizer_hash', 'model_hashes', 'compiled_hashes', 'corpus_marker'])
+TunedParams = namedtuple('TunedParams', ['featurizer_type', 'featurizer', 'models', 'scores'])
+
+
+class ArtifactRepo:
+    """Disk store of trained models and their metadata, keyed by model hash.
+    Artifacts are kept per service version since pickled models are not
+    guaranteed to be compatible between releases.
+
+    Numpy arrays are stored uncompressed next to the pickled objects. When
+    memory mapping is enabled they are mapped read-only from the artifact file
+    on load, so that processes loading the same artifact share the pages of
+    the page cache instead of each holding a private copy. Featurizers are then
+    stored with their vocabulary as arrays as well, as a dict of terms could
+    not be mapped.
+    """
+
+    __log = logging.getLogger('ArtifactRepo')
+
+    def __init__(self, artifact_dir: str = MODEL_ARTIFACT_DIR, mmap: bool = MODEL_MMAP) -> None:
+        self.__dir = os.path.join(artifact_dir, SERVICE_VERSION)
+        self.__mmap_mode = 'r' if mmap else None
+
+    def is_memory_mapped(self) -> bool:
+        """Checks if loaded artifacts are memory mapped.
+
+        :return: Boolean.
+        """
+        return self.__mmap_mode is not None
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Holds an exclusive lock on the artifacts, shared by every process
+        using the same artifact dir, such as the workers of a uwsgi master.
+        """
+        os.makedirs(self.__dir, exist_ok=True)
+        with open(os.path.join(self.__dir, _LOCK_FILE), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def find(self, model_hash: str) -> Optional[Tuple[BaseEstimator, Classifier]]:
+        """Loads a stored prediction model and its metadata if an artifact exists.
+
+        :param model_hash: Hash of the model to load.
+        :return: Trained model and Classifier metadata or None if not found.
+        """
+        artifact = self.__load(model_hash)
+        if artifact is None:
+            return None
+        return artifact['model'], Classifier(**artifact['classifier'])
+
+    def save(self, model: BaseEstimator, classifier: Classifier) -> None:
+        """Stores a trained prediction model and its metadata.
+
+        :param model: Trained model.
+        :param classifier: Classifier metadata of the model.
+        """
+        artifact = {'model': model, 'classifier': _classifier_todict(classifier)}
+        self.__store(classifier.model_hash, artifact)
+
+    def find_featurizer(self, featurizer_hash: str) -> Optional[Pipeline]:
+        """Loads a stored featurizer if an artifact exists.
+
+        :param featurizer_hash: Hash of the data the featurizer was fitted on.
+        :return: Fitted featurizer or None if not found.
+        """
+        return self.__load(_FEATURIZER_PREFIX + featurizer_hash)
+
+    def save_featurizer(self, featurizer_hash: str, featurizer: Pipeline) -> None:
+        """Stores a fitted featurizer. When memory mapping is enabled, its
+        vocabulary is stored as arrays that can be mapped on load.
+
+        :param featurizer_hash: Hash of the data the featurizer was fitted on.
+        :param featurizer: Fitted featurizer.
+        """
+        if self.is_memory_mapped():
+            featurizer = map_vocabulary(featurizer)
+        self.__store(_FEATURIZER_PREFIX + featurizer_hash, featurizer)
+
+    def publish(self, featurizer_hash: str, classifiers: Iterable[Classifier],
+                compiled_hashes: Iterable[str] = (), corpus_marker: str = '') -> None:
+        """Marks stored models as the latest ones to be served.
+
+        :param featurizer_hash: Hash of the featurizer shared by the models.
+        :param classifiers: Classifier metadata of the models.
+        :param compiled_hashes: Hashes of the models verified to compile.
+        :param corpus_marker: Marker of the training data the models were trained on.
+        """
+        published = {
+            'featurizer_hash': featurizer_hash,
+            'model_hashes': {c.type: c.model_hash for c in classifiers},
+            'compiled_hashes': sorted(compiled_hashes),
+            'corpus_marker': corpus_marker,
+        }
+        self.__store_json(_PUBLISHED_FILE, published)
+
+    def find_published(self) -> Optional[PublishedModels]:
+        """Gets the hashes of the latest published models.
+
+        :return: PublishedModels or None if no models are published.
+        """
+        published = self.__load_json(_PUBLISHED_FILE)
+        if published is None:
+            return None
+        try:
+            return PublishedModels(published['featurizer_hash'], published['model_hashes'],
+                                   published.get('compiled_hashes', []),
+                                   published.get('corpus_marker', ''))
+        except KeyError as e:
+            self.__log.warning(f'Could not read published models: missing {e}')
+            return None
+
+    def save_params(self, params: TunedParams) -> None:
+        """Stores the best hyperparameters found by tuning, used when
+        training models from then on.
+
+        :param params: TunedParams.
+        """
+        self.__store_json(_TUNED_PARAMS_FILE, params._asdict())
+
+    def find_params(self) -> Optional[TunedParams]:
+        """Gets the stored hyperparameters found by tuning.
+
+        :return: TunedParams or None if models have not been tuned.
+        """
+        params = self.__load_json(_TUNED_PARAMS_FILE)
+        if params is None:
+            return None
+        try:
+            return TunedParams(**params)
+        except TypeError as e:
+            self.__log.warning(f'Could not read tuned params: {e}')
+            return None
+
+    def __load(self, name: str) -> Optional[Any]:
+        path = self.__path(name)
+        if not os.path.isfile(path):
+            return None
+        try:
+            return joblib.load(path, mmap_mode=self.__mmap_mode)
+        except Exception as e:
+            self.__log.warning(f'Could not load model artifact {path}: {e}')
+            return None
+
+    def __store(self, name: str, artifact: Any) -> None:
+        path = self.__path(name)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(self.__dir, exist_ok=True)
+            joblib.dump(artifact, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.__log.warning(f'Could not store model artifact {path}: {e}')
+
+    def __load_json(self, filename: str) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self.__dir, filename)
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.__log.warning(f'Could not read {path}: {e}')
+            return None
+
+    def __store_json(self, filename: str, content: Dict[str, Any]) -> None:
+        path = os.path.join(self.__dir, filename)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(self.__dir, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump(content, f, sort_keys=True)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.__log.warning(f'Could not write {path}: {e}')
+
+    def __path(self, name: str) -> str:
+        return os.path.join(self.__dir, name + _ARTIFACT_SUFFIX)
+
+
+def _classifier_todict(classifier: Classifier) -> Dict[str, Any]:
+    """Converts Classifier metadata to a dict that can be stored
+    independently of the database session.
+
+    :param classifier: Classifier to convert.
+    :return: Classifier fields as dict.
+    """
+    return {
+        'type': classifier.type,
+        'training_samples': classifier.training_samples,
+        'test_samples': classifier.test_samples,
+        'accuracy': classifier.accuracy,
+        'model_hash': classifier.model_hash,
+        'parent_hash': classifier.parent_hash,
+        'last_sample_id': classifier.last_sample_id,
+    }
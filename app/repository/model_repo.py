@@ -1,23 +1,31 @@
 # Standard libarary
 import logging
+from threading import Lock
+from typing import Dict, List, Optional
 
 # 3rd party modules
+from sqlalchemy import desc
 from sklearn.pipeline import Pipeline
 
 # Internal modules
 from app import db
-from app.models import Classifier, ModelType
+from app.models import Classifier, CompiledModel, ModelType
 
 
-class ModelRepo:
-
-    __log = logging.getLogger('ModelRepo')
+class ModelSet:
+    """Models in service at one point in time, never modified. Replacing
+    models creates a new ModelSet, so a caller that gets the set once and
+    uses it throughout a classification sees the models, their hashes and
+    their compiled versions of the same point in time.
+    """
 
-    def __init__(self, svm_model: Pipeline, nb_model: Pipeline) -> None:
-        self.__models = {
-            ModelType.SVM: svm_model,
-            ModelType.NAIVE_BAYES: nb_model
-        }
+    def __init__(self, featurizer: Pipeline, models: Dict[ModelType, Pipeline],
+                 classifiers: Dict[ModelType, Classifier],
+                 compiled: Dict[ModelType, CompiledModel]) -> None:
+        self.__featurizer = featurizer
+        self.__models = models
+        self.__classifiers = classifiers
+        self.__compiled = compiled
 
     def get_spam_classifier(self, type: ModelType = ModelType.SVM) -> Pipeline:
         """Gets spam classification model.
@@ -27,6 +35,111 @@ class ModelRepo:
         """
         return self.__models[type]
 
+    def get_compiled_model(self, type: ModelType = ModelType.SVM) -> Optional[CompiledModel]:
+        """Gets the compiled version of a spam classification model.
+
+        :param type: Model type to use.
+        :return: CompiledModel or None if the model is not compiled.
+        """
+        return self.__compiled.get(type)
+
+    def get_model_hash(self, type: ModelType = ModelType.SVM) -> str:
+        """Gets the hash identifying a spam classification model.
+
+        :param type: Model type to use.
+        :return: Model hash, empty if the model has no metadata.
+        """
+        classifier = self.__classifiers.get(type)
+        return classifier.model_hash if classifier else ''
+
+    def get_model_types(self) -> List[ModelType]:
+        """Gets the types of the models in the set.
+
+        :return: List of ModelTypes.
+        """
+        return list(self.__models.keys())
+
+    def replace(self, featurizer: Optional[Pipeline], models: Dict[ModelType, Pipeline],
+                classifiers: Dict[ModelType, Classifier],
+                compiled: Dict[ModelType, CompiledModel]) -> 'ModelSet':
+        """Creates a new ModelSet with the models of the given types replaced.
+        Compiled versions of the replaced models are dropped unless given.
+
+        :param featurizer: New shared featurizer, or None to keep the current one.
+        :param models: New spam classification models by type.
+        :param classifiers: Classifier metadata of the new models by type.
+        :param compiled: Compiled versions of the new models by type.
+        :return: New ModelSet.
+        """
+        new_models = dict(self.__models)
+        new_models.update(models)
+        new_classifiers = dict(self.__classifiers)
+        new_classifiers.update(classifiers)
+        new_compiled = {type: model for type, model in self.__compiled.items()
+                        if type not in models}
+        new_compiled.update(compiled)
+        return ModelSet(featurizer if featurizer is not None else self.__featurizer,
+                        new_models, new_classifiers, new_compiled)
+
+
+class ModelRepo:
+
+    __log = logging.getLogger('ModelRepo')
+
+    def __init__(self, featurizer: Pipeline, models: Dict[ModelType, Pipeline],
+                 classifiers: Optional[Dict[ModelType, Classifier]] = None,
+                 compiled: Optional[Dict[ModelType, CompiledModel]] = None) -> None:
+        self.__models = ModelSet(featurizer, models, classifiers if classifiers else {},
+                                 compiled if compiled else {})
+        self.__lock = Lock()
+
+    def get_models(self) -> ModelSet:
+        """Gets the models in service. The set is replaced as a whole when
+        models are replaced, so callers should get it once per classification.
+
+        :return: ModelSet.
+        """
+        return self.__models
+
+    def set_model(self, type: ModelType, model: Pipeline, classifier: Classifier) -> None:
+        """Replaces the model of a given type. Callers that already hold
+        the previous models keep using them until they are done.
+
+        :param type: Model type to replace.
+        :param model: New spam classification model.
+        :param classifier: Classifier metadata of the new model.
+        """
+        with self.__lock:
+            self.__models = self.__models.replace(None, {type: model}, {type: classifier}, {})
+
+    def set_models(self, featurizer: Pipeline, models: Dict[ModelType, Pipeline],
+                   classifiers: Dict[ModelType, Classifier],
+                   compiled: Optional[Dict[ModelType, CompiledModel]] = None) -> None:
+        """Replaces the shared featurizer and the models of the given types
+        with a single swap of the ModelSet in service. Callers that already
+        hold the previous models keep using them until they are done.
+
+        :param featurizer: New shared featurizer.
+        :param models: New spam classification models by type.
+        :param classifiers: Classifier metadata of the new models by type.
+        :param compiled: Compiled versions of the new models by type, if any.
+        """
+        with self.__lock:
+            self.__models = self.__models.replace(
+                featurizer, models, classifiers, compiled if compiled else {})
+
+    def find_latest_classifiers(self, type: ModelType, limit: int = 10) -> List[Classifier]:
+        """Gets the most recently saved classifiers of a given type.
+
+        :param type: Model type to find.
+        :param limit: Max number of classifiers to return.
+        :return: Classifiers, newest first.
+        """
+        return Classifier.query.\
+            filter(Classifier.type == type.value).\
+            order_by(desc(Classifier.created_at)).\
+            limit(limit).all()
+
     def save_classifier(self, classifier: Classifier) -> None:
         """Saves a classifier in the database.
 
@@ -37,6 +150,8 @@ class ModelRepo:
             return
         db.session.add(classifier)
         db.session.commit()
+        db.session.refresh(classifier)
+        db.session.expunge(classifier)
 
     def __classifier_exists(self, classifier: Classifier) -> bool:
         existing_classifiers = Classifier.query.\
@@ -1,34 +1,97 @@
 # Standard library
+import atexit
 import logging
+import os
 import sys
+import time
+from datetime import datetime
+from queue import Empty, Full, Queue
 from random import random
+from threading import Event, Lock, Thread
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 # Internal modules
-from app import db
-from app.config import RESULT_SAMPLE_RATE
+from app import db, metrics
+from app.config import RESULT_SAMPLE_RATE, TRAINING_DATA_BATCH_SIZE
+from app.config import SAMPLE_FLUSH_INTERVAL, SAMPLE_FLUSH_SIZE, SAMPLE_QUEUE_SIZE
 from app.models import SpamResult, ResultSample
 
 
 class SampleRepo:
+    """Stores sampled classification results. Samples are queued in memory
+    and written by a background thread with one multi-row insert per batch,
+    so that classification requests never wait on the database.
+    """
 
     _log = logging.getLogger("")
 
-    def __init__(self):
+    def __init__(self, queue_size: int = SAMPLE_QUEUE_SIZE,
+                 flush_size: int = SAMPLE_FLUSH_SIZE,
+                 flush_interval: float = SAMPLE_FLUSH_INTERVAL) -> None:
         self._sample_rate: float = RESULT_SAMPLE_RATE
         if self._sample_rate > 1.0:
             self._log.error(f"Sample rate is {self._sample_rate}. Max is 1.0")
             sys.exit(1)
+        self._queue_size = queue_size
+        self._flush_size = flush_size
+        self._flush_interval = flush_interval
+        self._queue: Queue = Queue(maxsize=queue_size)
+        self._stopped = Event()
+        self._lock = Lock()
+        self._writer: Optional[Thread] = None
+        self._writer_pid: Optional[int] = None
+        self._dropped = 0
+        atexit.register(self.close)
 
     def save(self, res: SpamResult, text: str) -> None:
         """Optionaly adds a classified sample derived from a candidate.
+        The sample is dropped if the write queue is full.
 
         :param res: SpamResult to convert.
         :param text: Classified text.
         """
-        if self._should_sample():
-            sample = ResultSample.from_result(res, text)
-            db.session.add(sample)
-            db.session.commit()
+        if not self._should_sample():
+            return
+        with metrics.time_stage(metrics.SAMPLE_WRITE):
+            self._ensure_writer()
+            row = {
+                "text": text,
+                "label": res.label,
+                "reason": res.reason,
+                "is_confirmed": False,
+                "created_at": datetime.utcnow(),
+            }
+            try:
+                self._queue.put_nowait(row)
+            except Full:
+                self._count_dropped(1)
+
+    def close(self) -> None:
+        """Stops the background writer and writes all queued samples."""
+        self._stopped.set()
+        writer = self._writer
+        if writer is not None and writer.is_alive():
+            writer.join()
+        self._write(self._take_batch(self._queue_size, block=False))
+
+    def stream_confirmed(self, label: str, last_id: int = 0,
+                         chunk_size: int = TRAINING_DATA_BATCH_SIZE
+                         ) -> Iterator[Tuple[int, str]]:
+        """Streams the id and text of samples confirmed to have a given label,
+        stored after a given sample, oldest first.
+
+        :param label: Confirmed label.
+        :param last_id: Id of the last already seen sample.
+        :param chunk_size: Number of rows fetched per round trip.
+        :return: Iterator of id and text tuples.
+        """
+        query = db.session.query(ResultSample.id, ResultSample.text).\
+            filter(ResultSample.id > last_id).\
+            filter_by(is_confirmed=True, label=label).\
+            order_by(ResultSample.id).\
+            execution_options(stream_results=True).\
+            yield_per(chunk_size)
+        return iter(query)
 
     def _should_sample(self) -> bool:
         """Determines if a sample should be created and saved.
@@ -37,3 +100,67 @@ class SampleRepo:
         """
         return random() < self._sample_rate
 
+    def _ensure_writer(self) -> None:
+        """Starts the background writer in the current process if not running.
+        Threads do not survive a fork, so each worker process starts its own.
+        """
+        pid = os.getpid()
+        if self._writer_pid == pid:
+            return
+        with self._lock:
+            if self._writer_pid == pid:
+                return
+            if self._writer_pid is not None:
+                self._queue = Queue(maxsize=self._queue_size)
+            self._writer = Thread(target=self._run, name="SampleWriter", daemon=True)
+            self._writer.start()
+            self._writer_pid = pid
+
+    def _run(self) -> None:
+        """Writes queued samples in batches until stopped."""
+        while not self._stopped.is_set():
+            self._write(self._take_batch(self._flush_size, block=True))
+
+    def _take_batch(self, max_size: int, block: bool) -> List[Dict[str, Any]]:
+        """Takes up to max_size samples from the queue. When blocking, waits
+        at most the flush interval for the batch to fill up.
+
+        :param max_size: Max number of samples to take.
+        :param block: Wait for samples to be queued.
+        :return: List of sample rows.
+        """
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self._flush_interval
+        while len(batch) < max_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if block and timeout > 0:
+                    batch.append(self._queue.get(timeout=timeout))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        """Inserts a batch of samples with a single statement.
+
+        :param batch: List of sample rows.
+        """
+        if not batch:
+            return
+        try:
+            with metrics.time_stage(metrics.SAMPLE_FLUSH), db.engine.begin() as conn:
+                conn.execute(ResultSample.__table__.insert().values(batch))
+            metrics.RESULT_SAMPLES.labels("written").inc(len(batch))
+        except Exception as e:
+            self._log.error(f"Failed to write {len(batch)} samples: {e}")
+            self._count_dropped(len(batch))
+
+    def _count_dropped(self, count: int) -> None:
+        metrics.RESULT_SAMPLES.labels("dropped").inc(count)
+        with self._lock:
+            self._dropped += count
+            dropped = self._dropped
+        if dropped == count or dropped % 1000 < count:
+            self._log.warning(f"Dropped {dropped} result samples in total")
@@ -1,15 +1,49 @@
 # Standard library
 from abc import ABCMeta, abstractmethod
-from typing import List
+from collections import namedtuple
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, Tuple
 
 # 3rd party modules
-from sqlalchemy import desc
+from sqlalchemy import and_, func, or_
 
 # Internal modules
 from app import db
+from app.config import TRAINING_DATA_BATCH_SIZE
 from app.models import TrainingData
 
 
+# One in how many training data samples is used for testing.
+TEST_SPLIT = 5
+
+# Knuth's multiplicative hash, spreading consecutive ids evenly.
+_ID_HASH_MULTIPLIER = 2654435761
+_ID_HASH_MODULUS = 2 ** 32
+
+
+CorpusMarker = namedtuple('CorpusMarker', ['rows', 'max_id'])
+
+
+def hash_id(id: int) -> int:
+    """Hashes the id of a training data sample the same way as the database
+    does in TrainingDataRepo.stream_split.
+
+    :param id: Id of a training data sample.
+    :return: Hash.
+    """
+    return id * _ID_HASH_MULTIPLIER % _ID_HASH_MODULUS
+
+
+def is_test_sample(id: int) -> bool:
+    """Checks if a training data sample is in the test split, the same way
+    as the database does in TrainingDataRepo.stream_split.
+
+    :param id: Id of a training data sample.
+    :return: Boolean.
+    """
+    return hash_id(id) % TEST_SPLIT == 0
+
+
 class TrainingDataRepo:
 
     def save(self, training_data: TrainingData) -> None:
@@ -20,9 +54,83 @@ class TrainingDataRepo:
         db.session.add(training_data)
         db.session.commit()
 
-    def get_all(self) -> List[TrainingData]:
-        """Gets spam classification model.
+    def save_all(self, rows: Iterable[Dict[str, Any]],
+                 batch_size: int = TRAINING_DATA_BATCH_SIZE) -> int:
+        """Stores training data samples in batches, using one multi-row
+        insert and transaction per batch.
 
-        :return: List of training data.
+        :param rows: Training data rows as dicts of column values.
+        :param batch_size: Max number of rows per insert.
+        :return: Number of stored rows.
         """
-        return TrainingData.query.order_by(desc(TrainingData.created_at))
+        stored = 0
+        iterator = iter(rows)
+        batch = list(islice(iterator, batch_size))
+        while batch:
+            with db.engine.begin() as conn:
+                conn.execute(TrainingData.__table__.insert().values(batch))
+            stored += len(batch)
+            batch = list(islice(iterator, batch_size))
+        return stored
+
+    def find_corpus_marker(self) -> CorpusMarker:
+        """Gets the number of training data samples and the highest id,
+        which change whenever samples are added, without reading the samples.
+
+        :return: CorpusMarker.
+        """
+        rows, max_id = db.session.query(
+            func.count(TrainingData.id), func.max(TrainingData.id)).one()
+        return CorpusMarker(rows, max_id or 0)
+
+    def stream_since(self, last_id: int, chunk_size: int = TRAINING_DATA_BATCH_SIZE
+                     ) -> Iterator[Tuple[int, str, str]]:
+        """Streams the id, text and label of training data added after
+        a given sample, oldest first.
+
+        :param last_id: Id of the last already seen sample.
+        :param chunk_size: Number of rows fetched per round trip.
+        :return: Iterator of id, text and label tuples.
+        """
+        query = db.session.query(TrainingData.id, TrainingData.text, TrainingData.label).\
+            filter(TrainingData.id > last_id).\
+            order_by(TrainingData.id).\
+            execution_options(stream_results=True).\
+            yield_per(chunk_size)
+        return iter(query)
+
+    def stream_split(self, training_cap: int = 0, test_cap: int = 0,
+                     chunk_size: int = TRAINING_DATA_BATCH_SIZE
+                     ) -> Iterator[Tuple[int, str, str, bool]]:
+        """Streams the id, text and label of training data, oldest first, and
+        whether the sample is in the test split. The split is computed in the
+        database. A sample is in the test split when the hash of its id is
+        divisible by TEST_SPLIT, so it keeps its split as samples are added.
+        If capped, only the samples of each label with the lowest id hashes
+        are streamed, which is a reproducible stratified sample.
+
+        :param training_cap: Max number of training samples per label, all if 0.
+        :param test_cap: Max number of test samples per label, all if 0.
+        :param chunk_size: Number of rows fetched per round trip.
+        :return: Iterator of id, text, label and is test tuples.
+        """
+        id_hash: Any = TrainingData.id * _ID_HASH_MULTIPLIER % _ID_HASH_MODULUS
+        is_test = (id_hash % TEST_SPLIT == 0).label('is_test')
+        columns = [TrainingData.id, TrainingData.text, TrainingData.label, is_test]
+        if training_cap or test_cap:
+            rank = func.row_number().over(
+                partition_by=(id_hash % TEST_SPLIT == 0, TrainingData.label),
+                order_by=id_hash)
+            ranked = db.session.query(*columns, rank.label('rank')).subquery()
+            query = db.session.query(ranked.c.id, ranked.c.text, ranked.c.label,
+                                     ranked.c.is_test).\
+                filter(or_(and_(ranked.c.is_test, _within_cap(ranked.c.rank, test_cap)),
+                           and_(~ranked.c.is_test, _within_cap(ranked.c.rank, training_cap)))).\
+                order_by(ranked.c.id)
+        else:
+            query = db.session.query(*columns).order_by(TrainingData.id)
+        return iter(query.execution_options(stream_results=True).yield_per(chunk_size))
+
+
+def _within_cap(rank: Any, cap: int) -> Any:
+    return rank <= cap if cap else rank > 0
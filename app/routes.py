@@ -7,7 +7,7 @@ from flasgger import swag_from
 from flask import jsonify, make_response
 
 # Internal modules
-from app import app
+from app import app, metrics
 from app import controllers
 from app.controllers import classification, training_data
 from app.controllers import status, errors
@@ -20,6 +20,13 @@ def classify_spam() -> flask.Response:
     return _create_response(result)
 
 
+@app.route("/v1/classify/batch", methods=["POST"])
+@swag_from("swagger/v1-classify-batch.yml")
+def classify_spam_batch() -> flask.Response:
+    result, status = classification.is_spam_batch()
+    return _create_response(result, status)
+
+
 @app.route("/v1/training-data", methods=["POST"])
 @swag_from("swagger/v1-training-data.yml")
 def add_training_data() -> flask.Response:
@@ -27,12 +34,37 @@ def add_training_data() -> flask.Response:
     return _create_ok_response()
 
 
+@app.route("/v1/training-data/bulk", methods=["POST"])
+@swag_from("swagger/v1-training-data-bulk.yml")
+def add_training_data_bulk() -> flask.Response:
+    result = training_data.add_training_data_bulk()
+    return _create_response(result)
+
+
 @app.route("/health", methods=["GET"])
 def check_health() -> flask.Response:
     result, status = controllers.health_check.check_health()
     return _create_response(result, status)
 
 
+@app.route("/health/live", methods=["GET"])
+def check_liveness() -> flask.Response:
+    result, status = controllers.health_check.check_liveness()
+    return _create_response(result, status)
+
+
+@app.route("/health/ready", methods=["GET"])
+def check_readiness() -> flask.Response:
+    result, status = controllers.health_check.check_readiness()
+    return _create_response(result, status)
+
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics() -> flask.Response:
+    body, content_type = metrics.export()
+    return make_response(body, status.HTTP_200_OK, {"Content-Type": content_type})
+
+
 def _create_response(
     result: Dict[str, Any], status: int = status.HTTP_200_OK
 ) -> flask.Response:
@@ -1,28 +1,213 @@
+# Standard library
+import logging
+from typing import List, Optional
+
 # Internal modules
-from app.config import TRAIN_MODEL
-from app.models import ModelType
-from .training_service import TrainingService
+from app.config import FEATURIZER, TRAIN_MODEL
+from app.config import INCREMENTAL_MODEL, INCREMENTAL_UPDATE_INTERVAL
+from app.config import MODEL_RELOAD_INTERVAL, MODEL_LOAD_RETRIES, MODEL_LOAD_RETRY_DELAY
+from app.config import MODEL_COMPACTION, COMPACTION_MIN_DF, COMPACTION_MAX_FEATURES
+from app.config import COMPACTION_WEIGHTS
+from app.config import KNOWN_TEXT_LOOKUP, KNOWN_TEXT_UPDATE_INTERVAL
+from app.config import NEAR_DUPLICATE_INDEX, NEAR_DUPLICATE_THRESHOLD
+from app.config import NEAR_DUPLICATE_UPDATE_INTERVAL
+from app.models import Compaction, FeaturizerType, ModelType, WeightType
+from .cascade import CascadeReport
+from .training_service import CompactionReport, TrainingService
+from .incremental_service import IncrementalTrainingService
+from .reload_service import ModelReloadService, PublishedModelLoader
 from .classification_service import ClassifcationService
-from app.repository import TrainingDataRepo
-from app.repository import ModelRepo
+from .known_text_index import KnownTextIndex
+from .known_text_service import KnownTextService
+from .near_duplicate_index import NearDuplicateIndex
+from .near_duplicate_service import NearDuplicateService
+from .scheduler import BackgroundTask, PeriodicTask, start_in_workers
+from .memory import freeze_objects
+from app.repository import ArtifactRepo, SampleRepo, TrainingDataRepo
+from app.repository import ModelRepo, TunedParams
+
+
+_log = logging.getLogger(__name__)
 
 
 def __setup_classification_svc() -> ClassifcationService:
-    training_svc = TrainingService(TrainingDataRepo())
+    """Creates the classification service without models, so that the app
+    can start serving right away. Models are loaded in the background after
+    which the service becomes ready.
+
+    :return: ClassifcationService.
+    """
+    return ClassifcationService(None)
+
+
+def __setup_model_loader(classification_svc: ClassifcationService) -> Optional[BackgroundTask]:
+    """Starts loading models in the background of every worker. Loading is
+    retried with backoff, after which the loader is marked as failed.
+
+    :param classification_svc: ClassifcationService to load models into.
+    :return: Model loader BackgroundTask or None if models are not trained.
+    """
     if not TRAIN_MODEL:
-        return ClassifcationService(None)
-    model_repo = __setup_model_repo()
-    return ClassifcationService(model_repo)
-
-
-def __setup_model_repo() -> ModelRepo:
-    training_svc = TrainingService(TrainingDataRepo())
-    svm_model, svm_classfier = training_svc.train_model(ModelType.SVM)
-    nb_model, nb_classfier = training_svc.train_model(ModelType.NAIVE_BAYES)
-    model_repo = ModelRepo(svm_model, nb_model)
-    model_repo.save_classifier(svm_classfier)
-    model_repo.save_classifier(nb_classfier)
+        return None
+    loader = BackgroundTask(
+        'ModelLoader', lambda: __load_models(classification_svc),
+        MODEL_LOAD_RETRIES, MODEL_LOAD_RETRY_DELAY)
+    start_in_workers(loader)
+    return loader
+
+
+def __load_models(classification_svc: ClassifcationService) -> None:
+    """Loads models and indexes into the classification service. Periodic
+    updates are only started once everything is loaded, so that a retried
+    load does not start them twice.
+
+    :param classification_svc: ClassifcationService to load models into.
+    """
+    model_repo = train_models()
+    classification_svc.set_model_repo(model_repo)
+    tasks: List[PeriodicTask] = []
+    if INCREMENTAL_MODEL:
+        tasks.append(__setup_incremental_model(model_repo))
+    if MODEL_RELOAD_INTERVAL > 0:
+        reload_svc = ModelReloadService(ArtifactRepo(), model_repo, __find_compaction())
+        tasks.append(PeriodicTask('ModelReload', MODEL_RELOAD_INTERVAL, reload_svc.reload))
+    if KNOWN_TEXT_LOOKUP:
+        tasks.append(__setup_known_text_index(classification_svc))
+    if NEAR_DUPLICATE_INDEX:
+        tasks.append(__setup_near_duplicate_index(classification_svc))
+    for task in tasks:
+        start_in_workers(task)
+
+
+def train_models(use_published: bool = True) -> ModelRepo:
+    """Loads the published models if they were trained on the current
+    training data, otherwise trains, stores and publishes models on it.
+    Processes sharing the artifact dir take turns, so that only the first
+    one trains and saves the models while the others load its artifacts.
+
+    :param use_published: Whether to load up to date published models
+                          instead of reading the training data.
+    :return: ModelRepo with the trained models.
+    """
+    types = [ModelType.SVM, ModelType.NAIVE_BAYES]
+    artifact_repo = ArtifactRepo()
+    training_svc = TrainingService(
+        TrainingDataRepo(), artifact_repo, FeaturizerType[FEATURIZER],
+        compaction=__find_compaction())
+    with artifact_repo.lock():
+        if use_published:
+            published_repo = __load_published_models(
+                artifact_repo, training_svc.find_corpus_marker(types))
+            if published_repo is not None:
+                return published_repo
+        featurizer, trained_models = training_svc.train_models(types)
+        models = {type: trained.model for type, trained in trained_models.items()}
+        classifiers = {type: trained.classifier for type, trained in trained_models.items()}
+        compiled = {type: trained.compiled for type, trained in trained_models.items()
+                    if trained.compiled is not None}
+        model_repo = ModelRepo(featurizer, models, classifiers, compiled)
+        for trained in trained_models.values():
+            model_repo.save_classifier(trained.classifier)
     return model_repo
 
 
+def __load_published_models(artifact_repo: ArtifactRepo,
+                            corpus_marker: str) -> Optional[ModelRepo]:
+    """Loads the published models without reading the training data,
+    if they were published with the given corpus marker.
+
+    :param artifact_repo: ArtifactRepo to load from.
+    :param corpus_marker: Marker of the current training data.
+    :return: ModelRepo or None if the published models are missing or stale.
+    """
+    published = artifact_repo.find_published()
+    if published is None or published.corpus_marker != corpus_marker:
+        return None
+    loaded = PublishedModelLoader(artifact_repo, __find_compaction()).load(published)
+    if loaded is None:
+        return None
+    _log.info(f'Loaded published models: {list(loaded.classifiers.values())}')
+    return ModelRepo(loaded.featurizer, loaded.models, loaded.classifiers, loaded.compiled)
+
+
+def tune_models(folds: int, iterations: int, jobs: int) -> TunedParams:
+    """Searches for the best hyperparameters on the current training data
+    and stores them for models trained from then on.
+
+    :param folds: Number of cross validation folds.
+    :param iterations: Number of random candidates per model type, all if 0.
+    :param jobs: Number of parallel processes, all cpus if -1.
+    :return: TunedParams.
+    """
+    training_svc = TrainingService(
+        TrainingDataRepo(), ArtifactRepo(), FeaturizerType[FEATURIZER])
+    return training_svc.tune_models(
+        [ModelType.SVM, ModelType.NAIVE_BAYES], folds, iterations, jobs)
+
+
+def evaluate_cascade(thresholds: List[float]) -> List[CascadeReport]:
+    """Evaluates the CASCADE model type on the test split of the current
+    training data for a range of thresholds.
+
+    :param thresholds: Min naive bayes class probabilities to accept its prediction.
+    :return: CascadeReport per threshold.
+    """
+    training_svc = TrainingService(
+        TrainingDataRepo(), ArtifactRepo(), FeaturizerType[FEATURIZER])
+    return training_svc.evaluate_cascade(thresholds)
+
+
+def verify_compaction(min_df: int, max_features: int,
+                      weight_type: WeightType) -> Optional[CompactionReport]:
+    """Compacts the models trained on the current training data and compares
+    them with the uncompacted ones on its test split.
+
+    :param min_df: Min number of training texts a term must be found in.
+    :param max_features: Max number of terms to keep, all if 0.
+    :param weight_type: Type to store the weights as.
+    :return: CompactionReport or None if the models cannot be compacted.
+    """
+    training_svc = TrainingService(
+        TrainingDataRepo(), ArtifactRepo(), FeaturizerType[FEATURIZER])
+    return training_svc.verify_compaction(
+        [ModelType.SVM, ModelType.NAIVE_BAYES],
+        Compaction(min_df, max_features, weight_type))
+
+
+def __find_compaction() -> Optional[Compaction]:
+    if not MODEL_COMPACTION:
+        return None
+    return Compaction(COMPACTION_MIN_DF, COMPACTION_MAX_FEATURES, WeightType[COMPACTION_WEIGHTS])
+
+
+def __setup_known_text_index(classification_svc: ClassifcationService) -> PeriodicTask:
+    index = KnownTextIndex()
+    known_text_svc = KnownTextService(TrainingDataRepo(), index)
+    known_text_svc.update()
+    classification_svc.set_known_text_index(index)
+    return PeriodicTask('KnownTextUpdate', KNOWN_TEXT_UPDATE_INTERVAL, known_text_svc.update)
+
+
+def __setup_near_duplicate_index(classification_svc: ClassifcationService) -> PeriodicTask:
+    index = NearDuplicateIndex(NEAR_DUPLICATE_THRESHOLD)
+    near_duplicate_svc = NearDuplicateService(TrainingDataRepo(), SampleRepo(), index)
+    near_duplicate_svc.update()
+    classification_svc.set_near_duplicate_index(index)
+    return PeriodicTask(
+        'NearDuplicateUpdate', NEAR_DUPLICATE_UPDATE_INTERVAL, near_duplicate_svc.update)
+
+
+def __setup_incremental_model(model_repo: ModelRepo) -> PeriodicTask:
+    incremental_svc = IncrementalTrainingService(
+        TrainingDataRepo(), ArtifactRepo(), model_repo)
+    incremental_svc.initialize()
+    return PeriodicTask(
+        'IncrementalModelUpdate', INCREMENTAL_UPDATE_INTERVAL, incremental_svc.update)
+
+
 classification_svc: ClassifcationService = __setup_classification_svc()
+model_loader: Optional[BackgroundTask] = __setup_model_loader(classification_svc)
+
+# Objects created while importing the app are shared with the worker processes
+# forked by uwsgi, freezing them keeps the shared pages from being unshared.
+freeze_objects()
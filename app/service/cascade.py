@@ -0,0 +1,88 @@
+# Standard library
+import time
+from collections import namedtuple
+from typing import Any, List
+
+# 3rd party modules
+import numpy as np
+from sklearn.base import BaseEstimator
+from sklearn.metrics import f1_score
+
+# Internal modules
+from app.models import ModelType
+
+
+CascadeReport = namedtuple('CascadeReport', [
+    'threshold', 'test_samples', 'escalation_rate', 'accuracy',
+    'first_accuracy', 'second_accuracy', 'predict_us', 'first_predict_us',
+    'second_predict_us'])
+
+# Model types of the CASCADE model type, in the order they are consulted.
+CASCADE_TYPES = (ModelType.NAIVE_BAYES, ModelType.SVM)
+
+
+def class_probabilities(scores: np.ndarray) -> np.ndarray:
+    """Converts the joint log likelihoods of naive bayes into class
+    probabilities, the same way as MultinomialNB.predict_proba.
+
+    :param scores: Joint log likelihoods as texts x classes.
+    :return: Probabilities as texts x classes.
+    """
+    likelihoods = np.exp(scores - scores.max(axis=1, keepdims=True))
+    return likelihoods / likelihoods.sum(axis=1, keepdims=True)
+
+
+def find_uncertain(probabilities: np.ndarray, threshold: float) -> np.ndarray:
+    """Finds the texts whose most probable class is below a threshold.
+
+    :param probabilities: Class probabilities as texts x classes.
+    :param threshold: Min probability to accept a prediction.
+    :return: Indexes of the uncertain texts.
+    """
+    return np.flatnonzero(probabilities.max(axis=1) < threshold)
+
+
+def evaluate_cascade(first: BaseEstimator, second: BaseEstimator, features: Any,
+                     labels: List[str], thresholds: List[float]) -> List[CascadeReport]:
+    """Evaluates a cascade of a probabilistic model escalating to a second
+    model on featurized test data, for each of a range of thresholds, compared
+    with each of the models on its own. Prediction time is measured on the
+    whole test data and excludes the shared featurizer.
+
+    :param first: Estimator predicting class probabilities, tried first.
+    :param second: Estimator that uncertain texts are escalated to.
+    :param features: Featurized test texts.
+    :param labels: Labels of the test texts.
+    :param thresholds: Min probabilities to accept a prediction of the first model.
+    :return: CascadeReport per threshold.
+    """
+    samples = features.shape[0]
+    start = time.perf_counter()
+    probabilities = first.predict_proba(features)
+    first_secs = time.perf_counter() - start
+    first_labels = first.classes_[probabilities.argmax(axis=1)]
+    start = time.perf_counter()
+    second_labels = second.predict(features)
+    second_secs = time.perf_counter() - start
+    first_accuracy = f1_score(labels, first_labels, average='micro')
+    second_accuracy = f1_score(labels, second_labels, average='micro')
+    reports = []
+    for threshold in thresholds:
+        uncertain = find_uncertain(probabilities, threshold)
+        start = time.perf_counter()
+        if len(uncertain):
+            second.predict(features[uncertain])
+        escalation_secs = time.perf_counter() - start
+        cascade_labels = first_labels.copy()
+        cascade_labels[uncertain] = second_labels[uncertain]
+        reports.append(CascadeReport(
+            threshold=threshold,
+            test_samples=samples,
+            escalation_rate=len(uncertain) / samples,
+            accuracy=f1_score(labels, cascade_labels, average='micro'),
+            first_accuracy=first_accuracy,
+            second_accuracy=second_accuracy,
+            predict_us=(first_secs + escalation_secs) / samples * 1e6,
+            first_predict_us=first_secs / samples * 1e6,
+            second_predict_us=second_secs / samples * 1e6))
+    return reports
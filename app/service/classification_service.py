@@ -1,55 +1,406 @@
 # Standard library
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
 
 # 3rd party modules
 from sklearn.pipeline import Pipeline
 
 # Internal modules
-from app.config import CASHTAG_THRESHOLD
+from app import metrics
+from app.config import CASHTAG_THRESHOLD, RESULT_CACHE_SIZE
+from app.config import MICRO_BATCH_WINDOW, MICRO_BATCH_MAX_SIZE
+from app.config import CASCADE_THRESHOLD, COMPILED_INFERENCE
 from app.models import Label, ModelType, SpamResult
-from app.repository import ModelRepo
+from app.models import tokenize, tokenize_all
+from app.repository import ModelRepo, ModelSet
+from .cascade import CASCADE_TYPES, class_probabilities, find_uncertain
+from .known_text_index import KnownTextIndex
+from .micro_batcher import MicroBatcher
+from .near_duplicate_index import NearDuplicateIndex
+from .result_cache import CacheKey, ResultCache
 from .training_service import dummy_pipeline
 
 
 _TOO_MANY_CASHTAGS = "too many cashtags"
+_NEAR_DUPLICATE = "near duplicate of known spam"
+_KNOWN_TEXT = "known text in training data"
+
+BatchResult = Union[SpamResult, Exception]
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 
 class ClassifcationService:
-    def __init__(self, model_repo: Optional[ModelRepo]) -> None:
+    def __init__(
+        self,
+        model_repo: Optional[ModelRepo],
+        cache_size: int = RESULT_CACHE_SIZE,
+        batch_window: float = MICRO_BATCH_WINDOW,
+        batch_max_size: int = MICRO_BATCH_MAX_SIZE,
+        compiled: bool = COMPILED_INFERENCE,
+        cascade_threshold: float = CASCADE_THRESHOLD,
+    ) -> None:
         self._repo = self._get_model_repo(model_repo)
+        self._ready = model_repo is not None
+        self._cache = ResultCache(cache_size)
+        self._compiled = compiled
+        self._cascade_threshold = cascade_threshold
+        self._known_texts: Optional[KnownTextIndex] = None
+        self._near_duplicates: Optional[NearDuplicateIndex] = None
+        self._batcher: Optional[MicroBatcher] = None
+        if batch_window > 0 and batch_max_size > 1:
+            self._batcher = MicroBatcher(self._predict_batch, batch_window, batch_max_size)
+
+    def set_model_repo(self, model_repo: ModelRepo) -> None:
+        """Starts classifying with the models of a loaded ModelRepo.
+
+        :param model_repo: ModelRepo with trained models.
+        """
+        self._repo = model_repo
+        self._ready = True
+
+    def set_known_text_index(self, index: KnownTextIndex) -> None:
+        """Starts classifying texts found in the training data with their
+        labels from it, without consulting a model.
+
+        :param index: KnownTextIndex of the training data.
+        """
+        self._known_texts = index
+
+    def set_near_duplicate_index(self, index: NearDuplicateIndex) -> None:
+        """Starts classifying near duplicates of known spam as spam
+        without consulting a model.
+
+        :param index: NearDuplicateIndex of spam texts.
+        """
+        self._near_duplicates = index
+
+    def is_ready(self) -> bool:
+        """Checks if models have been loaded and texts can be classified.
+
+        :return: Boolean.
+        """
+        return self._ready
 
     def classify(self, text: str, model_type: ModelType = ModelType.SVM) -> SpamResult:
-        """Classifes a spam candidate.
+        """Classifes a spam candidate. Model predictions are cached by
+        normalized text for as long as the model is unchanged. With micro
+        batching enabled the prediction is made together with the texts
+        classified concurrently by other threads.
 
         :param text: Text to check for indications of spam.
         :param model_type: ModelType to use for classification.
         :return: SpamResult for the tested text.
         """
-        if self._to_many_cashtags(text):
-            return SpamResult(label=Label.SPAM.value, reason="too many cashtags")
-        model = self._repo.get_spam_classifier(model_type)
-        return SpamResult(
-            label=model.predict([text])[0],
-            reason=f"predicted by {model_type.value} model",
-        )
+        if self._batcher is None:
+            return self._classify(text, model_type)
+        with self._batcher.caller():
+            return self._classify(text, model_type)
+
+    def classify_batch(
+        self, texts: List[str], model_type: ModelType = ModelType.SVM
+    ) -> List[BatchResult]:
+        """Classifies a batch of spam candidates with a single model prediction.
+        A text that fails to be classified gets the exception as its result,
+        without failing the rest of the batch.
+
+        :param texts: Texts to check for indications of spam.
+        :param model_type: ModelType to use for classification.
+        :return: SpamResult or exception per text, in the same order as the texts.
+        """
+        models = self._repo.get_models()
+        results: List[Optional[BatchResult]] = [self._find_known_text(text) for text in texts]
+        unknown = [i for i, res in enumerate(results) if res is None]
+        model_indexes: List[int] = []
+        model_terms: List[List[str]] = []
+        with metrics.time_stage(metrics.TOKENIZE):
+            tokenized = _apply_each(tokenize_all, tokenize, [texts[i] for i in unknown])
+        for i, tokens in zip(unknown, tokenized):
+            if isinstance(tokens, Exception):
+                results[i] = tokens
+            elif self._check_cashtag_rule(tokens.words):
+                results[i] = SpamResult(label=Label.SPAM.value, reason=_TOO_MANY_CASHTAGS)
+            elif self._check_near_duplicate(tokens.words):
+                results[i] = SpamResult(label=Label.SPAM.value, reason=_NEAR_DUPLICATE)
+            else:
+                results[i] = self._cache.get(self._cache_key(texts[i], model_type, models))
+                if results[i] is None:
+                    model_indexes.append(i)
+                    model_terms.append(tokens.terms)
+        if model_indexes:
+            labels = _apply_each(
+                lambda terms: self._predict_batch(model_type, models, terms),
+                lambda terms: self._predict_batch(model_type, models, [terms])[0],
+                model_terms)
+            reason = f"predicted by {model_type.value} model"
+            for i, label in zip(model_indexes, labels):
+                if isinstance(label, Exception):
+                    results[i] = label
+                    continue
+                res = SpamResult(label=label, reason=reason)
+                self._cache.put(self._cache_key(texts[i], model_type, models), res)
+                results[i] = res
+        batch_results = [res for res in results if res is not None]
+        assert len(batch_results) == len(texts), "Every text must have a result"
+        return batch_results
+
+    def classify_all(
+        self, text: str, model_types: Optional[List[ModelType]] = None
+    ) -> Dict[ModelType, SpamResult]:
+        """Classifies a spam candidate with several model types, applying the
+        same rules, cache and compiled models as classify. The text is only
+        transformed once per featurizer and shared between the models using it.
+
+        :param text: Text to check for indications of spam.
+        :param model_types: ModelTypes to use, every loaded model type if None.
+        :return: SpamResult for the tested text by ModelType.
+        """
+        models = self._repo.get_models()
+        types = model_types if model_types is not None else models.get_model_types()
+        known = self._find_known_text(text)
+        if known is not None:
+            return {model_type: known for model_type in types}
+        with metrics.time_stage(metrics.TOKENIZE):
+            tokens = tokenize(text)
+        if self._check_cashtag_rule(tokens.words):
+            res = SpamResult(label=Label.SPAM.value, reason=_TOO_MANY_CASHTAGS)
+            return {model_type: res for model_type in types}
+        if self._check_near_duplicate(tokens.words):
+            res = SpamResult(label=Label.SPAM.value, reason=_NEAR_DUPLICATE)
+            return {model_type: res for model_type in types}
+        results: Dict[ModelType, SpamResult] = {}
+        uncached: List[ModelType] = []
+        for model_type in types:
+            cached = self._cache.get(self._cache_key(text, model_type, models))
+            if cached is not None:
+                results[model_type] = cached
+            else:
+                uncached.append(model_type)
+        labels = self._predict_types(uncached, models, tokens.terms)
+        for model_type, label in labels.items():
+            res = SpamResult(label=label, reason=f"predicted by {model_type.value} model")
+            self._cache.put(self._cache_key(text, model_type, models), res)
+            results[model_type] = res
+        return results
+
+    def has_model_type(self, model_type: ModelType) -> bool:
+        """Checks if the service has a model of a given type.
+
+        :param model_type: ModelType to check.
+        :return: Boolean.
+        """
+        model_types = self._repo.get_models().get_model_types()
+        if model_type == ModelType.CASCADE:
+            return all(type in model_types for type in CASCADE_TYPES)
+        return model_type in model_types
 
     def has_model(self) -> bool:
         """Checks if the services has a trained model.
 
         :return: Boolen indication if the service has a trained model.
         """
-        svm_model = self._repo.get_spam_classifier(ModelType.SVM)
-        nb_model = self._repo.get_spam_classifier(ModelType.NAIVE_BAYES)
-        return svm_model != None and nb_model != None
+        models = self._repo.get_models()
+        svm_model = models.get_spam_classifier(ModelType.SVM)
+        nb_model = models.get_spam_classifier(ModelType.NAIVE_BAYES)
+        return self._ready and svm_model != None and nb_model != None
+
+    def _classify(self, text: str, model_type: ModelType) -> SpamResult:
+        """Classifes a spam candidate, see classify.
+
+        :param text: Text to check for indications of spam.
+        :param model_type: ModelType to use for classification.
+        :return: SpamResult for the tested text.
+        """
+        known = self._find_known_text(text)
+        if known is not None:
+            return known
+        with metrics.time_stage(metrics.TOKENIZE):
+            tokens = tokenize(text)
+        if self._check_cashtag_rule(tokens.words):
+            return SpamResult(label=Label.SPAM.value, reason=_TOO_MANY_CASHTAGS)
+        if self._check_near_duplicate(tokens.words):
+            return SpamResult(label=Label.SPAM.value, reason=_NEAR_DUPLICATE)
+        models = self._repo.get_models()
+        key = self._cache_key(text, model_type, models)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        if self._batcher is not None:
+            label = self._batcher.predict(model_type, models, tokens.terms)
+        else:
+            label = self._predict_batch(model_type, models, [tokens.terms])[0]
+        res = SpamResult(label=label, reason=f"predicted by {model_type.value} model")
+        self._cache.put(key, res)
+        return res
+
+    def _cache_key(self, text: str, model_type: ModelType, models: ModelSet) -> CacheKey:
+        """Creates the result cache key of a normalized text.
+
+        :param text: Normalized text.
+        :param model_type: ModelType used for classification.
+        :param models: ModelSet used for classification.
+        :return: CacheKey.
+        """
+        if model_type == ModelType.CASCADE:
+            model_hash = "+".join(models.get_model_hash(type) for type in CASCADE_TYPES)
+        else:
+            model_hash = models.get_model_hash(model_type)
+        return model_type, model_hash, text
+
+    def _predict_batch(
+        self, model_type: ModelType, models: ModelSet, terms: List[List[str]]
+    ) -> List[str]:
+        """Predicts labels with the model of a given type, using its
+        compiled version if compiled inference is enabled.
+
+        :param model_type: ModelType to use for prediction.
+        :param models: ModelSet to take the model from.
+        :param terms: Terms of each text to classify.
+        :return: Predicted labels.
+        """
+        if model_type == ModelType.CASCADE:
+            return self._predict_cascade(models, terms)
+        compiled = models.get_compiled_model(model_type) if self._compiled else None
+        if compiled is not None:
+            with metrics.time_stage(metrics.PREDICT):
+                return compiled.predict(terms)
+        return self._predict(models.get_spam_classifier(model_type), terms)
+
+    def _predict_types(
+        self, model_types: List[ModelType], models: ModelSet, terms: List[str]
+    ) -> Dict[ModelType, str]:
+        """Predicts the label of a text with several model types. Compiled
+        models are used if compiled inference is enabled, the other models
+        share the features of the text transformed once per featurizer.
+
+        :param model_types: ModelTypes to use for prediction.
+        :param models: ModelSet to take the models from.
+        :param terms: Terms of the text to classify.
+        :return: Predicted label by ModelType.
+        """
+        labels: Dict[ModelType, str] = {}
+        features: Dict[int, Any] = {}
+        for model_type in model_types:
+            compiled = models.get_compiled_model(model_type) if self._compiled else None
+            if model_type == ModelType.CASCADE or compiled is not None:
+                labels[model_type] = self._predict_batch(model_type, models, [terms])[0]
+                continue
+            model = models.get_spam_classifier(model_type)
+            featurizer = model.named_steps["featurizer"]
+            if id(featurizer) not in features:
+                with metrics.time_stage(metrics.VECTORIZE):
+                    features[id(featurizer)] = featurizer.transform([terms])
+            with metrics.time_stage(metrics.PREDICT):
+                labels[model_type] = model.named_steps["classifier"].predict(
+                    features[id(featurizer)])[0]
+        return labels
+
+    def _predict_cascade(self, models: ModelSet, terms: List[List[str]]) -> List[str]:
+        """Predicts labels with the naive bayes model, and escalates the texts
+        for which the probability of the predicted class is below the cascade
+        threshold to the SVM model. Both models share the featurizer, so the
+        texts are only featurized once unless compiled models are used.
+
+        :param models: ModelSet to take the models from.
+        :param terms: Terms of each text to classify.
+        :return: Predicted labels.
+        """
+        first_type, second_type = CASCADE_TYPES
+        first_compiled = models.get_compiled_model(first_type) if self._compiled else None
+        second_compiled = models.get_compiled_model(second_type) if self._compiled else None
+        escalated: List[str] = []
+        if first_compiled is not None and second_compiled is not None:
+            with metrics.time_stage(metrics.PREDICT):
+                probabilities = class_probabilities(first_compiled.decision_scores(terms))
+            labels = list(first_compiled.get_classes()[probabilities.argmax(axis=1)])
+            uncertain = find_uncertain(probabilities, self._cascade_threshold)
+            if len(uncertain):
+                with metrics.time_stage(metrics.PREDICT):
+                    escalated = second_compiled.predict([terms[i] for i in uncertain])
+        else:
+            first = models.get_spam_classifier(first_type)
+            second = models.get_spam_classifier(second_type)
+            featurizer = first.named_steps["featurizer"]
+            with metrics.time_stage(metrics.VECTORIZE):
+                features = featurizer.transform(terms)
+            with metrics.time_stage(metrics.PREDICT):
+                probabilities = first.named_steps["classifier"].predict_proba(features)
+            labels = list(first.named_steps["classifier"].classes_[probabilities.argmax(axis=1)])
+            uncertain = find_uncertain(probabilities, self._cascade_threshold)
+            if len(uncertain) and second.named_steps["featurizer"] is featurizer:
+                with metrics.time_stage(metrics.PREDICT):
+                    escalated = second.named_steps["classifier"].predict(features[uncertain])
+            elif len(uncertain):
+                escalated = self._predict(second, [terms[i] for i in uncertain])
+        for i, label in zip(uncertain, escalated):
+            labels[i] = label
+        metrics.CASCADE_PREDICTIONS.labels(first_type.value).inc(len(terms) - len(uncertain))
+        metrics.CASCADE_PREDICTIONS.labels(second_type.value).inc(len(uncertain))
+        return labels
+
+    def _predict(self, model: Pipeline, terms: List[List[str]]) -> List[str]:
+        """Predicts labels with a model pipeline, timing the featurizer
+        and the estimator separately.
 
-    def _to_many_cashtags(self, text: str) -> bool:
+        :param model: Model pipeline.
+        :param terms: Terms of each text to classify.
+        :return: Predicted labels.
+        """
+        with metrics.time_stage(metrics.VECTORIZE):
+            features = model.named_steps["featurizer"].transform(terms)
+        with metrics.time_stage(metrics.PREDICT):
+            return model.named_steps["classifier"].predict(features)
+
+    def _find_known_text(self, text: str) -> Optional[SpamResult]:
+        """Looks up the label of a text in the training data and counts hits.
+
+        :param text: Normalized text.
+        :return: SpamResult or None if the text is unknown.
+        """
+        index = self._known_texts
+        if index is None:
+            return None
+        with metrics.time_stage(metrics.KNOWN_TEXT):
+            label = index.find(text)
+        if label is None:
+            return None
+        metrics.RULE_HITS.labels("known_text").inc()
+        return SpamResult(label=label, reason=_KNOWN_TEXT)
+
+    def _check_cashtag_rule(self, words: List[str]) -> bool:
+        """Applies the cashtag rule and counts its hits.
+
+        :param words: Whitespace separated words of the text to test.
+        :return: Boolean indicating that the text is spam.
+        """
+        with metrics.time_stage(metrics.CASHTAG_RULE):
+            is_spam = self._to_many_cashtags(words)
+        if is_spam:
+            metrics.RULE_HITS.labels("cashtags").inc()
+        return is_spam
+
+    def _check_near_duplicate(self, words: List[str]) -> bool:
+        """Checks if a text is a near duplicate of known spam and counts hits.
+
+        :param words: Whitespace separated words of the text to test.
+        :return: Boolean indicating that the text is spam.
+        """
+        index = self._near_duplicates
+        if index is None:
+            return False
+        with metrics.time_stage(metrics.NEAR_DUPLICATE):
+            is_spam = index.find(words)
+        if is_spam:
+            metrics.RULE_HITS.labels("near_duplicate").inc()
+        return is_spam
+
+    def _to_many_cashtags(self, words: List[str]) -> bool:
         """Check if a given text has to high a cashtag ratio,
         messured as the percentatge of words that are cashtags.
 
-        :param text: Text to test.
+        :param words: Whitespace separated words of the text to test.
         :return: Boolean.
         """
-        words = text.split()
         if not words:
             return True
         cashtags = [word for word in words if word.startswith("$")]
@@ -63,5 +414,33 @@ class ClassifcationService:
         """
         if isinstance(model_repo, ModelRepo):
             return model_repo
-        empty_repo = ModelRepo(dummy_pipeline(), dummy_pipeline())
+        dummy = dummy_pipeline()
+        empty_repo = ModelRepo(
+            featurizer=dummy.named_steps["featurizer"],
+            models={ModelType.SVM: dummy, ModelType.NAIVE_BAYES: dummy},
+        )
         return empty_repo
+
+
+def _apply_each(
+    apply_all: Callable[[List[T]], List[R]], apply_one: Callable[[T], R], items: List[T]
+) -> List[Union[R, Exception]]:
+    """Applies a batch function to a list of items. If it fails, the items are
+    applied one at a time, so that only the failing items get an exception.
+
+    :param apply_all: Function applied to all items at once.
+    :param apply_one: Function applied to a single item.
+    :param items: Items to apply the functions to.
+    :return: Result or exception per item, in the same order as the items.
+    """
+    try:
+        return list(apply_all(items))
+    except Exception:
+        pass
+    results: List[Union[R, Exception]] = []
+    for item in items:
+        try:
+            results.append(apply_one(item))
+        except Exception as e:
+            results.append(e)
+    return results
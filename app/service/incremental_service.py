@@ -0,0 +1,173 @@
+# Standard library
+import logging
+from collections import deque
+from copy import deepcopy
+from hashlib import sha1
+from typing import Deque, Optional
+
+# Internal modules
+from app.config import HASHING_FEATURES, INCREMENTAL_BATCH_SIZE
+from app.config import INCREMENTAL_TEST_SIZE
+from app.models import Classifier, Label, ModelType
+from app.models import analyze_terms, format_text
+from app.repository import ArtifactRepo, ModelRepo, TrainingDataRepo, is_test_sample
+from .training_service import DataList, TrainedModel
+
+# 3rd party library
+from sklearn.base import BaseEstimator
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import f1_score
+from sklearn.pipeline import Pipeline
+
+
+_CLASSES = [Label.SPAM.value, Label.NON_SPAM.value]
+
+
+class IncrementalTrainingService:
+    """Trains the INCREMENTAL model, a linear model on a stateless hashing
+    featurizer that is updated with training data added since its last update.
+    The cost of an update depends on the number of new samples only.
+
+    Workers sharing the artifact dir update one at a time. A worker first
+    picks up a newer version stored by another worker, so that only new
+    samples that no worker has applied yet are trained on.
+    """
+
+    __log = logging.getLogger('IncrementalTrainingService')
+
+    def __init__(self, sample_repo: TrainingDataRepo, artifact_repo: ArtifactRepo,
+                 model_repo: ModelRepo, batch_size: int = INCREMENTAL_BATCH_SIZE,
+                 test_size: int = INCREMENTAL_TEST_SIZE,
+                 hashing_features: int = HASHING_FEATURES) -> None:
+        self.__sample_repo = sample_repo
+        self.__artifact_repo = artifact_repo
+        self.__model_repo = model_repo
+        self.__batch_size = batch_size
+        self.__featurizer = _create_featurizer(hashing_features)
+        self.__test_texts: Deque[str] = deque(maxlen=test_size)
+        self.__test_labels: Deque[str] = deque(maxlen=test_size)
+        self.__current: Optional[TrainedModel] = None
+
+    def initialize(self) -> None:
+        """Loads the latest stored version of the model and applies training
+        data added since. Trains from scratch if no stored version exists.
+        """
+        self.update()
+
+    def update(self) -> None:
+        """Loads the latest stored version of the model if it is newer than
+        the one in service, and applies training data added since, in mini
+        batches. The model in service is replaced by an updated copy of itself.
+        """
+        with self.__artifact_repo.lock():
+            self.__load_latest()
+            if self.__current is None:
+                self.__train(SGDClassifier(random_state=0), parent=None)
+                return
+            estimator = deepcopy(self.__current.model.named_steps['classifier'])
+            self.__train(estimator, parent=self.__current.classifier)
+
+    def __load_latest(self) -> None:
+        """Puts the latest stored version of the model in service, if it has
+        been trained on newer samples than the one in service.
+        """
+        current_id = self.__current.classifier.last_sample_id if self.__current else -1
+        for classifier in self.__model_repo.find_latest_classifiers(ModelType.INCREMENTAL):
+            if (classifier.last_sample_id or 0) <= current_id:
+                return
+            artifact = self.__artifact_repo.find(classifier.model_hash)
+            if artifact:
+                estimator, metadata = artifact
+                self.__log.info(f'Loaded stored model: {metadata}')
+                self.__publish(TrainedModel(self.__assemble(estimator), metadata, None))
+                return
+
+    def __train(self, estimator: BaseEstimator, parent: Optional[Classifier]) -> None:
+        """Fits a model with all samples added after the parent model.
+
+        :param estimator: Model to update.
+        :param parent: Classifier metadata of the model being updated.
+        """
+        last_id = parent.last_sample_id if parent else 0
+        lineage = sha1((parent.model_hash if parent else ModelType.INCREMENTAL.value).encode('utf-8'))
+        batch = DataList(texts=[], labels=[])
+        training_samples = 0
+        seen_samples = 0
+        for sample_id, text, label in self.__sample_repo.stream_since(last_id, self.__batch_size):
+            seen_samples += 1
+            text = format_text(text)
+            lineage.update((text + label).encode('utf-8'))
+            last_id = sample_id
+            if is_test_sample(sample_id):
+                self.__test_texts.append(text)
+                self.__test_labels.append(label)
+                continue
+            batch.texts.append(text)
+            batch.labels.append(label)
+            if len(batch.texts) >= self.__batch_size:
+                training_samples += self.__partial_fit(estimator, batch)
+        training_samples += self.__partial_fit(estimator, batch)
+        if not seen_samples or not (parent or training_samples):
+            return
+        model = self.__assemble(estimator)
+        classifier = Classifier(
+            type=ModelType.INCREMENTAL.value,
+            training_samples=training_samples + (parent.training_samples if parent else 0),
+            test_samples=len(self.__test_labels),
+            accuracy=self.__check_model_accuracy(model, parent),
+            model_hash=lineage.hexdigest(),
+            parent_hash=parent.model_hash if parent else None,
+            last_sample_id=last_id)
+        self.__log.info(f'Updated model: {classifier}')
+        self.__publish(TrainedModel(model, classifier, None))
+        self.__artifact_repo.save(estimator, classifier)
+        self.__model_repo.save_classifier(classifier)
+
+    def __partial_fit(self, estimator: BaseEstimator, batch: DataList) -> int:
+        """Updates a model with a mini batch of samples and clears the batch.
+
+        :param estimator: Model to update.
+        :param batch: DataList of samples.
+        :return: Number of samples in the batch.
+        """
+        size = len(batch.texts)
+        if size:
+            features = self.__featurizer.transform(batch.texts)
+            estimator.partial_fit(features, batch.labels, classes=_CLASSES)
+            batch.texts.clear()
+            batch.labels.clear()
+        return size
+
+    def __check_model_accuracy(self, model: Pipeline, parent: Optional[Classifier]) -> float:
+        """Checks the prediction accuracy of an updated model on the held out samples.
+
+        :param model: Updated model pipeline.
+        :param parent: Classifier metadata of the model before the update.
+        :return: Accuracy score between 0.0 and 1.0
+        """
+        if not self.__test_labels:
+            return parent.accuracy if parent else 0.0
+        predictions = model.predict(list(self.__test_texts))
+        return f1_score(list(self.__test_labels), predictions, average='micro')
+
+    def __publish(self, trained: TrainedModel) -> None:
+        self.__current = trained
+        self.__model_repo.set_model(ModelType.INCREMENTAL, trained.model, trained.classifier)
+
+    def __assemble(self, estimator: BaseEstimator) -> Pipeline:
+        return Pipeline([
+            ('featurizer', self.__featurizer),
+            ('classifier', estimator)
+        ])
+
+
+def _create_featurizer(hashing_features: int) -> HashingVectorizer:
+    """Creates a stateless featurizer that never needs to be refitted.
+
+    :param hashing_features: Number of features to hash terms into.
+    :return: HashingVectorizer.
+    """
+    return HashingVectorizer(
+        n_features=hashing_features, analyzer=analyze_terms,
+        alternate_sign=False)
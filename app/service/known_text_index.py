@@ -0,0 +1,84 @@
+# Standard library
+import hashlib
+from array import array
+from typing import Iterable, Optional, Tuple
+
+# 3rd party modules
+import numpy as np
+
+# Internal modules
+from app.models import Label
+
+
+_LABELS = [label.value for label in Label]
+_LABEL_CODES = {label: code for code, label in enumerate(_LABELS)}
+
+
+class KnownTextIndex:
+    """Lookup table of the labels of normalized texts in the training data.
+
+    Texts are stored as 64 bit digests in a sorted array, next to an array
+    of label codes, i.e. 9 bytes per text, and looked up by binary search.
+    The arrays are replaced as a whole when extended, so lookups need no lock.
+    When a text occurs more than once the label stored last is kept.
+    """
+
+    def __init__(self) -> None:
+        self.__table: Tuple[np.ndarray, np.ndarray] = (
+            np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.uint8))
+
+    def extend(self, labeled_texts: Iterable[Tuple[str, str]]) -> int:
+        """Adds normalized texts and their labels to the table.
+
+        :param labeled_texts: Normalized texts and labels, oldest first.
+        :return: Number of added texts.
+        """
+        digests = array('Q')
+        codes = array('B')
+        for text, label in labeled_texts:
+            if label in _LABEL_CODES:
+                digests.append(_digest(text))
+                codes.append(_LABEL_CODES[label])
+        if digests:
+            self.__merge(np.frombuffer(digests, dtype=np.uint64),
+                         np.frombuffer(codes, dtype=np.uint8))
+        return len(digests)
+
+    def find(self, text: str) -> Optional[str]:
+        """Looks up the label of a normalized text.
+
+        :param text: Normalized text.
+        :return: Label value or None if the text is unknown.
+        """
+        digests, codes = self.__table
+        digest = np.uint64(_digest(text))
+        i = int(digests.searchsorted(digest))
+        if i == len(digests) or digests[i] != digest:
+            return None
+        return _LABELS[codes[i]]
+
+    def size(self) -> int:
+        """Gets the number of distinct texts in the table.
+
+        :return: Number of texts.
+        """
+        return len(self.__table[0])
+
+    def __merge(self, new_digests: np.ndarray, new_codes: np.ndarray) -> None:
+        """Merges digests into the table, keeping the last label of each digest.
+
+        :param new_digests: Digests to add.
+        :param new_codes: Label codes of the digests.
+        """
+        digests, codes = self.__table
+        digests = np.concatenate([digests, new_digests])
+        codes = np.concatenate([codes, new_codes])
+        order = np.argsort(digests, kind='stable')
+        digests, codes = digests[order], codes[order]
+        is_last = np.append(digests[1:] != digests[:-1], True)
+        self.__table = (digests[is_last], codes[is_last])
+
+
+def _digest(text: str) -> int:
+    hash = hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(hash, 'little')
@@ -0,0 +1,33 @@
+# Standard library
+import logging
+from typing import Iterator, Tuple
+
+# Internal modules
+from app.models import format_text
+from app.repository import TrainingDataRepo
+from .known_text_index import KnownTextIndex
+
+
+class KnownTextService:
+    """Fills a KnownTextIndex with the training data, and adds the training
+    data stored since on each update.
+    """
+
+    __log = logging.getLogger('KnownTextService')
+
+    def __init__(self, training_data_repo: TrainingDataRepo, index: KnownTextIndex) -> None:
+        self.__training_data_repo = training_data_repo
+        self.__index = index
+        self.__last_id = 0
+
+    def update(self) -> None:
+        """Adds the training data stored after the last update."""
+        added = self.__index.extend(
+            (format_text(text), label) for text, label in self.__stream_new())
+        if added:
+            self.__log.info(f'Added {added} known texts, {self.__index.size()} in total')
+
+    def __stream_new(self) -> Iterator[Tuple[str, str]]:
+        for id, text, label in self.__training_data_repo.stream_since(self.__last_id):
+            self.__last_id = id
+            yield text, label
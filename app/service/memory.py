@@ -0,0 +1,93 @@
+# Standard library
+import gc
+import os
+import sys
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Any, Dict, Set, Tuple
+
+# 3rd party modules
+import numpy as np
+
+
+# Fields of /proc/<pid>/smaps_rollup in kB, summed into the reported sizes.
+_SMAPS_FIELDS = {
+    'Rss': ['Rss'],
+    'Pss': ['Pss'],
+    'Uss': ['Private_Clean', 'Private_Dirty'],
+}
+
+# Objects that object_size does not count.
+_SHARED_TYPES = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)
+
+
+def freeze_objects() -> None:
+    """Collects garbage and moves all remaining objects to the permanent
+    generation of the garbage collector. Frozen objects are not traversed by
+    later collections, which would otherwise write to every object header and
+    unshare the memory pages a forked worker shares with its master. Only
+    useful in the master before workers are forked, frozen objects are never
+    collected.
+    """
+    gc.collect()
+    gc.freeze()  # type: ignore
+
+
+def process_memory(pid: int = 0) -> Dict[str, int]:
+    """Gets the resident (RSS), proportional (PSS) and unique (USS) memory of
+    a process in bytes. PSS splits shared pages evenly between the processes
+    sharing them and USS only counts pages private to the process.
+
+    :param pid: Id of the process, the current process if 0.
+    :return: Memory sizes by name, empty if not available on the platform.
+    """
+    path = f'/proc/{pid or os.getpid()}/smaps_rollup'
+    try:
+        with open(path) as f:
+            fields = dict(_parse_smaps_line(line) for line in f if line.endswith('kB\n'))
+    except OSError:
+        return {}
+    return {name: sum(fields.get(field, 0) for field in parts) * 1024
+            for name, parts in _SMAPS_FIELDS.items()}
+
+
+def object_size(*objects: Any) -> int:
+    """Estimates the memory of objects and everything they reference, with
+    objects referenced more than once counted once. Classes, modules and
+    functions are shared by the whole process and not counted. Numpy arrays
+    are counted by the size of their data, which getsizeof leaves out for
+    arrays that do not own it, such as the views and memory maps of arrays
+    loaded from artifacts. Sparse matrices are counted by their arrays.
+
+    :param objects: Objects to measure.
+    :return: Size in bytes.
+    """
+    seen: Set[int] = set()
+    pending = list(objects)
+    size = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, _SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, np.ndarray):
+            size += _array_size(obj)
+            continue
+        size += sys.getsizeof(obj)
+        pending.extend(gc.get_referents(obj))
+    return size
+
+
+def _array_size(array: np.ndarray) -> int:
+    """Gets the size of an array header and its data, regardless of which
+    array owns the data. Object arrays are counted by their pointers only.
+
+    :param array: Numpy array.
+    :return: Size in bytes.
+    """
+    header = sys.getsizeof(array) - (array.nbytes if array.flags.owndata else 0)
+    return max(header, 0) + array.nbytes
+
+
+def _parse_smaps_line(line: str) -> Tuple[str, int]:
+    name, value, _ = line.split()
+    return name.rstrip(':'), int(value)
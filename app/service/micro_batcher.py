@@ -0,0 +1,145 @@
+# Standard library
+from contextlib import contextmanager
+from threading import Event, Lock
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Internal modules
+from app import metrics
+from app.models import ModelType
+from app.repository import ModelSet
+
+
+BatchKey = Tuple[ModelType, ModelSet]
+BatchPredictor = Callable[[ModelType, ModelSet, List[List[str]]], List[str]]
+
+
+class _Batch:
+    """Texts collected for a single prediction and its outcome."""
+
+    def __init__(self) -> None:
+        self.terms: List[List[str]] = []
+        self.labels: List[str] = []
+        self.error: Optional[Exception] = None
+        self.closed = Event()
+        self.done = Event()
+
+
+class MicroBatcher:
+    """Collects texts classified concurrently by different threads into
+    batches predicted with a single call to the model.
+
+    The first thread to arrive leads a new batch per model type and ModelSet,
+    so a batch is never predicted with other models than its texts were
+    looked up in the result cache with. The leader waits
+    for the batch window to pass, for the batch to fill up or for every
+    thread in a classify call to have joined a batch, runs the prediction
+    for every text in the batch and wakes the threads that joined it, which
+    then pick up their own label. Batching trades up to the window of
+    latency on each call for fewer, larger predictions, amortizing the fixed
+    cost of every model call and the contention of threads over the GIL.
+    """
+
+    def __init__(self, predict: BatchPredictor, window: float, max_size: int) -> None:
+        self.__predict = predict
+        self.__window = window
+        self.__max_size = max_size
+        self.__pending: Dict[BatchKey, _Batch] = {}
+        self.__callers = 0
+        self.__lock = Lock()
+
+    @contextmanager
+    def caller(self) -> Iterator[None]:
+        """Tracks a thread in a classify call, which may join a batch.
+        Pending batches are closed early once every tracked thread waits
+        on a batch, as no other text could join them before the window ends.
+        """
+        with self.__lock:
+            self.__callers += 1
+        try:
+            yield
+        finally:
+            with self.__lock:
+                self.__callers -= 1
+                self.__close_if_complete()
+
+    def predict(self, model_type: ModelType, models: ModelSet, terms: List[str]) -> str:
+        """Predicts the label of a text as part of a batch.
+
+        :param model_type: ModelType to use for prediction.
+        :param models: ModelSet to use for prediction.
+        :param terms: Terms of the text to classify.
+        :return: Predicted label.
+        """
+        with metrics.time_stage(metrics.MICRO_BATCH_WAIT):
+            key = (model_type, models)
+            batch, index, is_leader = self.__join(key, terms)
+            if is_leader:
+                batch.closed.wait(self.__window)
+                self.__close(key, batch)
+        if is_leader:
+            self.__run(key, batch)
+        else:
+            batch.done.wait()
+        if batch.error is not None:
+            raise batch.error
+        return batch.labels[index]
+
+    def __join(self, key: BatchKey, terms: List[str]) -> Tuple[_Batch, int, bool]:
+        """Adds a text to the pending batch of a model type and ModelSet, or
+        starts a new batch if there is none. A batch that reaches the max size
+        is closed.
+
+        :param key: ModelType and ModelSet to use for prediction.
+        :param terms: Terms of the text to classify.
+        :return: Joined batch.
+        :return: Index of the text in the batch.
+        :return: Boolean indicating that the caller leads the batch.
+        """
+        with self.__lock:
+            batch = self.__pending.get(key)
+            is_leader = batch is None
+            if batch is None:
+                batch = _Batch()
+                self.__pending[key] = batch
+            batch.terms.append(terms)
+            if len(batch.terms) >= self.__max_size:
+                del self.__pending[key]
+                batch.closed.set()
+            else:
+                self.__close_if_complete()
+            return batch, len(batch.terms) - 1, is_leader
+
+    def __close(self, key: BatchKey, batch: _Batch) -> None:
+        """Stops a batch from accepting more texts.
+
+        :param key: ModelType and ModelSet of the batch.
+        :param batch: Batch to close.
+        """
+        with self.__lock:
+            if self.__pending.get(key) is batch:
+                del self.__pending[key]
+
+    def __close_if_complete(self) -> None:
+        """Closes all pending batches if every tracked thread has joined one,
+        must be called holding the lock.
+        """
+        pending = sum(len(batch.terms) for batch in self.__pending.values())
+        if pending and pending >= self.__callers:
+            for batch in self.__pending.values():
+                batch.closed.set()
+            self.__pending.clear()
+
+    def __run(self, key: BatchKey, batch: _Batch) -> None:
+        """Predicts the labels of a closed batch and wakes waiting threads.
+
+        :param key: ModelType and ModelSet to use for prediction.
+        :param batch: Batch to predict.
+        """
+        model_type, models = key
+        metrics.MICRO_BATCH_SIZE.observe(len(batch.terms))
+        try:
+            batch.labels = self.__predict(model_type, models, batch.terms)
+        except Exception as e:
+            batch.error = e
+        finally:
+            batch.done.set()
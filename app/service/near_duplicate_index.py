@@ -0,0 +1,147 @@
+# Standard library
+import re
+import zlib
+from threading import Lock
+from typing import Dict, List, Optional, Set
+
+# 3rd party modules
+import numpy as np
+
+
+# Largest prime below 2^32, so that hashed shingles and their permutations
+# fit in 32 bits and their products in 64 bits.
+_PRIME = 4294967291
+_SEED = 42
+_MIN_SHINGLES = 3
+_INITIAL_CAPACITY = 1024
+_NON_WORD = re.compile(r'\W+')
+_CASHTAG = '$'
+
+
+class NearDuplicateIndex:
+    """Index of spam texts that finds near duplicates of a text, i.e. texts
+    sharing most of their word pairs, such as the same spam posted with other
+    cashtags, links or emojis.
+
+    Each text is represented by a MinHash signature, where the share of
+    equal values of two signatures estimates the jaccard similarity of their
+    word pairs. Signatures are split into bands and indexed by the hash of
+    each band (locality sensitive hashing), so that only texts sharing at
+    least one band with a queried text are compared to it. Texts that already
+    have a near duplicate in the index are not added again, which keeps the
+    index to one text per spam campaign.
+    """
+
+    def __init__(self, threshold: float, num_perm: int = 32, bands: int = 8) -> None:
+        random_state = np.random.RandomState(_SEED)
+        self.__a = random_state.randint(1, _PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self.__b = random_state.randint(0, _PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self.__threshold = threshold
+        self.__bands = bands
+        self.__rows = num_perm // bands
+        self.__signatures = np.empty((_INITIAL_CAPACITY, num_perm), dtype=np.uint32)
+        self.__size = 0
+        self.__buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self.__lock = Lock()
+
+    def add(self, words: List[str]) -> bool:
+        """Adds a spam text to the index unless it is too short or already
+        has a near duplicate in the index.
+
+        :param words: Whitespace separated words of the text.
+        :return: Boolean indicating that the text was added.
+        """
+        signature = self.__calc_signature(words)
+        if signature is None:
+            return False
+        with self.__lock:
+            if self.__best_similarity(signature) >= self.__threshold:
+                return False
+            self.__insert(signature)
+        return True
+
+    def find(self, words: List[str]) -> bool:
+        """Checks if a text is a near duplicate of a text in the index.
+
+        :param words: Whitespace separated words of the text.
+        :return: Boolean.
+        """
+        signature = self.__calc_signature(words)
+        if signature is None:
+            return False
+        with self.__lock:
+            return self.__best_similarity(signature) >= self.__threshold
+
+    def size(self) -> int:
+        """Gets the number of texts in the index.
+
+        :return: Number of texts.
+        """
+        return self.__size
+
+    def __calc_signature(self, words: List[str]) -> Optional[np.ndarray]:
+        """Calculates the MinHash signature of the word pairs of a text,
+        as the min value of each hash permutation over the hashed pairs.
+
+        :param words: Whitespace separated words of the text.
+        :return: Signature or None if the text has too few word pairs.
+        """
+        shingles = _shingle(words)
+        if len(shingles) < _MIN_SHINGLES:
+            return None
+        hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        permuted = (self.__a * hashes + self.__b) % _PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def __best_similarity(self, signature: np.ndarray) -> float:
+        """Estimates the similarity of the most similar text in the index
+        that shares a band with a signature, must be called holding the lock.
+
+        :param signature: Signature of the text.
+        :return: Similarity between 0.0 and 1.0.
+        """
+        candidates: Set[int] = set()
+        for band, key in enumerate(self.__band_keys(signature)):
+            candidates.update(self.__buckets[band].get(key, ()))
+        if not candidates:
+            return 0.0
+        matches = self.__signatures[list(candidates)] == signature
+        return float(matches.mean(axis=1).max())
+
+    def __insert(self, signature: np.ndarray) -> None:
+        """Stores a signature and adds it to the bucket of each of its bands,
+        must be called holding the lock.
+
+        :param signature: Signature of the text.
+        """
+        if self.__size == len(self.__signatures):
+            self.__signatures = np.concatenate(
+                [self.__signatures, np.empty_like(self.__signatures)])
+        self.__signatures[self.__size] = signature
+        for band, key in enumerate(self.__band_keys(signature)):
+            self.__buckets[band].setdefault(key, []).append(self.__size)
+        self.__size += 1
+
+    def __band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.__rows:(band + 1) * self.__rows].tobytes()
+                for band in range(self.__bands)]
+
+
+def _shingle(words: List[str]) -> Set[str]:
+    """Creates the set of adjacent word pairs of a text. Cashtags are
+    replaced by a placeholder and non word characters, such as emojis
+    and punctuation, are removed.
+
+    :param words: Whitespace separated words of the text.
+    :return: Set of word pairs.
+    """
+    normalized = []
+    for word in words:
+        if word.startswith(_CASHTAG):
+            normalized.append(_CASHTAG)
+        else:
+            word = _NON_WORD.sub('', word)
+            if word:
+                normalized.append(word)
+    return {f'{first} {second}' for first, second in zip(normalized, normalized[1:])}
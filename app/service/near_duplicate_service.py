@@ -0,0 +1,61 @@
+# Standard library
+import logging
+import time
+from typing import Set
+
+# Internal modules
+from app.config import NEAR_DUPLICATE_RESCAN_INTERVAL
+from app.models import Label, format_text, tokenize
+from app.repository import SampleRepo, TrainingDataRepo
+from .near_duplicate_index import NearDuplicateIndex
+
+
+class NearDuplicateService:
+    """Fills a NearDuplicateIndex with spam labeled training data and result
+    samples confirmed as spam, and adds the ones labeled since on each update.
+
+    Result samples are stored when classified and confirmed later on, so a
+    sample can be confirmed after samples with higher ids have been indexed.
+    Updates only read samples stored since the last indexed one, and every
+    rescan interval the confirmed samples are read in full to pick up the
+    ones confirmed out of order.
+    """
+
+    __log = logging.getLogger('NearDuplicateService')
+
+    def __init__(self, training_data_repo: TrainingDataRepo, sample_repo: SampleRepo,
+                 index: NearDuplicateIndex,
+                 rescan_interval: float = NEAR_DUPLICATE_RESCAN_INTERVAL) -> None:
+        self.__training_data_repo = training_data_repo
+        self.__sample_repo = sample_repo
+        self.__index = index
+        self.__rescan_interval = rescan_interval
+        self.__last_training_id = 0
+        self.__last_sample_id = 0
+        self.__sample_ids: Set[int] = set()
+        self.__last_rescan = time.monotonic()
+
+    def update(self) -> None:
+        """Adds spam training data and confirmed spam result samples stored
+        after the ones seen in the last update, or all confirmed spam result
+        samples not indexed yet when the rescan interval has passed.
+        """
+        added = 0
+        for id, text, label in self.__training_data_repo.stream_since(self.__last_training_id):
+            self.__last_training_id = id
+            if label == Label.SPAM.value:
+                added += self.__add(text)
+        last_sample_id = self.__last_sample_id
+        if time.monotonic() - self.__last_rescan >= self.__rescan_interval:
+            self.__last_rescan = time.monotonic()
+            last_sample_id = 0
+        for id, text in self.__sample_repo.stream_confirmed(Label.SPAM.value, last_sample_id):
+            self.__last_sample_id = max(self.__last_sample_id, id)
+            if id not in self.__sample_ids:
+                self.__sample_ids.add(id)
+                added += self.__add(text)
+        if added:
+            self.__log.info(f'Indexed {added} spam texts, {self.__index.size()} in total')
+
+    def __add(self, text: str) -> int:
+        return int(self.__index.add(tokenize(format_text(text)).words))
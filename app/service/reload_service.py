@@ -0,0 +1,135 @@
+# Standard library
+import logging
+from collections import namedtuple
+from typing import Any, Dict, List, Optional, Tuple
+
+# Internal modules
+from app.models import Classifier, Compaction, CompiledModel, ModelType
+from app.models import compact_models, compile_model
+from app.repository import ArtifactRepo, ModelRepo, PublishedModels
+from .training_service import assemble_pipeline
+
+# 3rd party library
+from sklearn.base import BaseEstimator
+from sklearn.pipeline import Pipeline
+
+
+LoadedModels = namedtuple('LoadedModels', ['featurizer', 'models', 'classifiers', 'compiled'])
+
+
+class PublishedModelLoader:
+    """Loads the published models from their stored artifacts, compacted
+    and compiled the same way as when they were published.
+    """
+
+    __log = logging.getLogger('PublishedModelLoader')
+
+    def __init__(self, artifact_repo: ArtifactRepo,
+                 compaction: Optional[Compaction] = None) -> None:
+        self.__artifact_repo = artifact_repo
+        self.__compaction = compaction
+
+    def load(self, published: PublishedModels) -> Optional[LoadedModels]:
+        """Loads published models and their shared featurizer.
+
+        :param published: PublishedModels to load.
+        :return: LoadedModels or None if an artifact is missing.
+        """
+        featurizer = self.__artifact_repo.find_featurizer(published.featurizer_hash)
+        if featurizer is None:
+            self.__log.warning(f'Published featurizer {published.featurizer_hash} not found')
+            return None
+        estimators: Dict[ModelType, BaseEstimator] = {}
+        classifiers: Dict[ModelType, Classifier] = {}
+        for type_value, model_hash in published.model_hashes.items():
+            artifact = self.__artifact_repo.find(model_hash)
+            if artifact is None:
+                self.__log.warning(f'Published model {model_hash} not found')
+                return None
+            type = ModelType(type_value)
+            estimators[type], classifiers[type] = artifact
+        if self.__compaction is not None:
+            featurizer, estimators = self.__compact(
+                featurizer, estimators, classifiers, self.__compaction)
+        models: Dict[ModelType, Pipeline] = {}
+        compiled: Dict[ModelType, CompiledModel] = {}
+        for type, estimator in estimators.items():
+            models[type] = assemble_pipeline(featurizer, estimator)
+            compiled_model = self.__compile(
+                models[type], published.model_hashes[type.value], published.compiled_hashes)
+            if compiled_model is not None:
+                compiled[type] = compiled_model
+        return LoadedModels(featurizer, models, classifiers, compiled)
+
+    def __compact(self, featurizer: Any, estimators: Dict[ModelType, BaseEstimator],
+                  classifiers: Dict[ModelType, Classifier], compaction: Compaction
+                  ) -> Tuple[Any, Dict[ModelType, BaseEstimator]]:
+        """Compacts the published models the same way as when they were published.
+
+        :param featurizer: Published featurizer.
+        :param estimators: Published estimators by ModelType.
+        :param classifiers: Classifier metadata by ModelType.
+        :param compaction: Compaction to apply.
+        :return: Compacted featurizer and estimators, or the published ones
+                 if they cannot be compacted.
+        """
+        samples = next(iter(classifiers.values())).training_samples
+        compacted = compact_models(featurizer, estimators, samples, compaction)
+        if compacted is None:
+            self.__log.warning('Published models cannot be compacted')
+            return featurizer, estimators
+        compact_featurizer, compact_estimators = compacted
+        return compact_featurizer, dict(compact_estimators)
+
+    def __compile(self, model: Pipeline, model_hash: str,
+                  compiled_hashes: List[str]) -> Optional[CompiledModel]:
+        """Compiles a model for inference if it was verified when published.
+
+        :param model: Model pipeline.
+        :param model_hash: Hash of the model.
+        :param compiled_hashes: Hashes of the models verified to compile.
+        :return: CompiledModel or None.
+        """
+        if model_hash not in compiled_hashes:
+            return None
+        return compile_model(model)
+
+
+class ModelReloadService:
+    """Replaces the models in service with newer published ones,
+    without restarting the worker.
+    """
+
+    __log = logging.getLogger('ModelReloadService')
+
+    def __init__(self, artifact_repo: ArtifactRepo, model_repo: ModelRepo,
+                 compaction: Optional[Compaction] = None) -> None:
+        self.__artifact_repo = artifact_repo
+        self.__model_repo = model_repo
+        self.__loader = PublishedModelLoader(artifact_repo, compaction)
+
+    def reload(self) -> None:
+        """Loads the published models if they differ from the ones in service
+        and swaps them in. Requests already holding the previous models finish
+        on them, after which the previous models are freed.
+        """
+        published = self.__artifact_repo.find_published()
+        if published is None or not self.__has_changed(published.model_hashes):
+            return
+        loaded = self.__loader.load(published)
+        if loaded is None:
+            return
+        self.__model_repo.set_models(
+            loaded.featurizer, loaded.models, loaded.classifiers, loaded.compiled)
+        self.__log.info(f'Reloaded models: {list(loaded.classifiers.values())}')
+
+    def __has_changed(self, model_hashes: Dict[str, str]) -> bool:
+        """Checks if published model hashes differ from the ones in service.
+
+        :param model_hashes: Published model hashes by ModelType value.
+        :return: Boolean.
+        """
+        models = self.__model_repo.get_models()
+        return any(
+            models.get_model_hash(ModelType(type_value)) != model_hash
+            for type_value, model_hash in model_hashes.items())
@@ -0,0 +1,72 @@
+# Standard library
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+# Internal modules
+from app import metrics
+from app.models import ModelType, SpamResult
+
+
+CacheKey = Tuple[ModelType, str, str]
+
+
+class ResultCache:
+    """Bounded least recently used cache of classification results,
+    keyed by model type, model hash and normalized text. Hits, misses and
+    evictions are counted in the metrics registry.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._entries: "OrderedDict[CacheKey, SpamResult]" = OrderedDict()
+        self._model_hashes: Dict[ModelType, str] = {}
+        self._lock = Lock()
+
+    def get(self, key: CacheKey) -> Optional[SpamResult]:
+        """Gets a cached result and marks it as recently used.
+
+        :param key: Tuple of model type, model hash and normalized text.
+        :return: Cached SpamResult or None if not cached.
+        """
+        with self._lock:
+            self._check_model_hash(key)
+            res = self._entries.get(key)
+            if res is not None:
+                self._entries.move_to_end(key)
+        metrics.RESULT_CACHE_LOOKUPS.labels("miss" if res is None else "hit").inc()
+        return res
+
+    def put(self, key: CacheKey, res: SpamResult) -> None:
+        """Caches a result, evicting the least recently used one if full.
+
+        :param key: Tuple of model type, model hash and normalized text.
+        :param res: SpamResult to cache.
+        """
+        if self._max_size <= 0:
+            return
+        with self._lock:
+            self._check_model_hash(key)
+            self._entries[key] = res
+            self._entries.move_to_end(key)
+            evicted = len(self._entries) > self._max_size
+            if evicted:
+                self._entries.popitem(last=False)
+        if evicted:
+            metrics.RESULT_CACHE_EVICTIONS.inc()
+
+    def _check_model_hash(self, key: CacheKey) -> None:
+        """Drops the cached results of a model type if its model has changed,
+        since results of the replaced model can never be hit again. Results
+        of the other model types are kept.
+
+        :param key: Tuple of model type, model hash and normalized text.
+        """
+        model_type, model_hash, _ = key
+        known_hash = self._model_hashes.get(model_type)
+        if known_hash == model_hash:
+            return
+        if known_hash is not None:
+            for stale_key in [cached for cached in self._entries if cached[0] == model_type]:
+                del self._entries[stale_key]
+        self._model_hashes[model_type] = model_hash
@@ -0,0 +1,119 @@
+# Standard library
+import logging
+import time
+from threading import Event, Thread
+from typing import Callable, Optional, Union
+
+# Internal modules
+from app import app
+
+
+class PeriodicTask:
+    """Runs a function at a fixed interval in a background thread
+    of the current process, within an application context.
+    """
+
+    __log = logging.getLogger('PeriodicTask')
+
+    def __init__(self, name: str, interval: float, fn: Callable[[], None]) -> None:
+        self.__name = name
+        self.__interval = interval
+        self.__fn = fn
+        self.__stopped = Event()
+        self.__thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        """Starts running the task unless it is already running."""
+        if self.__thread is not None and self.__thread.is_alive():
+            return
+        self.__stopped.clear()
+        self.__thread = Thread(target=self.__run, name=self.__name, daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """Stops running the task and waits for an ongoing run to finish."""
+        self.__stopped.set()
+        if self.__thread is not None:
+            self.__thread.join()
+
+    def __run(self) -> None:
+        while not self.__stopped.wait(self.__interval):
+            try:
+                with app.app_context():
+                    self.__fn()
+            except Exception as e:
+                self.__log.error(f'Task {self.__name} failed: {e}')
+
+
+class BackgroundTask:
+    """Runs a function once in a background thread of the current process,
+    within an application context. A failed run is retried after a delay
+    that doubles with every attempt, until the retries are used up and the
+    task is marked as failed.
+    """
+
+    __log = logging.getLogger('BackgroundTask')
+
+    def __init__(self, name: str, fn: Callable[[], None],
+                 retries: int = 0, retry_delay: float = 0) -> None:
+        self.__name = name
+        self.__fn = fn
+        self.__retries = retries
+        self.__retry_delay = retry_delay
+        self.__failed = Event()
+        self.__thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        """Starts running the task unless it has already been started."""
+        if self.__thread is not None:
+            return
+        self.__thread = Thread(target=self.__run, name=self.__name, daemon=True)
+        self.__thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Waits for the task to finish.
+
+        :param timeout: Max number of seconds to wait.
+        """
+        if self.__thread is not None:
+            self.__thread.join(timeout)
+
+    def has_failed(self) -> bool:
+        """Checks if the task failed on every attempt.
+
+        :return: Boolean.
+        """
+        return self.__failed.is_set()
+
+    def __run(self) -> None:
+        for attempt in range(self.__retries + 1):
+            if attempt > 0:
+                time.sleep(self.__retry_delay * 2 ** (attempt - 1))
+            try:
+                with app.app_context():
+                    self.__fn()
+                return
+            except Exception as e:
+                self.__log.exception(
+                    f'Task {self.__name} failed, attempt {attempt + 1}/{self.__retries + 1}: {e}')
+        self.__failed.set()
+
+
+def start_in_workers(task: Union[PeriodicTask, BackgroundTask]) -> None:
+    """Starts a task in every worker process. Under uwsgi the app is loaded
+    in the master process before workers are forked and threads do not survive
+    the fork, so the task is started after fork instead. Tasks started from
+    within a worker, such as by the background model loader, start right away.
+
+    :param task: PeriodicTask or BackgroundTask to start.
+    """
+    try:
+        import uwsgi
+        from uwsgidecorators import postfork
+    except ImportError:
+        task.start()
+        return
+    if uwsgi.worker_id() > 0:
+        task.start()
+        return
+    postfork(task.start)
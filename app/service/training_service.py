@@ -1,169 +1,734 @@
 # Standard library
+import json
 import logging
-import re
+import os
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import sha1
-from typing import Iterable, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 # Internal modules
-from app.models import Classifier, ModelType, TrainingData
-from app.repository import TrainingDataRepo
+from app.config import COMPILED_INFERENCE, HASHING_FEATURES, TRAINING_WORKERS
+from app.config import TRAINING_SAMPLE_CAP
+from app.models import Classifier, CompiledModel, FeaturizerType, ModelType
+from app.models import Compaction, compact_models, compile_model, verify_compiled
+from app.models import analyze_terms, format_text, tokenize_all
+from app.repository import ArtifactRepo, TrainingDataRepo, TunedParams
+from app.repository import TEST_SPLIT
+from .cascade import CASCADE_TYPES, CascadeReport, evaluate_cascade
+from .memory import object_size
 
 # 3rd party library
+import numpy as np
+from sklearn.base import BaseEstimator, clone
 from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer
 from sklearn.feature_extraction.text import TfidfTransformer
 from sklearn.metrics import f1_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler, StratifiedKFold
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.svm import LinearSVC
 from sklearn.linear_model import SGDClassifier
 from sklearn.pipeline import Pipeline
-from stop_words import get_stop_words
+try:
+    from joblib import Parallel, delayed
+except ImportError:
+    from sklearn.externals.joblib import Parallel, delayed
 
 
 DataList = namedtuple('DataList', ['texts', 'labels'])
+FeatureData = namedtuple('FeatureData', [
+    'featurizer', 'featurizer_hash', 'training_data', 'training_matrix',
+    'test_data', 'test_matrix'])
+TrainedModel = namedtuple('TrainedModel', ['model', 'classifier', 'compiled'])
+FoldFeatures = namedtuple('FoldFeatures', [
+    'training_matrix', 'training_labels', 'test_matrix', 'test_labels'])
+CompactionReport = namedtuple('CompactionReport', [
+    'test_samples', 'features', 'compact_features', 'bytes', 'compact_bytes',
+    'agreement', 'accuracy', 'compact_accuracy'])
+
+
+_FEATURIZER_NAME = 'FEATURIZER-TERMS'
+_HASH_CHUNK_SIZE = 10000
+_SEARCH_SEED = 42
+_NO_PARAMS = TunedParams(featurizer_type=None, featurizer={}, models={}, scores={})
+
+# Hyperparameters searched when tuning, by featurizer and model type.
+_FEATURIZER_SEARCH_SPACE: Dict[FeaturizerType, Dict[str, List[Any]]] = {
+    FeaturizerType.COUNT: {
+        'counter__min_df': [1, 2, 3],
+        'tfidf__sublinear_tf': [False, True],
+    },
+    FeaturizerType.HASHING: {
+        'tfidf__sublinear_tf': [False, True],
+    },
+}
+_MODEL_SEARCH_SPACE: Dict[ModelType, Dict[str, List[Any]]] = {
+    ModelType.SVM: {
+        'C': [0.1, 0.25, 0.5, 1.0, 2.0],
+    },
+    ModelType.NAIVE_BAYES: {
+        'alpha': [0.01, 0.05, 0.1, 0.5, 1.0],
+    },
+}
 
 
 class TrainingService:
 
     __log = logging.getLogger('TrainingServiceImpl')
 
-    def __init__(self, sample_repo: TrainingDataRepo) -> None:
+    def __init__(self, sample_repo: TrainingDataRepo, artifact_repo: ArtifactRepo,
+                 featurizer_type: FeaturizerType = FeaturizerType.COUNT,
+                 hashing_features: int = HASHING_FEATURES,
+                 workers: int = TRAINING_WORKERS,
+                 compile: bool = COMPILED_INFERENCE,
+                 compaction: Optional[Compaction] = None,
+                 sample_cap: int = TRAINING_SAMPLE_CAP) -> None:
         self.__sample_repo = sample_repo
+        self.__artifact_repo = artifact_repo
+        self.__featurizer_type = featurizer_type
+        self.__hashing_features = hashing_features
+        self.__workers = workers
+        self.__compile = compile
+        self.__compaction = compaction
+        self.__sample_cap = sample_cap
+        self.__params = _NO_PARAMS
 
     def train_model(self, type: ModelType) -> Tuple[Pipeline, Classifier]:
-        """Retrieves training data and creates a model.
+        """Retrieves training data and creates a model. If a model artifact
+        has already been stored for the same data it is loaded instead of trained.
 
         :param type: Type of model to train.
         :return: Trained model.
         :return: Classifier metadata.
         """
+        _, models = self.train_models([type])
+        return models[type].model, models[type].classifier
+
+    def train_models(self, types: List[ModelType]
+                     ) -> Tuple[Pipeline, Dict[ModelType, TrainedModel]]:
+        """Retrieves training data and creates models of the given types that
+        all share a single fitted featurizer. Stored artifacts for the same
+        data are loaded instead of trained, the other models are trained at
+        the same time in a pool of threads. Hyperparameters stored by
+        tune_models are used if there are any. If enabled, the models are
+        compacted, and compiled for inference and verified to predict the
+        same labels on the test data. The models are then published as the
+        latest models for running workers to reload.
+
+        :param types: Types of models to train.
+        :return: Shared featurizer.
+        :return: Trained models and their metadata by ModelType.
+        """
+        corpus_marker = self.find_corpus_marker(types)
+        features, models = self.__load_or_train(
+            types, transform_test=self.__compile or self.__compaction is not None)
+        if self.__compaction is not None:
+            features, models = self.__compact_models(features, models, self.__compaction)
+        if self.__compile:
+            models = self.__compile_models(models, features)
+        self.__artifact_repo.publish(
+            features.featurizer_hash, [m.classifier for m in models.values()],
+            [m.classifier.model_hash for m in models.values() if m.compiled],
+            corpus_marker)
+        return features.featurizer, models
+
+    def find_corpus_marker(self, types: List[ModelType]) -> str:
+        """Describes the training data and the configuration that models of
+        the given types would be trained with, without reading the data. As
+        training data is only ever added, models published with the same
+        marker were trained on the same data.
+
+        :param types: Types of models.
+        :return: Row count and max id of the training data, and a hash of the configuration.
+        """
+        self.__params = self.__find_params()
+        rows, max_id = self.__sample_repo.find_corpus_marker()
+        signature = self.__featurizer_signature() + ''.join(
+            type.value + _params_signature(self.__model_params(type)) for type in types)
+        signature += f'{self.__sample_cap}{self.__compaction}{self.__compile}'
+        config_hash = sha1(signature.encode('utf-8')).hexdigest()
+        return f'{rows}-{max_id}-{config_hash}'
+
+    def evaluate_cascade(self, thresholds: List[float]) -> List[CascadeReport]:
+        """Evaluates the CASCADE model type on the test data for a range of
+        thresholds, reporting the share of texts escalated to the second model
+        and the accuracy and prediction time compared with either model alone.
+        Stored models for the training data are used, missing ones are trained
+        and stored but not published.
+
+        :param thresholds: Min class probabilities to accept a prediction of
+                           the first model.
+        :return: CascadeReport per threshold.
+        """
+        features, models = self.__load_or_train(list(CASCADE_TYPES), transform_test=True)
+        first, second = (models[type].model.named_steps['classifier'] for type in CASCADE_TYPES)
+        reports = evaluate_cascade(
+            first, second, features.test_matrix, features.test_data.labels, thresholds)
+        for report in reports:
+            self.__log.info(f'Evaluated cascade: {report}')
+        return reports
+
+    def verify_compaction(self, types: List[ModelType],
+                          compaction: Compaction) -> Optional[CompactionReport]:
+        """Compacts models and reports the share of test texts on which the
+        compacted models predict the same labels as the uncompacted ones,
+        together with their accuracy, number of features and memory. Stored
+        models for the training data are used, missing ones are trained and
+        stored but not published.
+
+        :param types: Types of models to compact.
+        :param compaction: Compaction to apply.
+        :return: CompactionReport or None if the models cannot be compacted.
+        """
+        features, models = self.__load_or_train(types, transform_test=True)
+        compacted = self.__compact(features, models, compaction)
+        return compacted[2] if compacted else None
+
+    def __load_or_train(self, types: List[ModelType], transform_test: bool
+                        ) -> Tuple[FeatureData, Dict[ModelType, TrainedModel]]:
+        """Loads the stored models of the given types for the training data
+        and trains the missing ones at the same time in a pool of threads.
+
+        :param types: Types of models.
+        :param transform_test: Whether to transform the test texts regardless.
+        :return: FeatureData.
+        :return: Trained models and their metadata by ModelType.
+        """
+        self.__params = self.__find_params()
         training_data, test_data = self.__get_and_split_data()
-        model = self.__init_model(type)
-        model.fit(training_data.texts, training_data.labels)
-        metadata = self.__create_metadata(model, type, training_data, test_data)
-        return model, metadata
+        model_hashes = {type: self.__calc_model_hash(type.value, training_data,
+                                                     self.__model_params(type))
+                        for type in types}
+        artifacts = {type: self.__artifact_repo.find(model_hash)
+                     for type, model_hash in model_hashes.items()}
+        features = self.__featurize(
+            training_data, test_data, transform=not all(artifacts.values()),
+            transform_test=transform_test)
+        with ThreadPoolExecutor(max_workers=self.__count_workers(len(types))) as executor:
+            futures = {
+                type: executor.submit(
+                    self.__get_model, type, model_hashes[type], artifacts[type], features)
+                for type in types}
+            models = {type: future.result() for type, future in futures.items()}
+        return features, models
+
+    def tune_models(self, types: List[ModelType], folds: int = 5, iterations: int = 0,
+                    jobs: int = -1) -> TunedParams:
+        """Searches for the featurizer and model hyperparameters with the best
+        f1 score in k-fold cross validation on the training data, and stores
+        them to be used by later training. Texts are tokenized once up front
+        and the folds are featurized once per featurizer candidate, after
+        which all model candidates are fitted on the cached fold features.
+        Folds and candidates are evaluated in parallel processes.
+
+        :param types: Types of models to tune.
+        :param folds: Number of cross validation folds.
+        :param iterations: Number of random candidates, searches all if 0.
+        :param jobs: Number of parallel processes, all cpus if -1.
+        :return: TunedParams.
+        """
+        training_data, _ = self.__get_and_split_data()
+        terms = [tokenized.terms for tokenized in tokenize_all(training_data.texts)]
+        labels = np.asarray(training_data.labels)
+        cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=_SEARCH_SEED)
+        splits = list(cv.split(terms, labels))
+        estimators = {type: self.__init_model(type, {}) for type in types}
+        results = []
+        with Parallel(n_jobs=jobs) as parallel:
+            for featurizer_params, candidates in _search_candidates(
+                    self.__featurizer_type, types, iterations):
+                featurizer = create_featurizer(self.__featurizer_type, self.__hashing_features)
+                featurizer.set_params(**featurizer_params)
+                fold_features = parallel(
+                    delayed(_featurize_fold)(clone(featurizer), terms, labels, split)
+                    for split in splits)
+                tasks = [(type, params) for type in types for params in candidates[type]]
+                scores = parallel(
+                    delayed(_score_fold)(clone(estimators[type]).set_params(**params), features)
+                    for type, params in tasks for features in fold_features)
+                results.append(_best_models(featurizer_params, tasks, scores, len(splits)))
+                self.__log.info(f'Evaluated featurizer candidate: {results[-1]}')
+        params = _select_params(self.__featurizer_type, results)
+        self.__log.info(f'Tuned params: {params}')
+        self.__artifact_repo.save_params(params)
+        return params
+
+    def __featurize(self, training_data: DataList, test_data: DataList,
+                    transform: bool, transform_test: bool = False) -> FeatureData:
+        """Loads a stored featurizer for the training data or fits a new one
+        and transforms the training and test texts once for all model types.
+        The texts are only transformed if a model needs to be trained.
+
+        :param training_data: DataList used for model training.
+        :param test_data: DataList used for model evaluation.
+        :param transform: Whether to transform the training and test texts.
+        :param transform_test: Whether to transform the test texts regardless.
+        :return: FeatureData, without matrices if not transformed.
+        """
+        featurizer_hash = self.__calc_model_hash(_FEATURIZER_NAME, training_data, {})
+        featurizer = self.__artifact_repo.find_featurizer(featurizer_hash)
+        training_matrix, test_matrix = None, None
+        if featurizer is None:
+            featurizer = self.__init_featurizer()
+            if transform:
+                training_matrix = featurizer.fit_transform(training_data.texts)
+            else:
+                featurizer.fit(training_data.texts)
+            self.__artifact_repo.save_featurizer(featurizer_hash, featurizer)
+            if self.__artifact_repo.is_memory_mapped():
+                featurizer = self.__artifact_repo.find_featurizer(featurizer_hash) or featurizer
+        elif transform:
+            training_matrix = featurizer.transform(training_data.texts)
+        if transform or transform_test:
+            test_matrix = featurizer.transform(test_data.texts)
+        return FeatureData(featurizer, featurizer_hash, training_data, training_matrix,
+                           test_data, test_matrix)
+
+    def __get_model(self, type: ModelType, model_hash: str,
+                    artifact: Optional[Tuple[BaseEstimator, Classifier]],
+                    features: FeatureData) -> TrainedModel:
+        """Uses the stored model for the training data if there is one,
+        without training or evaluating it again. Trains a new one otherwise.
+
+        :param type: Type of model to train.
+        :param model_hash: Hash of the model and its training data.
+        :param artifact: Stored model and Classifier metadata, if any.
+        :param features: Featurized training and test data.
+        :return: Trained model pipeline and Classifier metadata.
+        """
+        if artifact:
+            estimator, metadata = artifact
+            self.__log.info(f'Loaded stored model: {metadata}')
+            model = assemble_pipeline(features.featurizer, estimator)
+            return TrainedModel(model, metadata, None)
+        estimator = self.__init_model(type, self.__model_params(type))
+        estimator.fit(features.training_matrix, features.training_data.labels)
+        model = assemble_pipeline(features.featurizer, estimator)
+        metadata = self.__create_metadata(model, type, model_hash, features)
+        self.__artifact_repo.save(estimator, metadata)
+        if self.__artifact_repo.is_memory_mapped():
+            stored = self.__artifact_repo.find(model_hash)
+            if stored:
+                model = assemble_pipeline(features.featurizer, stored[0])
+        return TrainedModel(model, metadata, None)
+
+    def __compact_models(self, features: FeatureData, models: Dict[ModelType, TrainedModel],
+                         compaction: Compaction
+                         ) -> Tuple[FeatureData, Dict[ModelType, TrainedModel]]:
+        """Replaces models and their shared featurizer with compacted ones.
+
+        :param features: Featurized training and test data.
+        :param models: Trained models by ModelType.
+        :param compaction: Compaction to apply.
+        :return: FeatureData with the compacted featurizer and test matrix.
+        :return: Compacted models by ModelType.
+        """
+        compacted = self.__compact(features, models, compaction)
+        if compacted is None:
+            self.__log.warning('Models cannot be compacted, using them as they are')
+            return features, models
+        features, compacted_models, report = compacted
+        self.__log.info(f'Compacted models: {report}')
+        return features, compacted_models
+
+    def __compact(self, features: FeatureData, models: Dict[ModelType, TrainedModel],
+                  compaction: Compaction
+                  ) -> Optional[Tuple[FeatureData, Dict[ModelType, TrainedModel],
+                                      CompactionReport]]:
+        """Compacts models and their shared featurizer, and compares them with
+        the uncompacted ones on the test data.
+
+        :param features: Featurized training and test data.
+        :param models: Trained models by ModelType.
+        :param compaction: Compaction to apply.
+        :return: FeatureData with the compacted featurizer and test matrix,
+                 compacted models by ModelType and a CompactionReport,
+                 or None if the models cannot be compacted.
+        """
+        estimators = {type: trained.model.named_steps['classifier']
+                      for type, trained in models.items()}
+        compacted = compact_models(features.featurizer, estimators,
+                                   len(features.training_data.labels), compaction)
+        if compacted is None:
+            return None
+        featurizer, compact_estimators = compacted
+        test_matrix = featurizer.transform(features.test_data.texts)
+        labels = features.test_data.labels
+        predictions = {type: estimator.predict(features.test_matrix)
+                       for type, estimator in estimators.items()}
+        compact_predictions = {type: estimator.predict(test_matrix)
+                               for type, estimator in compact_estimators.items()}
+        report = CompactionReport(
+            test_samples=len(labels),
+            features=features.test_matrix.shape[1],
+            compact_features=test_matrix.shape[1],
+            bytes=object_size(features.featurizer, *estimators.values()),
+            compact_bytes=object_size(featurizer, *compact_estimators.values()),
+            agreement={type.value: float(np.mean(predictions[type] == compact_predictions[type]))
+                       for type in models},
+            accuracy={type.value: f1_score(labels, predictions[type], average='micro')
+                      for type in models},
+            compact_accuracy={type.value: f1_score(labels, compact_predictions[type],
+                                                   average='micro')
+                              for type in models})
+        compacted_models = {
+            type: trained._replace(
+                model=assemble_pipeline(featurizer, compact_estimators[type]))
+            for type, trained in models.items()}
+        return features._replace(featurizer=featurizer, test_matrix=test_matrix), \
+            compacted_models, report
+
+    def __compile_models(self, models: Dict[ModelType, TrainedModel],
+                         features: FeatureData) -> Dict[ModelType, TrainedModel]:
+        """Compiles models for inference and keeps the compiled versions
+        that predict the same labels as their pipelines on the test data.
+
+        :param models: Trained models by ModelType.
+        :param features: Featurized training and test data.
+        :return: Trained models with their compiled versions by ModelType.
+        """
+        terms = [tokenized.terms for tokenized in tokenize_all(features.test_data.texts)]
+        compiled_models = {}
+        for type, trained in models.items():
+            compiled = self.__compile_model(trained, terms, features)
+            compiled_models[type] = trained._replace(compiled=compiled)
+        return compiled_models
+
+    def __compile_model(self, trained: TrainedModel, terms: List[List[str]],
+                        features: FeatureData) -> Optional[CompiledModel]:
+        """Compiles a model for inference and verifies it on the test data.
+
+        :param trained: Trained model.
+        :param terms: Tokenized test texts.
+        :param features: Featurized training and test data.
+        :return: CompiledModel or None if not compilable or not verified.
+        """
+        compiled = compile_model(trained.model)
+        if compiled is None:
+            self.__log.info(f'Model cannot be compiled: {trained.classifier.model_hash}')
+            return None
+        expected = trained.model.named_steps['classifier'].predict(features.test_matrix)
+        mismatches = verify_compiled(compiled, terms, expected)
+        if mismatches:
+            self.__log.warning(
+                f'Compiled model {trained.classifier.model_hash} differs '
+                f'on {mismatches} of {len(terms)} test texts, not compiling')
+            return None
+        self.__log.info(f'Compiled model verified on {len(terms)} test texts: '
+                        f'{trained.classifier.model_hash}')
+        return compiled
+
+    def __init_featurizer(self) -> Pipeline:
+        """Initalizes an unfitted featurizer shared by all model types.
+
+        :return: Sklearn Pipeline with vectorization and tfidf weighting.
+        """
+        featurizer = create_featurizer(self.__featurizer_type, self.__hashing_features)
+        return featurizer.set_params(**self.__params.featurizer)
 
-    def __init_svm_model(self) -> Pipeline:
+    def __init_svm_model(self) -> BaseEstimator:
         """Initalizes an untrained Support Vector Machine model.
 
-        :return: Sklearn Pipeline with vectorization and prediction model.
+        :return: Sklearn prediction model.
         """
-        return Pipeline([
-            ('counter', CountVectorizer(stop_words=get_stop_words('english'))),
-            ('tfidf', TfidfTransformer()),
-            ('classifier', LinearSVC())
-        ])
+        return LinearSVC()
 
-    def __init_naive_bayes_model(self) -> Pipeline:
+    def __init_naive_bayes_model(self) -> BaseEstimator:
         """Initalizes an untrained Mulitonomial Naive Bayes model.
 
-        :return: Sklearn Pipeline with vectorization and prediction model.
+        :return: Sklearn prediction model.
         """
-        return Pipeline([
-            ('counter', CountVectorizer(stop_words=get_stop_words('english'))),
-            ('tfidf', TfidfTransformer()),
-            ('classifier', MultinomialNB())
-        ])
+        return MultinomialNB()
 
-    def __init_logistic_regression_model(self) -> Pipeline:
+    def __init_logistic_regression_model(self) -> BaseEstimator:
         """Initalizes an untrained Logistic Regression model.
 
-        :return: Sklearn Pipeline with vectorization and prediction model.
+        :return: Sklearn prediction model.
         """
-        return Pipeline([
-            ('counter', CountVectorizer(stop_words=get_stop_words('english'))),
-            ('tfidf', TfidfTransformer()),
-            ('classifier', SGDClassifier(loss='log'))
-        ])
+        return SGDClassifier(loss='log')
 
-    def __init_model(self, type: ModelType) -> Pipeline:
+    def __init_model(self, type: ModelType, params: Dict[str, Any]) -> BaseEstimator:
         """Intalizes a model of a given type.
 
         :param type: Type of model to initialize.
-        :return: Sklearn pipeline of a given type.
+        :param params: Hyperparameters to override the defaults with.
+        :return: Sklearn prediction model of a given type.
         """
         if type == ModelType.SVM:
-            return self.__init_svm_model()
-        return self.__init_naive_bayes_model()
+            return self.__init_svm_model().set_params(**params)
+        return self.__init_naive_bayes_model().set_params(**params)
 
-    def __create_metadata(self, model: Pipeline, type: ModelType,
-                          training_data: DataList, test_data: DataList) -> Classifier:
+    def __find_params(self) -> TunedParams:
+        """Gets the stored hyperparameters if they were tuned
+        for the configured featurizer type.
+
+        :return: TunedParams, empty if not tuned.
+        """
+        params = self.__artifact_repo.find_params()
+        if params is None:
+            return _NO_PARAMS
+        if params.featurizer_type != self.__featurizer_type.value:
+            self.__log.warning(
+                f'Ignoring params tuned for featurizer {params.featurizer_type}')
+            return _NO_PARAMS
+        return params
+
+    def __model_params(self, type: ModelType) -> Dict[str, Any]:
+        return self.__params.models.get(type.value, {})
+
+    def __create_metadata(self, model: Pipeline, type: ModelType, model_hash: str,
+                          features: FeatureData) -> Classifier:
         """Creates a metadata object for a trained model.
 
         :return: Classifier
         """
         classifier = Classifier(
             type = type.value,
-            training_samples = len(training_data.labels),
-            test_samples = len(test_data.labels),
-            accuracy = self.__check_model_accuracy(model, test_data),
-            model_hash = self.__calc_model_hash(type, training_data))
+            training_samples = len(features.training_data.labels),
+            test_samples = len(features.test_data.labels),
+            accuracy = self.__check_model_accuracy(model, features),
+            model_hash = model_hash)
         self.__log.info(f'Trained model: {classifier}')
         return classifier
 
-    def __check_model_accuracy(self, model: Pipeline, test_data: DataList) -> float:
+    def __check_model_accuracy(self, model: Pipeline, features: FeatureData) -> float:
         """Checks the prediction accuracy of a trained model.
 
         :param model: Trained model pipeline.
-        :param test_data: Test data set as a DataList.
+        :param features: Featurized training and test data.
         :return: Accuracy score between 0.0 and 1.0
         """
-        predictions = model.predict(test_data.texts)
-        return f1_score(test_data.labels, predictions, average='micro')
+        predictions = model.named_steps['classifier'].predict(features.test_matrix)
+        return f1_score(features.test_data.labels, predictions, average='micro')
+
+    def __count_workers(self, models: int) -> int:
+        """Determines the number of threads to train models with, by default
+        one per model capped at the number of cpus.
+
+        :param models: Number of models to train.
+        :return: Number of threads.
+        """
+        if self.__workers > 0:
+            return self.__workers
+        return max(1, min(models, os.cpu_count() or 1))
+
+    def __featurizer_signature(self) -> str:
+        """Describes the featurizer configuration for use in model hashes.
+
+        :return: Signature, empty for the default featurizer.
+        """
+        signature = ''
+        if self.__featurizer_type == FeaturizerType.HASHING:
+            signature = f'{self.__featurizer_type.value}-{self.__hashing_features}'
+        return signature + _params_signature(self.__params.featurizer)
 
     def __get_and_split_data(self) -> Tuple[DataList, DataList]:
-        """Retrieves training data and splits between training and test data.
+        """Streams training data from the database split between training and
+        test data by the hash of its id, where a fifth of the samples is used
+        for testing. If capped, at most sample_cap training samples per label
+        are used, and proportionally fewer test samples.
 
         :return: DataList with training data.
         :return: DataList with test data.
         """
-        samples = self.__sample_repo.get_all()
-        test_list = {s.id: s for s in samples[::5]}
-        training_list = [s for s in samples if s.id not in test_list]
-        test_data = self.__samples_to_datalist(test_list.values())
-        training_data = self.__samples_to_datalist(training_list)
+        training_data = DataList(texts=[], labels=[])
+        test_data = DataList(texts=[], labels=[])
+        test_cap = -(-self.__sample_cap // (TEST_SPLIT - 1))
+        for _, text, label, is_test in self.__sample_repo.stream_split(
+                self.__sample_cap, test_cap):
+            data = test_data if is_test else training_data
+            data.texts.append(format_text(text))
+            data.labels.append(label)
         return training_data, test_data
 
-    def __samples_to_datalist(self, training_data: Iterable[TrainingData]) -> DataList:
-        """Transformes a list of TrainingData into
-        a DataList of texts and labels.
+    def __calc_model_hash(self, name: str, training_data: DataList,
+                          params: Dict[str, Any]) -> str:
+        """Calculates the sha1 hash of the data used to train the model,
+        updated a chunk of samples at a time. The digest is the same as the
+        one of all texts and labels joined into a single string.
+        Models using a non default featurizer or tuned hyperparameters
+        get a hash of their own.
 
-        :param training_data: TrainingData list.
-        :return: DataList
-        """
-        texts = [format_text(td.text) for td in training_data]
-        labels = [td.label for td in training_data]
-        return DataList(texts=texts, labels=labels)
-
-    def __calc_model_hash(self, type, training_data) -> str:
-        """Calculates the sha1 hash of the data used to train the model.
-
-        :param type: ModelType.
+        :param name: Name of the model, i.e. the ModelType value.
         :param training_data: DataList used for model training.
+        :param params: Tuned hyperparameters of the model.
         :return: Hexdigest of the models training data
         """
-        texts = ''.join([text for text in training_data.texts])
-        labels = ''.join([label for label in training_data.labels])
-        model_str = type.value + texts + labels
-        return sha1((model_str).encode('utf-8')).hexdigest()
+        signature = name + self.__featurizer_signature() + _params_signature(params)
+        model_hash = sha1(signature.encode('utf-8'))
+        for values in (training_data.texts, training_data.labels):
+            for i in range(0, len(values), _HASH_CHUNK_SIZE):
+                model_hash.update(''.join(values[i:i + _HASH_CHUNK_SIZE]).encode('utf-8'))
+        return model_hash.hexdigest()
+
+
+def _search_candidates(featurizer_type: FeaturizerType, types: List[ModelType],
+                       iterations: int
+                       ) -> List[Tuple[Dict[str, Any], Dict[ModelType, List[Dict[str, Any]]]]]:
+    """Lists the hyperparameter candidates to evaluate grouped by featurizer
+    parameters, so that the folds only need to be featurized once for each
+    group. Either every combination of parameters, or a random sample from
+    the combined featurizer and model search spaces.
+
+    :param featurizer_type: Type of the featurizer to tune.
+    :param types: Types of models to tune.
+    :param iterations: Number of random candidates, all candidates if 0.
+    :return: Featurizer parameters and model parameter candidates by ModelType.
+    """
+    featurizer_space = _FEATURIZER_SEARCH_SPACE[featurizer_type]
+    if iterations <= 0:
+        return [(featurizer_params, {type: list(ParameterGrid(_MODEL_SEARCH_SPACE[type]))
+                                     for type in types})
+                for featurizer_params in ParameterGrid(featurizer_space)]
+    space = {f'featurizer__{name}': values for name, values in featurizer_space.items()}
+    for type in types:
+        space.update({f'{type.value}__{name}': values
+                      for name, values in _MODEL_SEARCH_SPACE[type].items()})
+    sampled = ParameterSampler(space, min(iterations, len(ParameterGrid(space))),
+                               random_state=_SEARCH_SEED)
+    groups: Dict[str, Tuple[Dict[str, Any], Dict[ModelType, List[Dict[str, Any]]]]] = {}
+    for candidate in sampled:
+        featurizer_params = _unprefix_params('featurizer', candidate)
+        _, candidates = groups.setdefault(
+            _params_signature(featurizer_params),
+            (featurizer_params, {type: [] for type in types}))
+        for type in types:
+            params = _unprefix_params(type.value, candidate)
+            if params not in candidates[type]:
+                candidates[type].append(params)
+    return list(groups.values())
+
+
+def _featurize_fold(featurizer: Pipeline, terms: List[List[str]], labels: np.ndarray,
+                    split: Tuple[np.ndarray, np.ndarray]) -> FoldFeatures:
+    """Fits a featurizer on the training part of a cross validation fold and
+    transforms both parts of it.
+
+    :param featurizer: Unfitted featurizer.
+    :param terms: Tokenized texts.
+    :param labels: Labels of the texts.
+    :param split: Indices of the training and test part of the fold.
+    :return: FoldFeatures.
+    """
+    train_index, test_index = split
+    training_matrix = featurizer.fit_transform([terms[i] for i in train_index])
+    test_matrix = featurizer.transform([terms[i] for i in test_index])
+    return FoldFeatures(training_matrix, labels[train_index], test_matrix, labels[test_index])
+
+
+def _score_fold(estimator: BaseEstimator, features: FoldFeatures) -> float:
+    """Fits a model on the training part of a featurized fold and scores its
+    predictions on the test part.
+
+    :param estimator: Unfitted prediction model.
+    :param features: FoldFeatures.
+    :return: f1 score between 0.0 and 1.0
+    """
+    estimator.fit(features.training_matrix, features.training_labels)
+    predictions = estimator.predict(features.test_matrix)
+    return f1_score(features.test_labels, predictions, average='micro')
+
+
+def _best_models(featurizer_params: Dict[str, Any],
+                 tasks: List[Tuple[ModelType, Dict[str, Any]]], scores: List[float],
+                 folds: int) -> Tuple[Dict[str, Any], Dict[ModelType, Tuple[Dict[str, Any], float]]]:
+    """Finds the model parameters with the best mean score across folds
+    for each model type.
+
+    :param featurizer_params: Featurizer parameters the models were scored with.
+    :param tasks: Evaluated model types and parameters.
+    :param scores: Scores of each task on each fold, in order.
+    :param folds: Number of folds.
+    :return: Featurizer parameters.
+    :return: Best model parameters and their mean scores by ModelType.
+    """
+    best: Dict[ModelType, Tuple[Dict[str, Any], float]] = {}
+    for i, (type, params) in enumerate(tasks):
+        score = float(np.mean(scores[i * folds:(i + 1) * folds]))
+        if type not in best or score > best[type][1]:
+            best[type] = (params, score)
+    return featurizer_params, best
+
+
+def _select_params(featurizer_type: FeaturizerType,
+                   results: List[Tuple[Dict[str, Any],
+                                       Dict[ModelType, Tuple[Dict[str, Any], float]]]]
+                   ) -> TunedParams:
+    """Selects the featurizer parameters with the best mean score across
+    model types, since all models share one featurizer, together with the
+    best parameters of each model type given that featurizer.
+
+    :param featurizer_type: Type of the tuned featurizer.
+    :param results: Featurizer parameters and the best models scored with them.
+    :return: TunedParams.
+    """
+    featurizer_params, best = max(
+        results, key=lambda result: np.mean([score for _, score in result[1].values()]))
+    return TunedParams(
+        featurizer_type=featurizer_type.value,
+        featurizer=featurizer_params,
+        models={type.value: params for type, (params, _) in best.items()},
+        scores={type.value: score for type, (_, score) in best.items()})
 
 
-# Regex for identifiying URLs.
-_URL_PATTERN = re.compile(r'(https?|ftp):\/\/[\.[a-zA-Z0-9\/\-]+')
+def _unprefix_params(prefix: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    start = len(prefix) + 2
+    return {name[start:]: value for name, value in params.items()
+            if name.startswith(f'{prefix}__')}
 
 
-def format_text(original: str) -> str:
-    """Strips an original string of URLs, double, leading and trailing spaces.
+def _params_signature(params: Dict[str, Any]) -> str:
+    """Describes hyperparameters for use in model hashes.
 
-    :param original: String to format.
-    :return: Formated string.
+    :param params: Hyperparameters.
+    :return: Signature, empty for default hyperparameters.
     """
-    return _URL_PATTERN.sub('', original).replace('  ', ' ').strip().lower()
+    return json.dumps(params, sort_keys=True) if params else ''
+
+
+def create_featurizer(type: FeaturizerType = FeaturizerType.COUNT,
+                      hashing_features: int = HASHING_FEATURES) -> Pipeline:
+    """Creates an unfitted featurizer of a given type. The COUNT featurizer
+    keeps a vocabulary that grows with the training data, while the HASHING
+    featurizer maps terms into a fixed number of features. Both accept
+    formated texts as well as terms that have already been tokenized.
+
+    :param type: Type of featurizer to create.
+    :param hashing_features: Number of features used by the HASHING featurizer.
+    :return: Sklearn Pipeline with vectorization and tfidf weighting.
+    """
+    if type == FeaturizerType.HASHING:
+        vectorizer = HashingVectorizer(
+            n_features=hashing_features, analyzer=analyze_terms,
+            alternate_sign=False, norm=None)
+        return Pipeline([
+            ('hasher', vectorizer),
+            ('tfidf', TfidfTransformer())
+        ])
+    return Pipeline([
+        ('counter', CountVectorizer(analyzer=analyze_terms)),
+        ('tfidf', TfidfTransformer())
+    ])
 
 
 def dummy_pipeline() -> Pipeline:
     """Creates an untrained placeholder pipeline"""
     return Pipeline([
-        ('counter', CountVectorizer()),
+        ('featurizer', CountVectorizer(analyzer=analyze_terms)),
         ('classifier', MultinomialNB())
     ])
+
+
+def assemble_pipeline(featurizer: Pipeline, estimator: BaseEstimator) -> Pipeline:
+    """Combines a fitted featurizer and a fitted prediction model into
+    a pipeline that predicts on raw texts.
+
+    :param featurizer: Fitted featurizer, shared between pipelines.
+    :param estimator: Fitted prediction model.
+    :return: Sklearn Pipeline.
+    """
+    return Pipeline([
+        ('featurizer', featurizer),
+        ('classifier', estimator)
+    ])
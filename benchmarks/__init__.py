@@ -0,0 +1,9 @@
+# Standard library
+import os
+
+# Benchmarks run without a database, the app is therefore imported with
+# placeholder connection settings and without training models at startup.
+for key, value in [('DB_USERNAME', 'spamfilter'), ('DB_PASSWORD', 'spamfilter'),
+                   ('DB_HOST', 'localhost'), ('DB_PORT', '5432'),
+                   ('DB_NAME', 'spamfilter'), ('TRAIN_MODEL', 'FALSE')]:
+    os.environ.setdefault(key, value)
@@ -0,0 +1,46 @@
+# Standard library
+import random
+import string
+from itertools import accumulate
+from typing import List, Tuple
+
+
+_SPAM_PHRASES = [
+    'join our free signals group', 'guaranteed profit', 'buy now before it moons',
+    'giveaway retweet to win', 'pump starts at', 'click the link in bio',
+]
+_HAM_PHRASES = [
+    'earnings beat estimates', 'revenue guidance for the quarter', 'shares fell after',
+    'analyst downgrade on', 'dividend announced by', 'ceo comments on outlook',
+]
+
+
+def synthetic_corpus(size: int, vocabulary_size: int = 50000,
+                     seed: int = 42) -> Tuple[List[str], List[str]]:
+    """Generates a deterministic tweet like corpus with spam and non-spam labels.
+    Words are drawn from a zipf like distribution so that, as with real tweets,
+    the vocabulary keeps growing with the size of the corpus.
+
+    :param size: Number of texts to generate.
+    :param vocabulary_size: Number of distinct random words to draw from.
+    :param seed: Random seed.
+    :return: List of texts.
+    :return: List of labels.
+    """
+    rnd = random.Random(seed)
+    vocabulary = [_random_word(rnd) for _ in range(vocabulary_size)]
+    cum_weights = list(accumulate(1.0 / (rank + 1) for rank in range(vocabulary_size)))
+    texts, labels = [], []
+    for i in range(size):
+        is_spam = rnd.random() < 0.3
+        words = rnd.choices(vocabulary, cum_weights=cum_weights, k=rnd.randint(6, 20))
+        phrase = rnd.choice(_SPAM_PHRASES if is_spam else _HAM_PHRASES)
+        cashtags = [f'${_random_word(rnd, 3, 4)}' for _ in range(rnd.randint(1, 3))]
+        texts.append(' '.join(words[:3] + [phrase] + words[3:] + cashtags))
+        labels.append('SPAM' if is_spam else 'NON-SPAM')
+    return texts, labels
+
+
+def _random_word(rnd: random.Random, min_len: int = 3, max_len: int = 10) -> str:
+    length = rnd.randint(min_len, max_len)
+    return ''.join(rnd.choice(string.ascii_lowercase) for _ in range(length))
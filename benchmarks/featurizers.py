@@ -0,0 +1,111 @@
+"""Compares the vocabulary based COUNT featurizer with the fixed memory
+HASHING featurizer on the same data.
+
+Usage: python -m benchmarks.featurizers [--sizes 10000 100000] [--output report.json]
+"""
+
+# Standard library
+import argparse
+import json
+import pickle
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+# 3rd party modules
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.svm import LinearSVC
+
+# Internal modules
+from app.config import HASHING_FEATURES
+from app.models import FeaturizerType, format_text
+from app.service.training_service import create_featurizer
+from benchmarks.corpus import synthetic_corpus
+
+
+_LATENCY_SAMPLES = 2000
+
+
+def compare(size: int, hashing_features: int) -> List[Dict[str, Any]]:
+    """Trains models with each featurizer type on the same corpus.
+
+    :param size: Number of texts in the corpus.
+    :param hashing_features: Number of features used by the HASHING featurizer.
+    :return: Measurements per featurizer type.
+    """
+    texts, labels = synthetic_corpus(size)
+    texts = [format_text(text) for text in texts]
+    return [_measure(type, texts, labels, hashing_features) for type in FeaturizerType]
+
+
+def _measure(type: FeaturizerType, texts: List[str], labels: List[str],
+             hashing_features: int) -> Dict[str, Any]:
+    featurizer = create_featurizer(type, hashing_features)
+    start = time.perf_counter()
+    matrix = featurizer.fit_transform(texts)
+    featurize_secs = time.perf_counter() - start
+    start = time.perf_counter()
+    svm = LinearSVC().fit(matrix, labels)
+    svm_secs = time.perf_counter() - start
+    start = time.perf_counter()
+    MultinomialNB().fit(matrix, labels)
+    nb_secs = time.perf_counter() - start
+    latencies = _predict_latencies(featurizer, svm, texts[:_LATENCY_SAMPLES])
+    return {
+        'featurizer': type.value,
+        'corpus_size': len(texts),
+        'n_features': matrix.shape[1],
+        'featurizer_bytes': len(pickle.dumps(featurizer, protocol=pickle.HIGHEST_PROTOCOL)),
+        'fit_peak_bytes': _fit_peak_memory(type, texts, hashing_features),
+        'featurize_secs': featurize_secs,
+        'svm_fit_secs': svm_secs,
+        'naive_bayes_fit_secs': nb_secs,
+        'predict_p50_ms': latencies[len(latencies) // 2] * 1000,
+        'predict_p99_ms': latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+def _fit_peak_memory(type: FeaturizerType, texts: List[str], hashing_features: int) -> int:
+    featurizer = create_featurizer(type, hashing_features)
+    tracemalloc.start()
+    featurizer.fit_transform(texts)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def _predict_latencies(featurizer: Any, estimator: Any, texts: List[str]) -> List[float]:
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        estimator.predict(featurizer.transform([text]))
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+def _print_report(results: List[Dict[str, Any]]) -> None:
+    columns = list(results[0].keys())
+    print(' | '.join(columns))
+    for res in results:
+        print(' | '.join(_format(res[col]) for col in columns))
+
+
+def _format(value: Any) -> str:
+    return f'{value:.4f}' if isinstance(value, float) else str(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--hashing-features', type=int, default=HASHING_FEATURES)
+    parser.add_argument('--output', help='Path to write the report as JSON')
+    args = parser.parse_args()
+    results = [res for size in args.sizes for res in compare(size, args.hashing_features)]
+    _print_report(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""Measures the memory of forked worker processes serving the same models,
+either loaded onto the heap of every process or memory mapped from the
+artifact files (MODEL_MMAP=TRUE). Linux only, as memory is read from
+/proc/<pid>/smaps_rollup.
+
+Usage: python -m benchmarks.memory [--size 100000] [--workers 1 2 4] [--output report.json]
+"""
+
+# Standard library
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+from typing import Any, Dict, List
+
+# 3rd party modules
+from sklearn.pipeline import Pipeline
+
+# Internal modules
+from app.config import FEATURIZER
+from app.models import FeaturizerType, ModelType, format_text
+from app.repository import ArtifactRepo
+from app.service.memory import process_memory
+from app.service.training_service import TrainingService, assemble_pipeline
+from benchmarks.corpus import synthetic_corpus
+from benchmarks.repos import InMemoryTrainingDataRepo
+
+
+_CLASSIFIED_TEXTS = 1000
+
+
+def compare(size: int, workers: List[int], featurizer_type: FeaturizerType
+            ) -> List[Dict[str, Any]]:
+    """Trains models once per mode, as artifacts are stored differently when
+    memory mapped, and measures workers loading them in each mode.
+
+    :param size: Number of texts in the training corpus.
+    :param workers: Numbers of concurrent worker processes to measure.
+    :param featurizer_type: FeaturizerType used for training.
+    :return: Measurements per mode and number of workers.
+    """
+    texts, labels = synthetic_corpus(size)
+    sample = [format_text(text) for text in texts[:_CLASSIFIED_TEXTS]]
+    with tempfile.TemporaryDirectory() as artifact_dir:
+        mode_dirs = {mmap: os.path.join(artifact_dir, 'mmap' if mmap else 'heap')
+                     for mmap in [False, True]}
+        for mmap, mode_dir in mode_dirs.items():
+            TrainingService(
+                InMemoryTrainingDataRepo(texts, labels), ArtifactRepo(mode_dir, mmap=mmap),
+                featurizer_type).train_models([ModelType.SVM, ModelType.NAIVE_BAYES])
+        del texts, labels
+        return [_measure(mode_dir, count, mmap, sample, size, featurizer_type)
+                for mmap, mode_dir in mode_dirs.items() for count in workers]
+
+
+def _measure(artifact_dir: str, workers: int, mmap: bool, sample: List[str],
+             size: int, featurizer_type: FeaturizerType) -> Dict[str, Any]:
+    ctx = multiprocessing.get_context('fork')
+    loaded = ctx.Barrier(workers + 1)
+    measured = ctx.Barrier(workers + 1)
+    queue = ctx.Queue()
+    processes = [ctx.Process(target=_run_worker,
+                             args=(artifact_dir, mmap, sample, loaded, measured, queue))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    loaded.wait()
+    measured.wait()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return {
+        'mode': 'mmap' if mmap else 'heap',
+        'featurizer': featurizer_type.value,
+        'corpus_size': size,
+        'workers': workers,
+        'rss_per_worker': _mean(res['after']['Rss'] for res in results),
+        'pss_per_worker': _mean(res['after']['Pss'] for res in results),
+        'uss_per_worker': _mean(res['after']['Uss'] for res in results),
+        'model_uss_per_worker': _mean(
+            res['after']['Uss'] - res['before']['Uss'] for res in results),
+        'total_pss': sum(res['after']['Pss'] for res in results),
+    }
+
+
+def _run_worker(artifact_dir: str, mmap: bool, sample: List[str], loaded: Any,
+                measured: Any, queue: Any) -> None:
+    before = process_memory()
+    models = _load_models(ArtifactRepo(artifact_dir, mmap=mmap))
+    for model in models:
+        for text in sample:
+            model.predict([text])
+    loaded.wait()
+    queue.put({'before': before, 'after': process_memory()})
+    measured.wait()
+
+
+def _load_models(artifact_repo: ArtifactRepo) -> List[Pipeline]:
+    published = artifact_repo.find_published()
+    if published is None:
+        raise ValueError('No published models')
+    featurizer = artifact_repo.find_featurizer(published.featurizer_hash)
+    models = []
+    for model_hash in published.model_hashes.values():
+        artifact = artifact_repo.find(model_hash)
+        if featurizer is None or artifact is None:
+            raise ValueError(f'Published model {model_hash} not found')
+        models.append(assemble_pipeline(featurizer, artifact[0]))
+    return models
+
+
+def _mean(values: Any) -> int:
+    values = list(values)
+    return sum(values) // len(values)
+
+
+def _print_report(results: List[Dict[str, Any]]) -> None:
+    columns = list(results[0].keys())
+    print(' | '.join(columns))
+    for res in results:
+        print(' | '.join(str(res[col]) for col in columns))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--featurizer', default=FEATURIZER,
+                        choices=[type.name for type in FeaturizerType])
+    parser.add_argument('--output', help='Path to write the report as JSON')
+    args = parser.parse_args()
+    results = compare(args.size, args.workers, FeaturizerType[args.featurizer])
+    _print_report(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""Measures the throughput and latency of concurrent single text classify
+calls with and without micro batching, over a range of batch windows and
+numbers of threads calling the same ClassifcationService.
+
+Usage: python -m benchmarks.micro_batch [--size 100000] [--calls 10000]
+           [--threads 1 4 8] [--windows 0 0.001 0.002 0.005] [--output report.json]
+"""
+
+# Standard library
+import argparse
+import json
+import tempfile
+import time
+from threading import Barrier, Thread
+from typing import Any, Dict, List
+
+# Internal modules
+from app.config import FEATURIZER, MICRO_BATCH_MAX_SIZE
+from app.models import FeaturizerType, ModelType, format_text
+from app.repository import ArtifactRepo, ModelRepo
+from app.service.classification_service import ClassifcationService
+from app.service.training_service import TrainingService
+from benchmarks.corpus import synthetic_corpus
+from benchmarks.repos import InMemoryModelRepo, InMemoryTrainingDataRepo
+
+
+_WARMUP_CALLS = 200
+
+
+def compare(size: int, calls: int, threads: List[int], windows: List[float],
+            max_size: int, featurizer_type: FeaturizerType) -> List[Dict[str, Any]]:
+    """Trains an SVM model once and classifies the same texts with every
+    combination of threads and batch windows, a window of 0 disables batching.
+
+    :param size: Number of texts in the training corpus.
+    :param calls: Number of classify calls per measurement, split between threads.
+    :param threads: Numbers of concurrent threads to measure.
+    :param windows: Batch windows in seconds to measure.
+    :param max_size: Max number of texts per batch.
+    :param featurizer_type: FeaturizerType used for training.
+    :return: Measurements per number of threads and window.
+    """
+    texts, labels = synthetic_corpus(size)
+    model_repo = _train(texts, labels, featurizer_type)
+    sample = [format_text(text) for text in texts[:calls]]
+    return [_measure(model_repo, sample, count, window, max_size)
+            for count in threads for window in windows]
+
+
+def _train(texts: List[str], labels: List[str], featurizer_type: FeaturizerType) -> ModelRepo:
+    with tempfile.TemporaryDirectory() as artifact_dir:
+        featurizer, trained = TrainingService(
+            InMemoryTrainingDataRepo(texts, labels), ArtifactRepo(artifact_dir),
+            featurizer_type).train_models([ModelType.SVM])
+    return InMemoryModelRepo(
+        featurizer,
+        {type: model.model for type, model in trained.items()},
+        {type: model.classifier for type, model in trained.items()})
+
+
+def _measure(model_repo: ModelRepo, sample: List[str], threads: int,
+             window: float, max_size: int) -> Dict[str, Any]:
+    svc = ClassifcationService(
+        model_repo, cache_size=0, batch_window=window, batch_max_size=max_size)
+    for text in sample[:_WARMUP_CALLS]:
+        svc.classify(text)
+    latencies: List[List[float]] = [[] for _ in range(threads)]
+    barrier = Barrier(threads + 1)
+    workers = [Thread(target=_run_thread,
+                      args=(svc, sample[i::threads], barrier, latencies[i]))
+               for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    secs = time.perf_counter() - start
+    all_latencies = sorted(latency for thread in latencies for latency in thread)
+    return {
+        'threads': threads,
+        'window_ms': window * 1000,
+        'calls': len(all_latencies),
+        'secs': secs,
+        'throughput_per_sec': len(all_latencies) / secs,
+        'p50_ms': _percentile(all_latencies, 0.5),
+        'p99_ms': _percentile(all_latencies, 0.99),
+    }
+
+
+def _run_thread(svc: ClassifcationService, texts: List[str], barrier: Barrier,
+                latencies: List[float]) -> None:
+    barrier.wait()
+    for text in texts:
+        start = time.perf_counter()
+        svc.classify(text)
+        latencies.append(time.perf_counter() - start)
+
+
+def _percentile(sorted_latencies: List[float], quantile: float) -> float:
+    return sorted_latencies[int(len(sorted_latencies) * quantile)] * 1000
+
+
+def _print_report(results: List[Dict[str, Any]]) -> None:
+    columns = list(results[0].keys())
+    print(' | '.join(columns))
+    for res in results:
+        print(' | '.join(f'{res[col]:.3f}' if isinstance(res[col], float) else str(res[col])
+                         for col in columns))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--calls', type=int, default=10000)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--windows', type=float, nargs='+', default=[0, 0.001, 0.002, 0.005])
+    parser.add_argument('--max-size', type=int, default=MICRO_BATCH_MAX_SIZE)
+    parser.add_argument('--featurizer', default=FEATURIZER,
+                        choices=[type.name for type in FeaturizerType])
+    parser.add_argument('--output', help='Path to write the report as JSON')
+    args = parser.parse_args()
+    results = compare(args.size, args.calls, args.threads, args.windows,
+                      args.max_size, FeaturizerType[args.featurizer])
+    _print_report(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+# Standard library
+from collections import defaultdict
+from typing import Dict, Iterator, List, Tuple
+
+# Internal modules
+from app.config import TRAINING_DATA_BATCH_SIZE
+from app.models import Classifier, ModelType
+from app.repository import CorpusMarker, ModelRepo, TrainingDataRepo
+from app.repository import hash_id, is_test_sample
+
+
+class InMemoryTrainingDataRepo(TrainingDataRepo):
+    """Serves training data from memory instead of the database, in the same
+    order and shape as the database backed repo.
+    """
+
+    def __init__(self, texts: List[str], labels: List[str]) -> None:
+        self.__rows = [(i + 1, text, label) for i, (text, label) in enumerate(zip(texts, labels))]
+
+    def find_corpus_marker(self) -> CorpusMarker:
+        return CorpusMarker(len(self.__rows), self.__rows[-1][0] if self.__rows else 0)
+
+    def stream_since(self, last_id: int, chunk_size: int = TRAINING_DATA_BATCH_SIZE
+                     ) -> Iterator[Tuple[int, str, str]]:
+        return iter(self.__rows[last_id:])
+
+    def stream_split(self, training_cap: int = 0, test_cap: int = 0,
+                     chunk_size: int = TRAINING_DATA_BATCH_SIZE
+                     ) -> Iterator[Tuple[int, str, str, bool]]:
+        ranks: Dict[Tuple[bool, str], int] = defaultdict(int)
+        kept = set()
+        for id, _, label in sorted(self.__rows, key=lambda row: hash_id(row[0])):
+            is_test = is_test_sample(id)
+            ranks[is_test, label] += 1
+            cap = test_cap if is_test else training_cap
+            if not cap or ranks[is_test, label] <= cap:
+                kept.add(id)
+        return ((id, text, label, is_test_sample(id))
+                for id, text, label in self.__rows if id in kept)
+
+
+class InMemoryModelRepo(ModelRepo):
+    """ModelRepo that keeps classifier metadata in memory only."""
+
+    def find_latest_classifiers(self, type: ModelType, limit: int = 10) -> List[Classifier]:
+        return []
+
+    def save_classifier(self, classifier: Classifier) -> None:
+        pass
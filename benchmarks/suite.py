@@ -0,0 +1,209 @@
+"""Benchmark suite of text formating, the cashtag rule, classification latency
+per model type and training scalability over synthetic corpora. Runs without
+a database and writes the results as JSON, which can be passed as baseline to
+a later run to compare the two.
+
+Usage: python -m benchmarks.suite [--sizes 10000 100000 1000000]
+           [--output results.json] [--baseline previous-results.json]
+"""
+
+# Standard library
+import argparse
+import json
+import platform
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# 3rd party modules
+import numpy
+import sklearn
+
+# Internal modules
+from app.config import FEATURIZER
+from app.models import FeaturizerType, ModelType, format_text
+from app.repository import ArtifactRepo, ModelRepo
+from app.service.classification_service import ClassifcationService
+from app.service.incremental_service import IncrementalTrainingService
+from app.service.training_service import TrainingService
+from benchmarks.corpus import synthetic_corpus
+from benchmarks.repos import InMemoryModelRepo, InMemoryTrainingDataRepo
+
+
+_CALLS = 10000
+_TRAINED_TYPES = [ModelType.SVM, ModelType.NAIVE_BAYES]
+_COMPARED_METRICS = ['throughput_per_sec', 'p50_ms', 'p99_ms', 'peak_bytes']
+
+
+def run(size: int, calls: int, featurizer_type: FeaturizerType) -> List[Dict[str, Any]]:
+    """Runs all benchmarks on a corpus of a given size.
+
+    :param size: Number of texts in the corpus.
+    :param calls: Max number of timed calls per function benchmark.
+    :param featurizer_type: FeaturizerType used for training.
+    :return: Measurements per benchmark.
+    """
+    texts, labels = synthetic_corpus(size)
+    sample = _spread(texts, calls)
+    results = [_bench_calls('format_text', size, format_text, sample)]
+    words = [format_text(text).split() for text in sample]
+    empty_svc = ClassifcationService(None, cache_size=0)
+    results.append(_bench_calls('to_many_cashtags', size, empty_svc._to_many_cashtags, words))
+    for type in _TRAINED_TYPES:
+        results.append(_bench_training(type, texts, labels, featurizer_type))
+    model_repo = _train_all(texts, labels, featurizer_type)
+    svc = ClassifcationService(model_repo, cache_size=0, compiled=False)
+    for type in ModelType:
+        results.append(_bench_calls(f'classify-{type.value}', size, _classifier(svc, type), sample))
+    compiled_svc = ClassifcationService(model_repo, cache_size=0, compiled=True)
+    for type in _TRAINED_TYPES + [ModelType.CASCADE]:
+        results.append(_bench_calls(
+            f'classify-compiled-{type.value}', size, _classifier(compiled_svc, type), sample))
+    return results
+
+
+def _bench_calls(name: str, size: int, fn: Callable[[Any], Any],
+                 inputs: Sequence[Any]) -> Dict[str, Any]:
+    latencies = []
+    for value in inputs:
+        start = time.perf_counter()
+        fn(value)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    tracemalloc.start()
+    for value in inputs:
+        fn(value)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return _result(name, size, len(inputs), sum(latencies), latencies, peak)
+
+
+def _bench_training(type: ModelType, texts: List[str], labels: List[str],
+                    featurizer_type: FeaturizerType) -> Dict[str, Any]:
+    sample_repo = InMemoryTrainingDataRepo(texts, labels)
+    with tempfile.TemporaryDirectory() as artifact_dir:
+        training_svc = TrainingService(sample_repo, ArtifactRepo(artifact_dir), featurizer_type)
+        start = time.perf_counter()
+        training_svc.train_model(type)
+        secs = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as artifact_dir:
+        training_svc = TrainingService(sample_repo, ArtifactRepo(artifact_dir), featurizer_type)
+        tracemalloc.start()
+        training_svc.train_model(type)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    res = _result(f'train_model-{type.value}', len(texts), 1, secs, [], peak)
+    res['throughput_per_sec'] = len(texts) / secs
+    return res
+
+
+def _train_all(texts: List[str], labels: List[str],
+               featurizer_type: FeaturizerType) -> ModelRepo:
+    sample_repo = InMemoryTrainingDataRepo(texts, labels)
+    with tempfile.TemporaryDirectory() as artifact_dir:
+        artifact_repo = ArtifactRepo(artifact_dir)
+        featurizer, trained = TrainingService(
+            sample_repo, artifact_repo, featurizer_type, compile=True
+        ).train_models(_TRAINED_TYPES)
+        model_repo = InMemoryModelRepo(
+            featurizer,
+            {type: model.model for type, model in trained.items()},
+            {type: model.classifier for type, model in trained.items()},
+            {type: model.compiled for type, model in trained.items() if model.compiled})
+        IncrementalTrainingService(sample_repo, artifact_repo, model_repo).update()
+    return model_repo
+
+
+def _classifier(svc: ClassifcationService, type: ModelType) -> Callable[[str], Any]:
+    return lambda text: svc.classify(format_text(text), type)
+
+
+def _spread(texts: List[str], count: int) -> List[str]:
+    step = max(1, len(texts) // count)
+    return texts[::step][:count]
+
+
+def _result(name: str, size: int, calls: int, secs: float,
+            latencies: List[float], peak: int) -> Dict[str, Any]:
+    return {
+        'benchmark': name,
+        'corpus_size': size,
+        'calls': calls,
+        'secs': secs,
+        'throughput_per_sec': calls / secs if secs else None,
+        'p50_ms': _percentile(latencies, 0.5),
+        'p99_ms': _percentile(latencies, 0.99),
+        'peak_bytes': peak,
+    }
+
+
+def _percentile(sorted_latencies: List[float], quantile: float) -> Optional[float]:
+    if not sorted_latencies:
+        return None
+    return sorted_latencies[int(len(sorted_latencies) * quantile)] * 1000
+
+
+def _environment(featurizer_type: FeaturizerType) -> Dict[str, str]:
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': numpy.__version__,
+        'sklearn': sklearn.__version__,
+        'featurizer': featurizer_type.value,
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }
+
+
+def _print_report(results: List[Dict[str, Any]]) -> None:
+    columns = list(results[0].keys())
+    print(' | '.join(columns))
+    for res in results:
+        print(' | '.join(_format(res[col]) for col in columns))
+
+
+def _print_comparison(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    with open(baseline_path) as f:
+        baseline = {(res['benchmark'], res['corpus_size']): res
+                    for res in json.load(f)['results']}
+    print(f'\nChange compared to {baseline_path}')
+    print(' | '.join(['benchmark', 'corpus_size'] + _COMPARED_METRICS))
+    for res in results:
+        previous = baseline.get((res['benchmark'], res['corpus_size']))
+        if previous is None:
+            continue
+        changes = [_change(res[metric], previous.get(metric)) for metric in _COMPARED_METRICS]
+        print(' | '.join([res['benchmark'], str(res['corpus_size'])] + changes))
+
+
+def _change(current: Optional[float], previous: Optional[float]) -> str:
+    if current is None or not previous:
+        return '-'
+    return f'{(current - previous) / previous:+.1%}'
+
+
+def _format(value: Any) -> str:
+    return f'{value:.4f}' if isinstance(value, float) else str(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--calls', type=int, default=_CALLS)
+    parser.add_argument('--featurizer', default=FEATURIZER,
+                        choices=[type.name for type in FeaturizerType])
+    parser.add_argument('--output', default='benchmark-results.json',
+                        help='Path to write the results as JSON')
+    parser.add_argument('--baseline', help='Results of a previous run to compare with')
+    args = parser.parse_args()
+    featurizer_type = FeaturizerType[args.featurizer]
+    results = [res for size in args.sizes for res in run(size, args.calls, featurizer_type)]
+    _print_report(results)
+    with open(args.output, 'w') as f:
+        json.dump({'environment': _environment(featurizer_type), 'results': results}, f, indent=2)
+    if args.baseline:
+        _print_comparison(results, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Compares the shared normalizer/tokenizer in app.models.text with the
+previous path of formating, splitting for the cashtag rule and letting the
+featurizer tokenize the text again.
+
+Usage: python -m benchmarks.text [--sizes 10000 100000] [--output report.json]
+"""
+
+# Standard library
+import argparse
+import gc
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+# 3rd party modules
+from sklearn.feature_extraction.text import CountVectorizer
+from stop_words import get_stop_words
+
+# Internal modules
+from app.models import format_text, normalize, normalize_all
+from benchmarks.corpus import synthetic_corpus
+
+
+_REPEATS = 3
+
+
+def compare(size: int) -> List[Dict[str, Any]]:
+    """Normalizes and tokenizes the same corpus with the previous and the
+    shared text path.
+
+    :param size: Number of texts in the corpus.
+    :return: Measurements per text path.
+    """
+    texts, _ = synthetic_corpus(size)
+    paths = {
+        'previous': _previous_path(),
+        'shared': _shared_path,
+        'shared-batch': _shared_batch_path,
+    }
+    return [_measure(name, path, texts) for name, path in paths.items()]
+
+
+def _previous_path() -> Callable[[List[str]], List[Any]]:
+    analyzer = CountVectorizer(stop_words=get_stop_words('english')).build_analyzer()
+
+    def run(texts: List[str]) -> List[Any]:
+        results = []
+        for text in texts:
+            formated = format_text(text)
+            results.append((formated.split(), analyzer(formated)))
+        return results
+    return run
+
+
+def _shared_path(texts: List[str]) -> List[Any]:
+    return [normalize(text) for text in texts]
+
+
+def _shared_batch_path(texts: List[str]) -> List[Any]:
+    return normalize_all(texts)
+
+
+def _measure(name: str, path: Callable[[List[str]], List[Any]],
+             texts: List[str]) -> Dict[str, Any]:
+    gc.disable()
+    try:
+        secs = min(_time(path, texts) for _ in range(_REPEATS))
+    finally:
+        gc.enable()
+    return {
+        'path': name,
+        'corpus_size': len(texts),
+        'secs': secs,
+        'texts_per_sec': len(texts) / secs,
+        'per_text_us': secs / len(texts) * 1e6,
+    }
+
+
+def _time(path: Callable[[List[str]], List[Any]], texts: List[str]) -> float:
+    start = time.perf_counter()
+    path(texts)
+    return time.perf_counter() - start
+
+
+def _print_report(results: List[Dict[str, Any]]) -> None:
+    columns = list(results[0].keys())
+    print(' | '.join(columns))
+    for res in results:
+        print(' | '.join(_format(res[col]) for col in columns))
+
+
+def _format(value: Any) -> str:
+    return f'{value:.4f}' if isinstance(value, float) else str(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--output', help='Path to write the report as JSON')
+    args = parser.parse_args()
+    results = [res for size in args.sizes for res in compare(size)]
+    _print_report(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,5 +3,9 @@ export FLASK_APP=run.py
 export TRAIN_MODEL=FALSE
 flask db upgrade
 
+# Worker processes write their metrics to files that are aggregated on export.
+export prometheus_multiproc_dir=/tmp/spam-filter/metrics
+rm -rf $prometheus_multiproc_dir && mkdir -p $prometheus_multiproc_dir
+
 export TRAIN_MODEL=TRUE
 uwsgi uwsgi.ini
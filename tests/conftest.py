@@ -0,0 +1,76 @@
+# Standard library
+import os
+import tempfile
+from typing import Dict, Iterator, List, Tuple
+
+# Configures the app for tests before it is imported by any test module.
+_TEST_DIR = tempfile.mkdtemp(prefix='spam-filter-test-')
+os.environ['DATABASE_URI'] = f'sqlite:///{os.path.join(_TEST_DIR, "spamfilter.db")}'
+os.environ['MODEL_ARTIFACT_DIR'] = os.path.join(_TEST_DIR, 'models')
+os.environ['TRAIN_MODEL'] = 'FALSE'
+
+# 3rd party modules
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+from sklearn.svm import LinearSVC
+
+# Internal modules
+from app import app, db
+from app.models import Classifier, Label, ModelType, SpamLabel, analyze_terms, tokenize
+from app.repository import ModelRepo
+
+
+SPAM_TEXTS = [
+    'buy cheap pills now',
+    'free crypto giveaway click here',
+    'win money fast guaranteed',
+    'cheap pills free shipping now',
+]
+
+NON_SPAM_TEXTS = [
+    'quarterly earnings beat analyst estimates',
+    'central bank holds interest rates steady',
+    'shares rose after the product launch',
+    'company reports record revenue growth',
+]
+
+
+@pytest.fixture
+def database() -> Iterator[None]:
+    """Creates the schema and spam labels in an empty sqlite database."""
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([SpamLabel(label=label.value) for label in Label])
+        db.session.commit()
+        yield
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def model_repo() -> ModelRepo:
+    """Trains SVM and naive bayes models sharing a featurizer on a tiny corpus."""
+    texts = SPAM_TEXTS + NON_SPAM_TEXTS
+    labels = [Label.SPAM.value] * len(SPAM_TEXTS) + [Label.NON_SPAM.value] * len(NON_SPAM_TEXTS)
+    terms = [tokenize(text).terms for text in texts]
+    featurizer = Pipeline([
+        ('counter', CountVectorizer(analyzer=analyze_terms)),
+        ('tfidf', TfidfTransformer())
+    ])
+    features = featurizer.fit_transform(terms)
+    models: Dict[ModelType, Pipeline] = {}
+    classifiers: Dict[ModelType, Classifier] = {}
+    for model_type, estimator in [(ModelType.SVM, LinearSVC()),
+                                  (ModelType.NAIVE_BAYES, MultinomialNB())]:
+        models[model_type] = Pipeline([
+            ('featurizer', featurizer),
+            ('classifier', estimator.fit(features, labels))
+        ])
+        classifiers[model_type] = Classifier(model_hash=f'{model_type.value}-hash')
+    return ModelRepo(featurizer, models, classifiers)
+
+
+def training_rows(labeled_texts: List[Tuple[str, str]]) -> List[Dict[str, str]]:
+    return [{'text': text, 'label': label} for text, label in labeled_texts]
@@ -0,0 +1,45 @@
+# 3rd party modules
+import numpy as np
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.svm import LinearSVC
+
+# Internal modules
+from app.service.cascade import class_probabilities, evaluate_cascade, find_uncertain
+
+
+def test_class_probabilities_match_naive_bayes():
+    rnd = np.random.RandomState(42)
+    features = rnd.randint(0, 5, size=(20, 8))
+    labels = rnd.choice(['SPAM', 'NON-SPAM'], size=20)
+    model = MultinomialNB().fit(features, labels)
+    joint_log_likelihoods = features @ model.feature_log_prob_.T + model.class_log_prior_
+    np.testing.assert_allclose(class_probabilities(joint_log_likelihoods),
+                               model.predict_proba(features))
+
+
+def test_class_probabilities_do_not_overflow():
+    probabilities = class_probabilities(np.array([[-1000.0, -1001.0], [5000.0, 0.0]]))
+    assert np.isfinite(probabilities).all()
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1.0)
+
+
+def test_find_uncertain_returns_texts_below_threshold():
+    probabilities = np.array([[0.95, 0.05], [0.6, 0.4], [0.3, 0.7], [0.1, 0.9]])
+    assert list(find_uncertain(probabilities, 0.9)) == [1, 2]
+    assert list(find_uncertain(probabilities, 0.0)) == []
+
+
+def test_evaluate_cascade_escalates_more_with_higher_thresholds():
+    rnd = np.random.RandomState(42)
+    features = rnd.randint(0, 5, size=(40, 8)).astype(float)
+    labels = list(rnd.choice(['SPAM', 'NON-SPAM'], size=40))
+    first = MultinomialNB().fit(features, labels)
+    second = LinearSVC().fit(features, labels)
+    reports = evaluate_cascade(first, second, features, labels, [0.0, 0.7, 1.1])
+    assert [report.threshold for report in reports] == [0.0, 0.7, 1.1]
+    assert reports[0].escalation_rate == 0.0
+    assert reports[0].accuracy == reports[0].first_accuracy
+    assert reports[2].escalation_rate == 1.0
+    assert reports[2].accuracy == reports[2].second_accuracy
+    rates = [report.escalation_rate for report in reports]
+    assert rates == sorted(rates)
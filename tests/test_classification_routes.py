@@ -0,0 +1,63 @@
+# 3rd party modules
+import pytest
+
+# Internal modules
+from app import app
+from app.controllers import classification
+from app.models import Label
+from app.service import classification_svc
+from app.service import classification_service
+
+
+SPAM = Label.SPAM.value
+NON_SPAM = Label.NON_SPAM.value
+
+
+@pytest.fixture
+def client(model_repo, monkeypatch):
+    monkeypatch.setattr(classification_svc, '_repo', model_repo)
+    monkeypatch.setattr(classification_svc, '_ready', True)
+    monkeypatch.setattr(classification._sample_repo, '_sample_rate', 0.0)
+    return app.test_client()
+
+
+def test_classify_batch_returns_results_in_order(client):
+    response = client.post('/v1/classify/batch', json={
+        'texts': ['cheap pills for free now', 'bank reports revenue growth']})
+    assert response.status_code == 200
+    assert [res['label'] for res in response.get_json()['results']] == [SPAM, NON_SPAM]
+
+
+def test_classify_batch_reports_failed_items_with_207(client, monkeypatch):
+    tokenize = classification_service.tokenize
+
+    def failing_tokenize(text):
+        if 'crypto' in text:
+            raise ValueError('tokenize failed')
+        return tokenize(text)
+
+    def failing_tokenize_all(texts):
+        raise ValueError('batch tokenize failed')
+
+    monkeypatch.setattr(classification_service, 'tokenize', failing_tokenize)
+    monkeypatch.setattr(classification_service, 'tokenize_all', failing_tokenize_all)
+    response = client.post('/v1/classify/batch', json={
+        'texts': ['cheap pills for free now', 42, 'crypto giveaway', 'bank revenue growth']})
+    assert response.status_code == 207
+    results = response.get_json()['results']
+    assert len(results) == 4
+    assert results[0]['label'] == SPAM
+    assert results[1] == {'error': '"text" not of string type'}
+    assert results[2] == {'error': 'Failed to classify text'}
+    assert results[3]['label'] == NON_SPAM
+
+
+def test_classify_batch_rejects_missing_texts(client):
+    response = client.post('/v1/classify/batch', json={'text': 'cheap pills'})
+    assert response.status_code == 400
+
+
+def test_classify_batch_requires_loaded_models(client, monkeypatch):
+    monkeypatch.setattr(classification_svc, '_ready', False)
+    response = client.post('/v1/classify/batch', json={'texts': ['cheap pills']})
+    assert response.status_code == 503
@@ -0,0 +1,155 @@
+# Standard library
+from typing import List
+
+# 3rd party modules
+import pytest
+
+# Internal modules
+from app.models import Label, ModelType, SpamResult, compile_model, format_text
+from app.repository import ModelRepo
+from app.service import classification_service
+from app.service.classification_service import ClassifcationService
+from app.service.known_text_index import KnownTextIndex
+from app.service.near_duplicate_index import NearDuplicateIndex
+
+
+SPAM = Label.SPAM.value
+NON_SPAM = Label.NON_SPAM.value
+
+TEXTS = [format_text(text) for text in [
+    'cheap pills for free now',
+    'bank reports revenue growth',
+    'crypto giveaway win money',
+    'analyst estimates for earnings',
+]]
+
+
+def _expected_labels(model_repo: ModelRepo, model_type: ModelType) -> List[str]:
+    model = model_repo.get_models().get_spam_classifier(model_type)
+    terms = [classification_service.tokenize(text).terms for text in TEXTS]
+    features = model.named_steps['featurizer'].transform(terms)
+    return list(model.named_steps['classifier'].predict(features))
+
+
+def test_classify_batch_keeps_the_order_of_the_texts(model_repo):
+    svc = ClassifcationService(model_repo)
+    results = svc.classify_batch(TEXTS)
+    assert [res.label for res in results] == _expected_labels(model_repo, ModelType.SVM)
+    assert [res.label for res in results] == [SPAM, NON_SPAM, SPAM, NON_SPAM]
+    assert results == [svc.classify(text) for text in TEXTS]
+
+
+def test_classify_batch_applies_rules_before_the_model(model_repo):
+    svc = ClassifcationService(model_repo)
+    known = KnownTextIndex()
+    known.extend([(TEXTS[1], SPAM)])
+    svc.set_known_text_index(known)
+    results = svc.classify_batch([TEXTS[0], TEXTS[1], '$aapl $tsla $gme'])
+    assert results[0].reason == 'predicted by SVM model'
+    assert results[1] == SpamResult(label=SPAM, reason='known text in training data')
+    assert results[2] == SpamResult(label=SPAM, reason='too many cashtags')
+
+
+def test_classify_batch_returns_an_error_per_failed_text(model_repo, monkeypatch):
+    svc = ClassifcationService(model_repo)
+    tokenize = classification_service.tokenize
+
+    def failing_tokenize(text):
+        if text == TEXTS[1]:
+            raise ValueError('tokenize failed')
+        return tokenize(text)
+
+    def failing_tokenize_all(texts):
+        raise ValueError('batch tokenize failed')
+
+    monkeypatch.setattr(classification_service, 'tokenize', failing_tokenize)
+    monkeypatch.setattr(classification_service, 'tokenize_all', failing_tokenize_all)
+    results = svc.classify_batch(TEXTS)
+    assert len(results) == len(TEXTS)
+    assert isinstance(results[1], ValueError)
+    assert [res.label for i, res in enumerate(results) if i != 1] == [SPAM, SPAM, NON_SPAM]
+
+
+def test_classify_batch_returns_an_error_per_failed_prediction(model_repo, monkeypatch):
+    svc = ClassifcationService(model_repo)
+    predict_batch = svc._predict_batch
+    failing_terms = classification_service.tokenize(TEXTS[2]).terms
+
+    def failing_predict_batch(model_type, models, terms):
+        if failing_terms in terms:
+            raise RuntimeError('predict failed')
+        return predict_batch(model_type, models, terms)
+
+    monkeypatch.setattr(svc, '_predict_batch', failing_predict_batch)
+    results = svc.classify_batch(TEXTS)
+    assert isinstance(results[2], RuntimeError)
+    assert [res.label for i, res in enumerate(results) if i != 2] == [SPAM, NON_SPAM, NON_SPAM]
+
+
+def test_classify_caches_results_by_model_hash(model_repo, monkeypatch):
+    svc = ClassifcationService(model_repo)
+    res = svc.classify(TEXTS[0], ModelType.NAIVE_BAYES)
+    monkeypatch.setattr(svc, '_predict_batch', _fail_predict)
+    assert svc.classify(TEXTS[0], ModelType.NAIVE_BAYES) == res
+    assert svc.classify_batch([TEXTS[0]], ModelType.NAIVE_BAYES) == [res]
+    assert svc.classify_all(TEXTS[0], [ModelType.NAIVE_BAYES]) == {ModelType.NAIVE_BAYES: res}
+
+
+def test_classify_all_matches_classify_per_model_type(model_repo):
+    svc = ClassifcationService(model_repo)
+    for text in TEXTS:
+        results = svc.classify_all(text)
+        assert set(results) == {ModelType.SVM, ModelType.NAIVE_BAYES}
+        for model_type, res in results.items():
+            assert res == ClassifcationService(model_repo).classify(text, model_type)
+
+
+def test_classify_all_applies_rules_to_every_model_type(model_repo):
+    svc = ClassifcationService(model_repo)
+    near_duplicates = NearDuplicateIndex(threshold=0.5)
+    near_duplicates.add(classification_service.tokenize(TEXTS[1]).words)
+    svc.set_near_duplicate_index(near_duplicates)
+    results = svc.classify_all(TEXTS[1])
+    assert results == {
+        ModelType.SVM: SpamResult(label=SPAM, reason='near duplicate of known spam'),
+        ModelType.NAIVE_BAYES: SpamResult(label=SPAM, reason='near duplicate of known spam'),
+    }
+
+
+def test_compiled_models_predict_like_the_pipelines(model_repo):
+    models = model_repo.get_models()
+    model_types = models.get_model_types()
+    compiled_repo = ModelRepo(
+        models.get_spam_classifier(ModelType.SVM).named_steps['featurizer'],
+        {model_type: models.get_spam_classifier(model_type) for model_type in model_types},
+        {},
+        {model_type: compile_model(models.get_spam_classifier(model_type))
+         for model_type in model_types})
+    svc = ClassifcationService(compiled_repo, compiled=True)
+    assert compiled_repo.get_models().get_compiled_model(ModelType.SVM) is not None
+    for model_type in model_types:
+        assert [res.label for res in svc.classify_batch(TEXTS, model_type)] == \
+            _expected_labels(model_repo, model_type)
+
+
+@pytest.mark.parametrize('compiled', [False, True])
+def test_cascade_escalates_uncertain_texts(model_repo, compiled):
+    models = model_repo.get_models()
+    repo = ModelRepo(
+        models.get_spam_classifier(ModelType.SVM).named_steps['featurizer'],
+        {model_type: models.get_spam_classifier(model_type)
+         for model_type in models.get_model_types()},
+        {},
+        {model_type: compile_model(models.get_spam_classifier(model_type))
+         for model_type in models.get_model_types()} if compiled else {})
+    first = ClassifcationService(repo, compiled=compiled, cascade_threshold=0.0)
+    assert [res.label for res in first.classify_batch(TEXTS, ModelType.CASCADE)] == \
+        _expected_labels(model_repo, ModelType.NAIVE_BAYES)
+    escalated = ClassifcationService(repo, compiled=compiled, cascade_threshold=1.1)
+    assert [res.label for res in escalated.classify_batch(TEXTS, ModelType.CASCADE)] == \
+        _expected_labels(model_repo, ModelType.SVM)
+    assert escalated.has_model_type(ModelType.CASCADE)
+
+
+def _fail_predict(model_type, models, terms):
+    raise AssertionError('Cached results must not be predicted')
@@ -0,0 +1,119 @@
+# 3rd party modules
+import numpy as np
+import pytest
+
+# Internal modules
+from app.models import Compaction, ModelType, WeightType, compact_models
+from app.models import compile_model, map_vocabulary, tokenize
+from app.models.compact import CompactEstimator, CompactFeaturizer, SortedStringTable
+from app.repository import ArtifactRepo
+from tests.conftest import NON_SPAM_TEXTS, SPAM_TEXTS
+
+
+TERMS = [tokenize(text).terms for text in SPAM_TEXTS + NON_SPAM_TEXTS + ['pills growth unseen']]
+
+
+def test_sorted_string_table_maps_terms_to_positions():
+    table = SortedStringTable(['bb', 'a', 'ccc', 'ab', 'bb'])
+    assert len(table) == 4
+    assert list(table) == ['a', 'ab', 'bb', 'ccc']
+    assert [table[term] for term in table] == [0, 1, 2, 3]
+    assert table.get('b') is None
+    assert table.get('abc', -1) == -1
+    with pytest.raises(KeyError):
+        table['zz']
+
+
+def test_sorted_string_table_keeps_given_columns():
+    vocabulary = {'räksmörgås': 3, 'a': 0, 'bb': 2, 'ab': 1}
+    table = SortedStringTable(vocabulary, vocabulary)
+    assert dict(table.items()) == vocabulary
+    assert table.get('ä') is None
+
+
+def test_map_vocabulary_transforms_like_the_featurizer(model_repo):
+    featurizer = model_repo.get_models().get_spam_classifier().named_steps['featurizer']
+    vocabulary = featurizer.steps[0][1].vocabulary_
+    mapped = map_vocabulary(featurizer)
+    assert isinstance(mapped.steps[0][1].vocabulary_, SortedStringTable)
+    assert featurizer.steps[0][1].vocabulary_ is vocabulary
+    np.testing.assert_array_equal(mapped.transform(TERMS).toarray(),
+                                  featurizer.transform(TERMS).toarray())
+    assert map_vocabulary(mapped).steps[0][1] is mapped.steps[0][1]
+
+
+def test_memory_mapped_artifacts_store_a_mapped_vocabulary(model_repo, tmp_path):
+    featurizer = model_repo.get_models().get_spam_classifier().named_steps['featurizer']
+    artifact_repo = ArtifactRepo(str(tmp_path), mmap=True)
+    artifact_repo.save_featurizer('featurizer-hash', featurizer)
+    loaded = artifact_repo.find_featurizer('featurizer-hash')
+    assert isinstance(loaded.steps[0][1].vocabulary_, SortedStringTable)
+    assert isinstance(featurizer.steps[0][1].vocabulary_, dict)
+    np.testing.assert_array_equal(loaded.transform(TERMS).toarray(),
+                                  featurizer.transform(TERMS).toarray())
+
+
+@pytest.mark.parametrize('weight_type', [WeightType.FLOAT32, WeightType.INT8])
+def test_compacted_models_predict_like_the_models(model_repo, weight_type):
+    models = model_repo.get_models()
+    featurizer = models.get_spam_classifier().named_steps['featurizer']
+    estimators = {model_type: models.get_spam_classifier(model_type).named_steps['classifier']
+                  for model_type in models.get_model_types()}
+    compacted = compact_models(featurizer, estimators, len(TERMS) - 1,
+                               Compaction(min_df=1, max_features=0, weight_type=weight_type))
+    assert compacted is not None
+    compact_featurizer, compact_estimators = compacted
+    assert isinstance(compact_featurizer, CompactFeaturizer)
+    features = featurizer.transform(TERMS)
+    compact_features = compact_featurizer.transform(TERMS)
+    np.testing.assert_allclose(np.sort(compact_features.toarray(), axis=1),
+                               np.sort(features.toarray(), axis=1), rtol=1e-6)
+    for model_type, estimator in compact_estimators.items():
+        assert isinstance(estimator, CompactEstimator)
+        assert (estimator.weights.dtype == np.int8) == (weight_type == WeightType.INT8)
+        assert list(estimator.predict(compact_features)) == \
+            list(estimators[model_type].predict(features))
+    np.testing.assert_allclose(
+        compact_estimators[ModelType.NAIVE_BAYES].predict_proba(compact_features),
+        estimators[ModelType.NAIVE_BAYES].predict_proba(features), atol=0.05)
+    with pytest.raises(AttributeError):
+        compact_estimators[ModelType.SVM].predict_proba(compact_features)
+
+
+def test_compaction_prunes_rare_terms(model_repo):
+    models = model_repo.get_models()
+    featurizer = models.get_spam_classifier().named_steps['featurizer']
+    estimator = models.get_spam_classifier().named_steps['classifier']
+    samples = len(SPAM_TEXTS) + len(NON_SPAM_TEXTS)
+    compacted = compact_models(featurizer, {ModelType.SVM: estimator}, samples,
+                               Compaction(min_df=2, max_features=0,
+                                          weight_type=WeightType.FLOAT32))
+    compact_featurizer, compact_estimators = compacted
+    vocabulary = featurizer.steps[0][1].vocabulary_
+    assert 0 < compact_featurizer.n_features < len(vocabulary)
+    assert set(compact_featurizer.vocabulary) < set(vocabulary)
+    assert 'cheap' in compact_featurizer.vocabulary
+    assert compact_estimators[ModelType.SVM].weights.shape[0] == compact_featurizer.n_features
+
+
+def test_compacted_models_are_inference_only(model_repo):
+    models = model_repo.get_models()
+    featurizer = models.get_spam_classifier().named_steps['featurizer']
+    estimator = models.get_spam_classifier().named_steps['classifier']
+    compact_featurizer, compact_estimators = compact_models(
+        featurizer, {ModelType.SVM: estimator}, len(TERMS) - 1,
+        Compaction(min_df=1, max_features=0, weight_type=WeightType.FLOAT32))
+    with pytest.raises(TypeError):
+        compact_featurizer.fit(TERMS)
+    with pytest.raises(TypeError):
+        compact_estimators[ModelType.SVM].fit(None, None)
+
+
+def test_compiled_models_predict_like_the_models(model_repo):
+    models = model_repo.get_models()
+    for model_type in models.get_model_types():
+        model = models.get_spam_classifier(model_type)
+        compiled = compile_model(model)
+        expected = model.named_steps['classifier'].predict(
+            model.named_steps['featurizer'].transform(TERMS))
+        assert compiled.predict(TERMS) == list(expected)
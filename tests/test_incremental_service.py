@@ -0,0 +1,76 @@
+# Standard library
+from typing import Tuple
+
+# Internal modules
+from app.models import Classifier, Label, ModelType
+from app.repository import ArtifactRepo, ModelRepo, TrainingDataRepo
+from app.service.incremental_service import IncrementalTrainingService
+from app.service.training_service import dummy_pipeline
+from tests.conftest import NON_SPAM_TEXTS, SPAM_TEXTS, training_rows
+
+
+def _worker(artifact_dir: str) -> Tuple[ModelRepo, IncrementalTrainingService]:
+    placeholder = dummy_pipeline()
+    model_repo = ModelRepo(placeholder.named_steps['featurizer'], {ModelType.SVM: placeholder})
+    svc = IncrementalTrainingService(TrainingDataRepo(), ArtifactRepo(artifact_dir), model_repo,
+                                     batch_size=4, hashing_features=2 ** 10)
+    return model_repo, svc
+
+
+def _store_samples(round: int) -> None:
+    TrainingDataRepo().save_all(training_rows(
+        [(f'{text} {round}', Label.SPAM.value) for text in SPAM_TEXTS] +
+        [(f'{text} {round}', Label.NON_SPAM.value) for text in NON_SPAM_TEXTS]))
+
+
+def _versions():
+    return Classifier.query.filter_by(type=ModelType.INCREMENTAL.value).\
+        order_by(Classifier.id).all()
+
+
+def _model_hash(model_repo: ModelRepo) -> str:
+    return model_repo.get_models().get_model_hash(ModelType.INCREMENTAL)
+
+
+def test_workers_update_the_model_one_at_a_time(database, tmp_path):
+    first_repo, first = _worker(str(tmp_path))
+    second_repo, second = _worker(str(tmp_path))
+    _store_samples(0)
+    first.initialize()
+    second.initialize()
+    assert len(_versions()) == 1
+    assert _model_hash(first_repo) == _model_hash(second_repo) == _versions()[0].model_hash
+    _store_samples(1)
+    second.update()
+    first.update()
+    versions = _versions()
+    assert len(versions) == 2
+    assert versions[1].parent_hash == versions[0].model_hash
+    assert _model_hash(first_repo) == _model_hash(second_repo) == versions[1].model_hash
+
+
+def test_update_without_new_samples_keeps_the_model(database, tmp_path):
+    model_repo, svc = _worker(str(tmp_path))
+    svc.initialize()
+    assert _versions() == []
+    _store_samples(0)
+    svc.update()
+    model_hash = _model_hash(model_repo)
+    svc.update()
+    assert _model_hash(model_repo) == model_hash
+    assert len(_versions()) == 1
+
+
+def test_restarted_worker_continues_from_the_stored_model(database, tmp_path):
+    _, svc = _worker(str(tmp_path))
+    _store_samples(0)
+    svc.initialize()
+    trained = _versions()[0]
+    model_repo, restarted = _worker(str(tmp_path))
+    restarted.initialize()
+    assert _model_hash(model_repo) == trained.model_hash
+    model = model_repo.get_models().get_spam_classifier(ModelType.INCREMENTAL)
+    assert model.named_steps['classifier'].predict(
+        model.named_steps['featurizer'].transform(SPAM_TEXTS[:1]))[0] in \
+        (Label.SPAM.value, Label.NON_SPAM.value)
+    assert len(_versions()) == 1
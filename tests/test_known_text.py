@@ -0,0 +1,47 @@
+# Internal modules
+from app.models import Label, format_text
+from app.repository import TrainingDataRepo
+from app.service.known_text_index import KnownTextIndex
+from app.service.known_text_service import KnownTextService
+from tests.conftest import training_rows
+
+
+SPAM = Label.SPAM.value
+NON_SPAM = Label.NON_SPAM.value
+
+
+def test_index_finds_labels_of_known_texts():
+    index = KnownTextIndex()
+    assert index.extend([('buy now', SPAM), ('earnings beat', NON_SPAM)]) == 2
+    assert index.find('buy now') == SPAM
+    assert index.find('earnings beat') == NON_SPAM
+    assert index.find('buy now!') is None
+    assert index.size() == 2
+
+
+def test_index_keeps_the_last_label_of_a_text():
+    index = KnownTextIndex()
+    index.extend([('buy now', SPAM), ('earnings beat', NON_SPAM)])
+    index.extend([('buy now', NON_SPAM), ('buy now', SPAM), ('new text', SPAM)])
+    assert index.find('buy now') == SPAM
+    assert index.size() == 3
+
+
+def test_index_skips_unknown_labels():
+    index = KnownTextIndex()
+    assert index.extend([('buy now', 'UNKNOWN')]) == 0
+    assert index.find('buy now') is None
+
+
+def test_service_adds_training_data_stored_since_last_update(database):
+    repo = TrainingDataRepo()
+    index = KnownTextIndex()
+    svc = KnownTextService(repo, index)
+    repo.save_all(training_rows([('Buy NOW', SPAM)]))
+    svc.update()
+    assert index.find(format_text('Buy NOW')) == SPAM
+    repo.save_all(training_rows([('Earnings beat', NON_SPAM), ('Buy NOW', NON_SPAM)]))
+    svc.update()
+    assert index.find(format_text('Earnings beat')) == NON_SPAM
+    assert index.find(format_text('Buy NOW')) == NON_SPAM
+    assert index.size() == 2
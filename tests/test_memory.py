@@ -0,0 +1,35 @@
+# Standard library
+import sys
+
+# 3rd party modules
+import numpy as np
+import scipy.sparse as sp
+
+# Internal modules
+from app.service.memory import object_size
+
+
+def test_counts_array_data():
+    array = np.zeros(1000, dtype=np.float64)
+    assert object_size(array) == sys.getsizeof(array) > array.nbytes
+
+
+def test_counts_data_of_views_and_memory_maps(tmp_path):
+    array = np.zeros(1000, dtype=np.float64)
+    assert object_size(array[:500]) >= 500 * array.itemsize
+    path = str(tmp_path / 'array.npy')
+    np.save(path, array)
+    mapped = np.load(path, mmap_mode='r')
+    assert object_size(mapped) >= array.nbytes
+
+
+def test_counts_sparse_matrix_arrays():
+    matrix = sp.random(100, 100, density=0.1, format='csr')
+    arrays = matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+    assert object_size(matrix) >= arrays
+
+
+def test_counts_shared_objects_once():
+    array = np.zeros(1000, dtype=np.float64)
+    assert object_size([array, array]) < 2 * array.nbytes
+    assert object_size({'a': array}, [array]) < 2 * array.nbytes
@@ -0,0 +1,72 @@
+# Standard library
+from threading import Thread
+from typing import Dict, List
+
+# 3rd party modules
+import pytest
+
+# Internal modules
+from app.models import ModelType
+from app.service.micro_batcher import MicroBatcher
+
+
+TERMS = [['a'], ['b'], ['c'], ['d']]
+
+
+class _Predictor:
+    def __init__(self) -> None:
+        self.batches: List[List[List[str]]] = []
+
+    def __call__(self, model_type, models, terms):
+        self.batches.append(terms)
+        return [f'label-{text_terms[0]}' for text_terms in terms]
+
+
+def _predict_concurrently(batcher: MicroBatcher, model_types: List[ModelType]) -> Dict[int, str]:
+    labels: Dict[int, str] = {}
+
+    def predict(i: int) -> None:
+        with batcher.caller():
+            labels[i] = batcher.predict(model_types[i], None, TERMS[i])
+
+    threads = [Thread(target=predict, args=(i,)) for i in range(len(TERMS))]
+    with batcher.caller():
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return labels
+
+
+def test_concurrent_texts_are_predicted_in_one_batch():
+    predictor = _Predictor()
+    batcher = MicroBatcher(predictor, window=5.0, max_size=len(TERMS))
+    labels = _predict_concurrently(batcher, [ModelType.SVM] * len(TERMS))
+    assert labels == {i: f'label-{terms[0]}' for i, terms in enumerate(TERMS)}
+    assert len(predictor.batches) == 1
+    assert sorted(predictor.batches[0]) == TERMS
+
+
+def test_batches_are_kept_apart_per_model_type():
+    predictor = _Predictor()
+    batcher = MicroBatcher(predictor, window=5.0, max_size=2)
+    model_types = [ModelType.SVM, ModelType.NAIVE_BAYES] * 2
+    labels = _predict_concurrently(batcher, model_types)
+    assert labels == {i: f'label-{terms[0]}' for i, terms in enumerate(TERMS)}
+    assert sorted(len(batch) for batch in predictor.batches) == [2, 2]
+
+
+def test_single_caller_does_not_wait_for_the_window():
+    predictor = _Predictor()
+    batcher = MicroBatcher(predictor, window=60.0, max_size=len(TERMS))
+    with batcher.caller():
+        assert batcher.predict(ModelType.SVM, None, ['a']) == 'label-a'
+
+
+def test_prediction_errors_are_raised_in_every_caller():
+    def failing_predict(model_type, models, terms):
+        raise RuntimeError('predict failed')
+
+    batcher = MicroBatcher(failing_predict, window=0.0, max_size=len(TERMS))
+    with batcher.caller(), pytest.raises(RuntimeError):
+        batcher.predict(ModelType.SVM, None, ['a'])
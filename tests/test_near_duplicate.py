@@ -0,0 +1,91 @@
+# Standard library
+from typing import List
+
+# Internal modules
+from app import db
+from app.models import Label, ResultSample, format_text, tokenize
+from app.repository import SampleRepo, TrainingDataRepo
+from app.service.near_duplicate_index import NearDuplicateIndex
+from app.service.near_duplicate_service import NearDuplicateService
+from tests.conftest import training_rows
+
+
+SPAM = Label.SPAM.value
+NON_SPAM = Label.NON_SPAM.value
+
+CAMPAIGN = 'join our telegram group today for free daily signals and huge gains $btc'
+
+
+def _words(text: str) -> List[str]:
+    return tokenize(format_text(text)).words
+
+
+def test_index_finds_near_duplicates_with_other_cashtags():
+    index = NearDuplicateIndex(threshold=0.8)
+    assert index.add(_words(CAMPAIGN))
+    assert index.find(_words(CAMPAIGN.replace('$btc', '$eth')))
+    assert not index.find(_words('shares rose after the company reported record revenue growth'))
+
+
+def test_index_adds_one_text_per_campaign():
+    index = NearDuplicateIndex(threshold=0.8)
+    assert index.add(_words(CAMPAIGN))
+    assert not index.add(_words(CAMPAIGN.replace('$btc', '$xrp')))
+    assert index.size() == 1
+
+
+def test_index_skips_too_short_texts():
+    index = NearDuplicateIndex(threshold=0.8)
+    assert not index.add(_words('buy'))
+    assert not index.find(_words('buy'))
+    assert index.size() == 0
+
+
+def test_service_indexes_spam_training_data_and_confirmed_samples(database):
+    index = NearDuplicateIndex(threshold=0.8)
+    svc = NearDuplicateService(TrainingDataRepo(), SampleRepo(), index)
+    TrainingDataRepo().save_all(training_rows([
+        (CAMPAIGN, SPAM),
+        ('shares rose after the company reported record revenue growth', NON_SPAM),
+    ]))
+    sample = 'limited offer claim your airdrop tokens now before they run out'
+    db.session.add(ResultSample(text=sample, label=SPAM, is_confirmed=True))
+    db.session.commit()
+    svc.update()
+    assert index.size() == 2
+    assert index.find(_words(CAMPAIGN))
+    assert index.find(_words(sample))
+
+
+def test_service_rescans_samples_confirmed_out_of_order(database):
+    index = NearDuplicateIndex(threshold=0.8)
+    svc = NearDuplicateService(TrainingDataRepo(), SampleRepo(), index, rescan_interval=0)
+    late = ResultSample(text=CAMPAIGN, label=SPAM, is_confirmed=False)
+    db.session.add(late)
+    sample = 'limited offer claim your airdrop tokens now before they run out'
+    db.session.add(ResultSample(text=sample, label=SPAM, is_confirmed=True))
+    db.session.commit()
+    svc.update()
+    assert not index.find(_words(CAMPAIGN))
+    late.is_confirmed = True
+    db.session.commit()
+    svc.update()
+    assert index.find(_words(CAMPAIGN))
+    assert index.size() == 2
+    svc.update()
+    assert index.size() == 2
+
+
+def test_service_only_reads_new_samples_between_rescans(database):
+    index = NearDuplicateIndex(threshold=0.8)
+    svc = NearDuplicateService(TrainingDataRepo(), SampleRepo(), index, rescan_interval=3600)
+    late = ResultSample(text=CAMPAIGN, label=SPAM, is_confirmed=False)
+    db.session.add(late)
+    db.session.add(ResultSample(text='limited offer claim your airdrop tokens now',
+                                label=SPAM, is_confirmed=True))
+    db.session.commit()
+    svc.update()
+    late.is_confirmed = True
+    db.session.commit()
+    svc.update()
+    assert not index.find(_words(CAMPAIGN))
@@ -0,0 +1,33 @@
+# Internal modules
+from app.models import Label, ModelType, SpamResult
+from app.service.result_cache import ResultCache
+
+
+SPAM_RESULT = SpamResult(label=Label.SPAM.value, reason='test')
+NON_SPAM_RESULT = SpamResult(label=Label.NON_SPAM.value, reason='test')
+
+
+def test_evicts_the_least_recently_used_result():
+    cache = ResultCache(max_size=2)
+    cache.put((ModelType.SVM, 'hash', 'a'), SPAM_RESULT)
+    cache.put((ModelType.SVM, 'hash', 'b'), NON_SPAM_RESULT)
+    assert cache.get((ModelType.SVM, 'hash', 'a')) == SPAM_RESULT
+    cache.put((ModelType.SVM, 'hash', 'c'), SPAM_RESULT)
+    assert cache.get((ModelType.SVM, 'hash', 'b')) is None
+    assert cache.get((ModelType.SVM, 'hash', 'a')) == SPAM_RESULT
+    assert cache.get((ModelType.SVM, 'hash', 'c')) == SPAM_RESULT
+
+
+def test_drops_results_of_a_replaced_model_only():
+    cache = ResultCache(max_size=10)
+    cache.put((ModelType.SVM, 'old', 'a'), SPAM_RESULT)
+    cache.put((ModelType.NAIVE_BAYES, 'nb', 'a'), NON_SPAM_RESULT)
+    assert cache.get((ModelType.SVM, 'new', 'a')) is None
+    assert cache.get((ModelType.SVM, 'old', 'a')) is None
+    assert cache.get((ModelType.NAIVE_BAYES, 'nb', 'a')) == NON_SPAM_RESULT
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ResultCache(max_size=0)
+    cache.put((ModelType.SVM, 'hash', 'a'), SPAM_RESULT)
+    assert cache.get((ModelType.SVM, 'hash', 'a')) is None
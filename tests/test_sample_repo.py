@@ -0,0 +1,72 @@
+# Standard library
+import time
+
+# Internal modules
+from app import db
+from app.models import Label, ResultSample, SpamResult
+from app.repository import SampleRepo
+
+
+SPAM = Label.SPAM.value
+NON_SPAM = Label.NON_SPAM.value
+
+
+def _sample_repo(**kwargs) -> SampleRepo:
+    repo = SampleRepo(**kwargs)
+    repo._sample_rate = 1.0
+    return repo
+
+
+def test_save_writes_samples_in_the_background(database):
+    repo = _sample_repo(flush_size=2, flush_interval=0.01)
+    for i in range(3):
+        repo.save(SpamResult(label=SPAM, reason='test'), f'text {i}')
+    deadline = time.monotonic() + 5
+    while ResultSample.query.count() < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    repo.close()
+    samples = ResultSample.query.order_by(ResultSample.id).all()
+    assert [sample.text for sample in samples] == ['text 0', 'text 1', 'text 2']
+    assert all(not sample.is_confirmed for sample in samples)
+
+
+def test_close_writes_queued_samples(database, monkeypatch):
+    repo = _sample_repo(queue_size=10)
+    monkeypatch.setattr(repo, '_ensure_writer', lambda: None)
+    for i in range(4):
+        repo.save(SpamResult(label=NON_SPAM, reason='test'), f'text {i}')
+    assert ResultSample.query.count() == 0
+    repo.close()
+    assert ResultSample.query.count() == 4
+
+
+def test_save_drops_samples_when_the_queue_is_full(database, monkeypatch):
+    repo = _sample_repo(queue_size=2)
+    monkeypatch.setattr(repo, '_ensure_writer', lambda: None)
+    for i in range(5):
+        repo.save(SpamResult(label=SPAM, reason='test'), f'text {i}')
+    repo.close()
+    assert repo._dropped == 3
+    assert ResultSample.query.count() == 2
+
+
+def test_save_skips_unsampled_results(database):
+    repo = _sample_repo()
+    repo._sample_rate = 0.0
+    repo.save(SpamResult(label=SPAM, reason='test'), 'text')
+    repo.close()
+    assert ResultSample.query.count() == 0
+
+
+def test_stream_confirmed_filters_label_and_last_id(database):
+    db.session.add_all([
+        ResultSample(text='spam 1', label=SPAM, is_confirmed=True),
+        ResultSample(text='unconfirmed', label=SPAM, is_confirmed=False),
+        ResultSample(text='non-spam', label=NON_SPAM, is_confirmed=True),
+        ResultSample(text='spam 2', label=SPAM, is_confirmed=True),
+    ])
+    db.session.commit()
+    repo = SampleRepo()
+    confirmed = list(repo.stream_confirmed(SPAM))
+    assert [text for _, text in confirmed] == ['spam 1', 'spam 2']
+    assert [text for _, text in repo.stream_confirmed(SPAM, confirmed[0][0])] == ['spam 2']
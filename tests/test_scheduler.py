@@ -0,0 +1,32 @@
+# Internal modules
+from app.service.scheduler import BackgroundTask
+
+
+def test_background_task_retries_until_it_succeeds():
+    attempts = []
+
+    def flaky() -> None:
+        attempts.append(len(attempts))
+        if len(attempts) < 3:
+            raise RuntimeError('not yet')
+
+    task = BackgroundTask('Flaky', flaky, retries=3, retry_delay=0.001)
+    task.start()
+    task.join(5)
+    assert len(attempts) == 3
+    assert not task.has_failed()
+
+
+def test_background_task_fails_when_retries_are_used_up():
+    attempts = []
+
+    def failing() -> None:
+        attempts.append(len(attempts))
+        raise RuntimeError('always')
+
+    task = BackgroundTask('Failing', failing, retries=2, retry_delay=0.001)
+    task.start()
+    task.start()
+    task.join(5)
+    assert len(attempts) == 3
+    assert task.has_failed()
@@ -0,0 +1,81 @@
+# Standard library
+import sqlite3
+from collections import Counter
+
+# 3rd party modules
+import pytest
+
+# Internal modules
+from app.models import Label, TrainingData
+from app.repository import TrainingDataRepo
+from app.repository.training_data_repo import is_test_sample
+from tests.conftest import training_rows
+
+
+SPAM = Label.SPAM.value
+NON_SPAM = Label.NON_SPAM.value
+
+requires_window_functions = pytest.mark.skipif(
+    sqlite3.sqlite_version_info < (3, 25, 0), reason='sqlite without window functions')
+
+
+def _store(repo: TrainingDataRepo, count: int) -> None:
+    repo.save_all(training_rows(
+        [(f'text {i}', SPAM if i % 2 else NON_SPAM) for i in range(count)]))
+
+
+def test_save_all_stores_every_batch(database):
+    repo = TrainingDataRepo()
+    assert repo.save_all(training_rows([(f'text {i}', SPAM) for i in range(7)]),
+                         batch_size=3) == 7
+    assert TrainingData.query.count() == 7
+    assert repo.save_all([]) == 0
+
+
+def test_find_corpus_marker_changes_when_samples_are_added(database):
+    repo = TrainingDataRepo()
+    assert repo.find_corpus_marker() == (0, 0)
+    _store(repo, 3)
+    marker = repo.find_corpus_marker()
+    assert marker.rows == 3
+    _store(repo, 1)
+    assert repo.find_corpus_marker() == (4, marker.max_id + 1)
+
+
+def test_stream_since_returns_newer_samples_oldest_first(database):
+    repo = TrainingDataRepo()
+    _store(repo, 5)
+    ids = [id for id, _, _ in repo.stream_since(0, chunk_size=2)]
+    assert ids == sorted(ids) and len(ids) == 5
+    assert [id for id, _, _ in repo.stream_since(ids[2])] == ids[3:]
+
+
+def test_stream_split_matches_is_test_sample(database):
+    repo = TrainingDataRepo()
+    _store(repo, 50)
+    rows = list(repo.stream_split())
+    assert len(rows) == 50
+    assert [id for id, _, _, _ in rows] == sorted(id for id, _, _, _ in rows)
+    for id, _, _, is_test in rows:
+        assert bool(is_test) == is_test_sample(id)
+
+
+@requires_window_functions
+def test_stream_split_caps_samples_per_label_and_split(database):
+    repo = TrainingDataRepo()
+    _store(repo, 200)
+    rows = list(repo.stream_split(training_cap=10, test_cap=3))
+    counts = Counter((label, bool(is_test)) for _, _, label, is_test in rows)
+    assert counts == {(SPAM, False): 10, (NON_SPAM, False): 10,
+                      (SPAM, True): 3, (NON_SPAM, True): 3}
+    assert rows == list(repo.stream_split(training_cap=10, test_cap=3))
+
+
+@requires_window_functions
+def test_stream_split_caps_only_the_capped_split(database):
+    repo = TrainingDataRepo()
+    _store(repo, 100)
+    all_test = sum(1 for _, _, _, is_test in repo.stream_split() if is_test)
+    rows = list(repo.stream_split(training_cap=5))
+    assert sum(1 for _, _, _, is_test in rows if not is_test) == 10
+    assert sum(1 for _, _, _, is_test in rows if is_test) == all_test
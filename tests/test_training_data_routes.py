@@ -0,0 +1,39 @@
+# Standard library
+import json
+
+# Internal modules
+from app import app
+from app.models import Label, TrainingData
+
+
+SPAM = Label.SPAM.value
+NON_SPAM = Label.NON_SPAM.value
+
+
+def test_bulk_training_data_stores_valid_items(database):
+    response = app.test_client().post('/v1/training-data/bulk', json=[
+        {'text': 'cheap pills', 'label': 'spam'},
+        {'text': 'earnings beat', 'label': 'non-spam'},
+        {'text': 'missing label'},
+        {'text': 'x' * 501, 'label': 'spam'},
+        {'text': 'unknown label', 'label': 'ham'},
+        'not an object',
+    ])
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['accepted'] == 2
+    assert body['rejected'] == 4
+    assert [error['index'] for error in body['errors']] == [2, 3, 4, 5]
+    assert sorted((row.text, row.label) for row in TrainingData.query.all()) == \
+        [('cheap pills', SPAM), ('earnings beat', NON_SPAM)]
+
+
+def test_bulk_training_data_accepts_ndjson(database):
+    lines = [json.dumps({'text': 'cheap pills', 'label': 'SPAM'}), '{not json',
+             json.dumps({'text': 'earnings beat', 'label': 'NON_SPAM'})]
+    response = app.test_client().post('/v1/training-data/bulk', data='\n'.join(lines),
+                           content_type='application/x-ndjson')
+    assert response.status_code == 200
+    assert response.get_json()['accepted'] == 2
+    assert response.get_json()['rejected'] == 1
+    assert TrainingData.query.count() == 2